@@ -30,7 +30,8 @@ def main():
             # Change to the launcher directory and run it
             original_cwd = os.getcwd()
             os.chdir("scripts/launchers")
-            subprocess.run([sys.executable, "launcher.py"])
+            # Pass options such as --production or --debug through
+            subprocess.run([sys.executable, "launcher.py"] + sys.argv[1:])
             os.chdir(original_cwd)
         except Exception as e:
             print(f"❌ Error running launcher: {e}")
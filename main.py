@@ -12,12 +12,14 @@ Features:
 from src.core.database import Database
 from src.core.models import Player, League
 from src.core.scoring import WeightedScoreCalculator
+from src.core.lineup import LineupOptimizer, player_price
 
 
 class MultiLeagueFantasyApp:
     def __init__(self, db_path='data/fantasy_players.db'):
-        self.db = Database(db_path)
+        self.db = Database(db_path, lazy=True)
         self.calculator = WeightedScoreCalculator()
+        self.optimizer = LineupOptimizer(self.calculator)
         self.current_league_id = 2  # Default to EPL
     
     def switch_league(self, league_id):
@@ -33,17 +35,17 @@ class MultiLeagueFantasyApp:
     
     def show_leagues(self):
         """Show all available leagues"""
-        leagues = self.db.get_all_leagues()
+        league_stats = self.db.get_league_stats()
         print("\n" + "="*60)
         print("AVAILABLE LEAGUES")
         print("="*60)
         
-        for league in leagues:
-            players = self.db.get_players_by_league(league.id)
-            my_team_count = len([p for p in players if p.is_on_my_team])
+        for stat in league_stats:
+            league = stat['league']
             current = " (CURRENT)" if league.id == self.current_league_id else ""
             print(f"{league.id}. {league.display_name} - {league.sport_type}{current}")
-            print(f"   Players: {len(players)}, My Team: {my_team_count}")
+            print(f"   Players: {stat['total_players']}, My Team: {stat['my_team_players']}, "
+                  f"Avg Score: {stat['average_score']:.2f}, Weeks: {stat['weeks']}")
         print()
     
     def get_leaderboard(self, league_id=None):
@@ -93,7 +95,8 @@ class MultiLeagueFantasyApp:
     
     def update_player_scores(self, player_name, new_scores):
         """Update a player's scores in the current league"""
-        if self.db.update_player_scores(player_name, new_scores):
+        player = self.db.get_player_by_name(player_name, self.current_league_id)
+        if player and self.db.update_player_scores(player.id, new_scores):
             print(f"Scores updated for {player_name}")
         else:
             print(f"Player {player_name} not found in current league")
@@ -104,8 +107,7 @@ class MultiLeagueFantasyApp:
             league_id = self.current_league_id
             
         league = self.db.get_league_by_id(league_id)
-        players = self.db.get_players_by_league(league_id)
-        my_team = [p for p in players if p.is_on_my_team]
+        my_team = self.db.get_my_team_players(league_id)
         
         if not my_team:
             print(f"\nYou don't have any players in {league.display_name} yet!")
@@ -127,6 +129,43 @@ class MultiLeagueFantasyApp:
         print("-"*60)
         print(f"TEAM AVERAGE: {total_score/len(my_team):.2f}")
         print(f"TOTAL PLAYERS: {len(my_team)}")
+    
+    def optimize_lineup(self, league_id=None, budget=None, max_per_team=None):
+        """Pick and display the highest-scoring lineup for a league"""
+        if league_id is None:
+            league_id = self.current_league_id
+        
+        league = self.db.get_league_by_id(league_id)
+        players = self.db.get_players_by_league(league_id)
+        lineup = self.optimizer.optimize(players, league.get_lineup_slots(), budget, max_per_team)
+        
+        if not lineup['feasible']:
+            print(f"\nNo lineup fills every position in {league.display_name} within these limits!")
+            return lineup
+        
+        slots = ", ".join(f"{count} {position}" for position, count in lineup['slots'].items())
+        print(f"\n🧮 OPTIMAL {league.display_name.upper()} LINEUP ({slots})")
+        print("="*75)
+        for player in lineup['players']:
+            print(f"{player.name:<20} {player.team:<15} {player.position:<12} "
+                  f"{player.final_score:<8.2f} {player_price(player.scores):>5.1f}")
+        print("-"*75)
+        print(f"TOTAL SCORE: {lineup['total_score']:.2f}   TOTAL PRICE: {lineup['total_price']:.1f}")
+        return lineup
+    
+    def apply_lineup(self, lineup, league_id=None):
+        """Make my team in a league exactly the players of an optimized lineup"""
+        if league_id is None:
+            league_id = self.current_league_id
+        
+        selected = {player.id for player in lineup['players']}
+        toggles = [{'op': 'toggle', 'player_id': player.id}
+                   for player in self.db.get_players_by_league(league_id)
+                   if player.is_on_my_team != (player.id in selected)]
+        self.db.apply_batch(toggles)
+        
+        league = self.db.get_league_by_id(league_id)
+        print(f"Your {league.display_name} team now matches the optimized lineup")
 
 
 def interactive_menu():
@@ -143,10 +182,11 @@ def interactive_menu():
         print("4. Show My Team (Current League)")
         print("5. Show My Team (All Leagues)")
         print("6. Add Player to Current League")
-        print("7. Exit")
+        print("7. Optimize Lineup (Current League)")
+        print("8. Exit")
         print("="*50)
         
-        choice = input("Enter your choice (1-7): ").strip()
+        choice = input("Enter your choice (1-8): ").strip()
         
         if choice == '1':
             app.show_leagues()
@@ -217,11 +257,25 @@ def interactive_menu():
             app.add_player(name, team, position, scores, add_to_team)
             
         elif choice == '7':
+            try:
+                budget_input = input("Budget (blank for none): ").strip()
+                budget = float(budget_input) if budget_input else None
+                cap_input = input("Max players per team (blank for none): ").strip()
+                max_per_team = int(cap_input) if cap_input else None
+            except ValueError:
+                print("Invalid number!")
+                continue
+            
+            lineup = app.optimize_lineup(budget=budget, max_per_team=max_per_team)
+            if lineup['feasible'] and input("Make this your team? (y/n): ").strip().lower() == 'y':
+                app.apply_lineup(lineup)
+            
+        elif choice == '8':
             print("Thanks for using Multi-League Fantasy Sports Manager!")
             break
             
         else:
-            print("Invalid choice! Please enter 1-7.")
+            print("Invalid choice! Please enter 1-8.")
 
 
 def main():
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator for the Fantasy Sports web app
+
+Drives a running server (--url) or the Flask app in-process (--in-process)
+with the weighted request mix of a scenario file, keeping a fixed number of
+requests in flight, and reports throughput plus p50/p95/p99 latency per route.
+Passing several concurrency levels runs the scenario at each one in turn and
+points out where throughput stops scaling.
+
+Scenario files are JSON (see scripts/benchmarks/scenarios/):
+    {
+        "name": "mixed", "concurrency": 16, "duration": 30, "warmup": 3,
+        "leagues": [1, 2, 3, 4],
+        "requests": [
+            {"name": "leaderboard", "method": "GET", "path": "/league/{league_id}", "weight": 50},
+            {"name": "edit_scores", "method": "POST", "path": "/api/batch", "weight": 5,
+             "json": {"operations": [{"op": "update_scores", "player_id": "{player_id}", "scores": "{scores}"}]}}
+        ]
+    }
+"{league_id}" and "{player_id}" are filled with a random league from the
+scenario and a random player of that league; in JSON bodies, values that are
+exactly "{player_id}" or "{scores}" become an id or a list of random scores.
+
+Usage:
+    python scripts/benchmarks/load_test.py scripts/benchmarks/scenarios/mixed.json --url http://127.0.0.1:5000
+    python scripts/benchmarks/load_test.py scripts/benchmarks/scenarios/read_heavy.json --in-process --concurrency 1,4,16,64
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+class HttpTarget:
+    """Sends requests to a running server, one keep-alive session per worker thread"""
+
+    def __init__(self, base_url, timeout=30):
+        import requests
+        self._requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def client(self):
+        return self._requests.Session()
+
+    def send(self, client, method, path, body=None):
+        response = client.request(method, self.base_url + path, json=body, timeout=self.timeout)
+        return response.status_code, response.content
+
+    def get_json(self, path):
+        return self._requests.get(self.base_url + path, timeout=self.timeout).json()
+
+
+class WsgiTarget:
+    """Calls the Flask app in this process through its test client"""
+
+    def __init__(self):
+        from src.web.app import app
+        self.app = app
+
+    def client(self):
+        return self.app.test_client()
+
+    def send(self, client, method, path, body=None):
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.data
+
+    def get_json(self, path):
+        return self.app.test_client().get(path).get_json()
+
+
+def load_scenario(path):
+    with open(path, encoding='utf-8') as f:
+        scenario = json.load(f)
+    if not scenario.get('requests'):
+        raise ValueError(f"Scenario {path} defines no requests")
+    scenario.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    scenario.setdefault('concurrency', 8)
+    scenario.setdefault('duration', 30)
+    scenario.setdefault('warmup', 3)
+    scenario.setdefault('leagues', [1, 2, 3, 4])
+    return scenario
+
+
+def fill_body(value, player_id, rng):
+    """Substitute "{player_id}" and "{scores}" placeholders in a JSON request body"""
+    if isinstance(value, dict):
+        return {key: fill_body(item, player_id, rng) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill_body(item, player_id, rng) for item in value]
+    if value == '{player_id}':
+        return player_id
+    if value == '{scores}':
+        return [rng.randint(50, 100) for _ in range(5)]
+    return value
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadRun:
+    def __init__(self, target, scenario, player_ids, concurrency, seed=0):
+        self.target = target
+        self.scenario = scenario
+        self.player_ids = player_ids
+        self.concurrency = concurrency
+        self.seed = seed
+        self.routes = scenario['requests']
+        self.weights = [route.get('weight', 1) for route in self.routes]
+        self.leagues = [league_id for league_id in scenario['leagues'] if player_ids.get(league_id)]
+        self._lock = threading.Lock()
+        self._results = {route['name']: {'latencies': [], 'errors': 0} for route in self.routes}
+
+    def _next_request(self, rng):
+        route = rng.choices(self.routes, self.weights)[0]
+        league_id = rng.choice(self.leagues)
+        player_id = rng.choice(self.player_ids[league_id])
+        path = route['path'].format(league_id=league_id, player_id=player_id)
+        body = fill_body(route['json'], player_id, rng) if 'json' in route else None
+        return route, path, body
+
+    def _worker(self, index, warmup_until, stop_at):
+        rng = random.Random(f"{self.seed}:{index}")
+        client = self.target.client()
+        latencies = {route['name']: [] for route in self.routes}
+        errors = {route['name']: 0 for route in self.routes}
+
+        while True:
+            route, path, body = self._next_request(rng)
+            start = time.perf_counter()
+            if start >= stop_at:
+                break
+            try:
+                status, _ = self.target.send(client, route.get('method', 'GET'), path, body)
+                failed = status >= 400
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+
+            # Requests issued during warmup only prime caches and connections
+            if start < warmup_until:
+                continue
+            if failed:
+                errors[route['name']] += 1
+            else:
+                latencies[route['name']].append(elapsed)
+
+        with self._lock:
+            for name in latencies:
+                self._results[name]['latencies'].extend(latencies[name])
+                self._results[name]['errors'] += errors[name]
+
+    def run(self, duration, warmup):
+        """Run the scenario; returns per-route and total statistics"""
+        started = time.perf_counter()
+        warmup_until = started + warmup
+        stop_at = warmup_until + duration
+        threads = [threading.Thread(target=self._worker, args=(i, warmup_until, stop_at), daemon=True)
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        measured = max(time.perf_counter() - warmup_until, 1e-9)
+
+        routes = []
+        all_latencies = []
+        total_errors = 0
+        for route in self.routes:
+            result = self._results[route['name']]
+            latencies = sorted(result['latencies'])
+            all_latencies.extend(latencies)
+            total_errors += result['errors']
+            routes.append(summarize(route['name'], latencies, result['errors'], measured))
+        all_latencies.sort()
+
+        return {
+            'scenario': self.scenario['name'],
+            'concurrency': self.concurrency,
+            'duration': measured,
+            'routes': routes,
+            'total': summarize('TOTAL', all_latencies, total_errors, measured)
+        }
+
+
+def summarize(name, sorted_latencies, errors, duration):
+    return {
+        'route': name,
+        'requests': len(sorted_latencies),
+        'errors': errors,
+        'rps': len(sorted_latencies) / duration,
+        'p50_ms': percentile(sorted_latencies, 50) * 1000,
+        'p95_ms': percentile(sorted_latencies, 95) * 1000,
+        'p99_ms': percentile(sorted_latencies, 99) * 1000,
+        'max_ms': (sorted_latencies[-1] if sorted_latencies else 0.0) * 1000
+    }
+
+
+def print_report(report):
+    print(f"\n📈 {report['scenario']} @ concurrency {report['concurrency']} ({report['duration']:.1f}s measured)")
+    print(f"{'Route':<18} {'Requests':>9} {'Errors':>7} {'Req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print("-" * 84)
+    for row in report['routes'] + [report['total']]:
+        print(f"{row['route']:<18} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+
+
+def print_sweep(reports):
+    """Summarize a concurrency sweep and mark where throughput stopped scaling"""
+    print("\n🔎 Concurrency sweep")
+    print(f"{'Concurrency':>11} {'Req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'Errors':>7}")
+    best = None
+    saturation = None
+    for report in reports:
+        total = report['total']
+        print(f"{report['concurrency']:>11} {total['rps']:>9.1f} {total['p50_ms']:>9.1f} "
+              f"{total['p99_ms']:>9.1f} {total['errors']:>7}")
+        # Saturated once more concurrency adds under 5% throughput
+        if best is not None and saturation is None and total['rps'] < best['total']['rps'] * 1.05:
+            saturation = best
+        if best is None or total['rps'] > best['total']['rps']:
+            best = report
+    if saturation:
+        print(f"Throughput saturates around concurrency {saturation['concurrency']} "
+              f"({saturation['total']['rps']:.1f} req/s); higher levels mostly add latency")
+    else:
+        print("Throughput was still scaling at the highest concurrency tested")
+
+
+def collect_player_ids(target, leagues):
+    """Look up existing player ids per league to fill {player_id}"""
+    player_ids = {}
+    for league_id in leagues:
+        players = target.get_json(f"/api/leaderboard/{league_id}") or []
+        player_ids[league_id] = [player['id'] for player in players]
+    return player_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Fantasy Sports web app")
+    parser.add_argument('scenario', help='path to a JSON scenario file')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='base URL of a running server')
+    parser.add_argument('--in-process', action='store_true', help='drive the Flask app in this process instead')
+    parser.add_argument('--concurrency', help='requests in flight; a comma-separated list runs a sweep')
+    parser.add_argument('--duration', type=float, help='seconds measured per run (overrides the scenario)')
+    parser.add_argument('--warmup', type=float, help='seconds of unmeasured traffic first (overrides the scenario)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the request mix')
+    parser.add_argument('--json', dest='json_path', help='also write the reports to this JSON file')
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    levels = [int(level) for level in args.concurrency.split(',')] if args.concurrency else [scenario['concurrency']]
+    duration = args.duration if args.duration is not None else scenario['duration']
+    warmup = args.warmup if args.warmup is not None else scenario['warmup']
+
+    try:
+        target = WsgiTarget() if args.in_process else HttpTarget(args.url)
+        player_ids = collect_player_ids(target, scenario['leagues'])
+    except ImportError as e:
+        print(f"Error: load test dependency missing ({e.name}).")
+        print("Please run: pip install -r requirements.txt")
+        return 1
+    except Exception as e:
+        print(f"❌ Could not reach the app: {e}")
+        return 1
+    if not any(player_ids.values()):
+        print("❌ No players found in the scenario's leagues; populate the database first")
+        return 1
+
+    where = 'in-process' if args.in_process else args.url
+    print(f"🚦 Scenario '{scenario['name']}' against {where}: {duration:g}s per run after {warmup:g}s warmup")
+
+    reports = []
+    for concurrency in levels:
+        report = LoadRun(target, scenario, player_ids, concurrency, args.seed).run(duration, warmup)
+        print_report(report)
+        reports.append(report)
+
+    if len(reports) > 1:
+        print_sweep(reports)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Reports written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
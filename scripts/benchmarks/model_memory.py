@@ -0,0 +1,107 @@
+"""
+Memory benchmark for the Player model
+
+Builds 100k players from database-style rows with the legacy dict-based model
+(eagerly decoded scores) and with the current slotted model (scores kept as
+raw JSON until first access), and reports the memory held by each.
+
+Usage:
+    python scripts/benchmarks/model_memory.py [--players 100000] [--weeks 5]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.models import Player, League
+
+
+class LegacyPlayer:
+    """The Player model as it was before __slots__ and lazy scores"""
+
+    def __init__(self, name, team, position, scores, is_on_my_team=False, league_id=1, player_id=None):
+        self.id = player_id
+        self.name = name
+        self.team = team
+        self.position = position
+        self.scores = scores
+        self.final_score = 0.0
+        self.is_on_my_team = is_on_my_team
+        self.league_id = league_id
+        self.league = None
+
+
+def make_rows(count, weeks, seed=42):
+    """Generate (id, name, team, position, scores_json, is_on_my_team, league_id) rows"""
+    rng = random.Random(seed)
+    teams = [f"Team {i}" for i in range(20)]
+    positions = ['Forward', 'Midfielder', 'Defender', 'Goalkeeper']
+    rows = []
+    for i in range(count):
+        scores = [rng.randint(60, 100) for _ in range(weeks)]
+        rows.append((i + 1, f"Player {i}", rng.choice(teams), rng.choice(positions),
+                     json.dumps(scores), 0, 2))
+    return rows
+
+
+def build_legacy(rows, league):
+    players = []
+    for player_id, name, team, position, scores_json, is_on_my_team, league_id in rows:
+        player = LegacyPlayer(name, team, position, json.loads(scores_json), bool(is_on_my_team), league_id, player_id)
+        player.league = league
+        players.append(player)
+    return players
+
+
+def build_slotted(rows, league):
+    return [Player.from_db(*row, league=league) for row in rows]
+
+
+def measure(build, count, weeks, league):
+    """
+    Return bytes still held by the players build() creates
+
+    The rows are generated inside the traced region and dropped once the
+    players exist, like a fetchall() result, so whatever the players keep
+    of them (e.g. the raw scores JSON of lazy players) is counted.
+    """
+    gc.collect()
+    tracemalloc.start()
+    rows = make_rows(count, weeks)
+    players = build(rows, league)
+    del rows
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del players
+    gc.collect()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=100000, help='number of players to build')
+    parser.add_argument('--weeks', type=int, default=5, help='game weeks per player')
+    args = parser.parse_args()
+
+    league = League(2, 'epl', 'English Premier League', 'Football').freeze()
+    legacy = measure(build_legacy, args.players, args.weeks, league)
+    slotted = measure(build_slotted, args.players, args.weeks, league)
+
+    per_100k = 100000 / args.players
+    print(f"Players: {args.players:,}  Weeks: {args.weeks}")
+    print(f"{'Model':<28} {'Total MB':>10} {'MB per 100k':>12} {'Bytes/player':>13}")
+    print("-" * 66)
+    for label, size in (("Before (dict, eager scores)", legacy), ("After (slots, lazy scores)", slotted)):
+        print(f"{label:<28} {size / 1e6:>10.2f} {size * per_100k / 1e6:>12.2f} {size / args.players:>13.0f}")
+    print(f"\nReduction: {(1 - slotted / legacy) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Startup time benchmark for the web app
+
+Each run starts a fresh Python interpreter, imports src.web.app and serves one
+request through the Flask test client, reporting the time spent importing the
+app and the total time from interpreter start to the first response.
+
+Usage:
+    python scripts/benchmarks/startup_time.py [--runs 10] [--path /league/2]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from src.web.app import app
+imported = time.perf_counter()
+response = app.test_client().get({path!r})
+responded = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'first_response_ms': (responded - start) * 1000,
+    'status': response.status_code,
+    'heavy_modules': sorted(m for m in ('pandas', 'numpy') if m in sys.modules)
+}}))
+'''
+
+
+def run_once(path):
+    """Measure one cold start in a child interpreter"""
+    script = CHILD_SCRIPT.format(root=PROJECT_ROOT, path=path)
+    output = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start time of the web app")
+    parser.add_argument('--runs', type=int, default=10, help='number of cold starts to measure')
+    parser.add_argument('--path', default='/league/2', help='URL of the first request')
+    args = parser.parse_args()
+
+    results = [run_once(args.path) for _ in range(args.runs)]
+    import_times = [r['import_ms'] for r in results]
+    response_times = [r['first_response_ms'] for r in results]
+
+    print(f"🚀 Cold start over {args.runs} runs (GET {args.path} -> {results[-1]['status']})")
+    print(f"{'Import src.web.app':<24} | median {statistics.median(import_times):>7.1f} ms | max {max(import_times):>7.1f} ms")
+    print(f"{'First response':<24} | median {statistics.median(response_times):>7.1f} ms | max {max(response_times):>7.1f} ms")
+    heavy = results[-1]['heavy_modules']
+    print(f"Heavy modules loaded at startup: {', '.join(heavy) if heavy else 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Change journal compaction for the Fantasy Sports App
+
+Collapses player_changes entries older than the newest N data versions down to
+the latest entry per player. Mirrors syncing through /api/changes?since= keep
+working from any version; they just receive fewer intermediate states.
+
+Usage:
+    python scripts/compact_changes.py [--keep-versions 1000] [--db data/fantasy_players.db]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Compact the player change journal")
+    parser.add_argument('--db', default=os.path.join(project_root, 'data', 'fantasy_players.db'),
+                        help='path to the SQLite database')
+    parser.add_argument('--keep-versions', type=int, default=1000,
+                        help='number of most recent data versions to keep uncompacted')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 1
+
+    db = Database(args.db)
+    print(f"🧹 Compacting change journal (keeping last {args.keep_versions} versions)...")
+    removed = db.compact_changes(args.keep_versions)
+    print(f"✅ Removed {removed} superseded journal entries (data version {db.get_data_version()})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
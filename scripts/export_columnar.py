@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Columnar league snapshots for the Fantasy Sports App
+
+Exports every league (or the given ones) to the memory-mapped columnar files
+that web workers started with FANTASY_COLUMNAR=1 serve the leaderboard, teams
+and positions views from. The web app re-exports changed leagues itself about
+a second after each write; run this before starting the workers so their
+first requests already find current files. Leagues whose file is already at
+the league's current version (its newest change) are skipped.
+
+Usage:
+    python scripts/export_columnar.py [--league 2] [--dir data/columnar]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.columnar import ColumnarSnapshots
+from src.core.database import Database
+from src.core.scoring import WeightedScoreCalculator
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Export leagues as memory-mapped columnar snapshots")
+    parser.add_argument('--db', default=os.path.join(project_root, 'data', 'fantasy_players.db'),
+                        help='path to the SQLite database')
+    parser.add_argument('--dir', default=os.path.join(project_root, 'data', 'columnar'),
+                        help='directory the web workers map the snapshots from')
+    parser.add_argument('--league', type=int, action='append',
+                        help='only export this league id (repeatable)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 1
+
+    db = Database(args.db)
+    snapshots = ColumnarSnapshots(db, WeightedScoreCalculator(), args.dir)
+    leagues = [db.get_league_by_id(league_id) for league_id in args.league] if args.league else db.get_all_leagues()
+
+    for league in leagues:
+        if league is None:
+            print("❌ Unknown league id")
+            return 1
+        started = time.perf_counter()
+        if snapshots.export(league.id):
+            size = os.path.getsize(snapshots.path(league.id))
+            print(f"🗂️  {league.display_name}: exported {size / 1024 / 1024:.1f} MB ({time.perf_counter() - started:.1f}s)")
+        else:
+            print(f"✅ {league.display_name}: already current")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -53,15 +53,18 @@ def run_console_app():
         os.chdir("scripts/launchers")
 
 
-def run_web_app():
-    """Launch the web version"""
-    print("Starting web app...")
+def run_web_app(debug=False):
+    """Launch the web version (Flask development server)"""
+    print("Starting web app" + (" in debug mode..." if debug else "..."))
     print("Open http://localhost:5000 in your browser")
     print("Press Ctrl+C to stop the server")
     try:
         # Change back to root directory and run
         os.chdir("../..")
-        subprocess.run([sys.executable, "src/web/app.py"])
+        command = [sys.executable, "src/web/app.py"]
+        if debug:
+            command.append("--debug")
+        subprocess.run(command)
     except KeyboardInterrupt:
         print("\nWeb server stopped by user.")
     except Exception as e:
@@ -71,6 +74,18 @@ def run_web_app():
         os.chdir("scripts/launchers")
 
 
+def run_production_server(extra_args=None):
+    """Launch the web version on the multi-worker production server"""
+    print("Starting production web server...")
+    try:
+        # serve.py switches to the project root itself
+        subprocess.run([sys.executable, "serve.py"] + (extra_args or []))
+    except KeyboardInterrupt:
+        print("\nProduction server stopped by user.")
+    except Exception as e:
+        print(f"Error running production server: {e}")
+
+
 def run_web_app_with_restart():
     """Launch the web version with auto-restart capability"""
     print("Starting web app with auto-restart...")
@@ -154,6 +169,14 @@ def run_web_app_with_restart():
 
 def main():
     """Main launcher function"""
+    # Non-interactive shortcuts: --production [serve.py options] or --debug
+    if len(sys.argv) > 1 and sys.argv[1] == "--production":
+        run_production_server(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "--debug":
+        run_web_app(debug=True)
+        return
+
     print("Fantasy Sports App Launcher")
     print("==========================")
     print(f"Python version: {sys.version}")
@@ -193,11 +216,13 @@ def main():
         print("1) Run Console App")
         print("2) Run Web App")
         print("3) Run Web App with Auto-Restart (Recommended)")
-        print("4) Exit")
+        print("4) Run Web App in Production Mode (multi-worker)")
+        print("5) Run Web App in Debug Mode")
+        print("6) Exit")
         print()
 
         try:
-            choice = input("Enter your choice (1-4): ").strip()
+            choice = input("Enter your choice (1-6): ").strip()
         except KeyboardInterrupt:
             print("\nGoodbye!")
             break
@@ -209,10 +234,14 @@ def main():
         elif choice == "3":
             run_web_app_with_restart()
         elif choice == "4":
+            run_production_server()
+        elif choice == "5":
+            run_web_app(debug=True)
+        elif choice == "6":
             print("Goodbye!")
             break
         else:
-            print("Invalid choice. Please enter 1, 2, 3, or 4.")
+            print("Invalid choice. Please enter 1, 2, 3, 4, 5, or 6.")
 
 
 if __name__ == "__main__":
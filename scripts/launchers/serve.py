@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Production server for the Fantasy Sports web app
+
+Runs src/web/app.py under a pre-forked, multi-worker WSGI server instead of
+Flask's single-process debug server:
+- Linux/macOS: gunicorn with threaded workers. Each worker warms its page cache
+  before accepting traffic; send SIGHUP to the master for a graceful restart.
+- Windows: waitress (multi-threaded, single process), as gunicorn needs fork().
+
+Live leaderboard streams hold a thread each for as long as a page stays open,
+so every worker gets --streams threads on top of --threads and refuses streams
+beyond that (503), leaving --threads free for page and API requests.
+
+All workers write the same SQLite file, so it is switched to write-ahead
+logging and writers wait up to 30 seconds for each other's locks
+(FANTASY_SQLITE_WAL / FANTASY_SQLITE_BUSY_TIMEOUT override this).
+
+Usage:
+    python scripts/launchers/serve.py [--bind 127.0.0.1:5000] [--workers N] [--threads N] [--streams N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(PROJECT_ROOT)
+
+
+def default_workers():
+    """Common gunicorn sizing: two workers per core plus one"""
+    return multiprocessing.cpu_count() * 2 + 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Fantasy Sports web app in production mode")
+    parser.add_argument('--bind', default=os.environ.get('FANTASY_BIND', '127.0.0.1:5000'),
+                        help='host:port to listen on (default: 127.0.0.1:5000)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('FANTASY_WORKERS', default_workers())),
+                        help='number of worker processes (default: 2 x cores + 1)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('FANTASY_THREADS', 4)),
+                        help='threads per worker for page and API requests (default: 4)')
+    parser.add_argument('--streams', type=int, default=int(os.environ.get('FANTASY_MAX_STREAMS', 8)),
+                        help='live leaderboard streams per worker, each with its own thread (default: 8)')
+    parser.add_argument('--timeout', type=int, default=60,
+                        help='seconds before a silent worker is killed and replaced')
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help='seconds workers get to finish in-flight requests on restart/shutdown')
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help='recycle each worker after this many requests (0 disables)')
+    parser.add_argument('--no-warm', action='store_true',
+                        help='skip warming caches in each worker before serving')
+    return parser.parse_args(argv)
+
+
+def warm_worker(arbiter, worker):
+    """gunicorn post_worker_init hook: fill this worker's caches before it accepts requests"""
+    from src.web.app import warm_caches
+    pages = warm_caches()
+    worker.log.info("Worker %s warmed %d pages", worker.pid, pages)
+
+
+def flush_worker(arbiter, worker):
+    """gunicorn worker_exit hook: write queued score updates before the worker goes away"""
+    from src.web.app import score_writer
+    if score_writer is not None:
+        score_writer.close()
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class FantasyApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from src.web.app import app
+            return app
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads + args.streams,
+        'worker_class': 'gthread',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'preload_app': False,
+        'accesslog': '-',
+        'worker_exit': flush_worker,
+    }
+    if not args.no_warm:
+        options['post_worker_init'] = warm_worker
+
+    print(f"Starting gunicorn on http://{args.bind} with {args.workers} workers x "
+          f"({args.threads} threads + {args.streams} stream threads)")
+    print("Send SIGHUP to the master process for a graceful restart, Ctrl+C to stop")
+    FantasyApplication(options).run()
+
+
+def run_waitress(args):
+    from waitress import serve
+    from src.web.app import app, warm_caches
+
+    if not args.no_warm:
+        print(f"Warmed {warm_caches()} pages")
+
+    host, _, port = args.bind.rpartition(':')
+    threads = args.workers * args.threads + args.streams
+    print(f"Starting waitress on http://{args.bind} with {threads} threads ({args.streams} for streams)")
+    print("Press Ctrl+C to stop")
+    serve(app, host=host or '127.0.0.1', port=int(port), threads=threads)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # The app opens data/fantasy_players.db relative to the project root
+    os.chdir(PROJECT_ROOT)
+
+    # Read by each worker when it imports the app
+    os.environ['FANTASY_MAX_STREAMS'] = str(args.streams)
+    os.environ.setdefault('FANTASY_SQLITE_WAL', '1')
+    os.environ.setdefault('FANTASY_SQLITE_BUSY_TIMEOUT', '30')
+
+    try:
+        if sys.platform.startswith('win'):
+            run_waitress(args)
+        else:
+            run_gunicorn(args)
+    except ImportError as e:
+        print(f"Error: production server dependency missing ({e.name}).")
+        print("Please run: pip install -r requirements.txt")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Full score recompute for the Fantasy Sports App
+
+Recalculates every player's weighted score and stores it in players.final_score,
+e.g. after changing the scoring rule or importing history. The players table is
+split into id ranges (across the whole table, or per league with --by league);
+a process pool scores the ranges while the parent streams rows in and writes
+results back one transaction per range.
+
+Each transaction also records how far the job got, so an interrupted run picks
+up after the last committed range when started again (pass --restart to start
+over instead).
+
+Usage:
+    python scripts/recompute_scores.py [--by rowid|league] [--league 2] [--workers 4] [--chunk-size 5000]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database
+from src.core.scoring import WeightedScoreCalculator
+
+_calculator = WeightedScoreCalculator()
+
+
+def score_chunk(task):
+    """Score one range in a worker; returns (last id of the range, [(final_score, player_id), ...])"""
+    end_id, rows = task
+    calculate = _calculator.calculate_weighted_score
+    return end_id, [(calculate(json.loads(scores)), player_id) for player_id, scores in rows]
+
+
+def read_chunks(db, start_id, end_id, chunk_size, league_id=None):
+    """Yield (last id, rows) for consecutive id ranges; consumed lazily as workers free up"""
+    for chunk_start in range(start_id, end_id + 1, chunk_size):
+        chunk_end = min(chunk_start + chunk_size - 1, end_id)
+        yield chunk_end, db.get_scores_in_range(chunk_start, chunk_end, league_id)
+
+
+def recompute(db, job, league_id, workers, chunk_size, restart=False):
+    """Run (or resume) one recompute job; returns the number of players scored"""
+    min_id, max_id, total = db.get_player_id_bounds(league_id)
+    if not total:
+        return 0
+
+    checkpoint = None if restart else db.get_recompute_checkpoint(job)
+    start_id = min_id
+    if checkpoint is not None and checkpoint >= min_id:
+        start_id = checkpoint + 1
+        print(f"↩️  Resuming {job} after player id {checkpoint}")
+    if start_id > max_id:
+        db.clear_recompute_checkpoint(job)
+        return 0
+
+    chunks = read_chunks(db, start_id, max_id, chunk_size, league_id)
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    # Ranges come back in order, so the checkpoint only ever covers committed rows
+    results = pool.imap(score_chunk, chunks) if pool else map(score_chunk, chunks)
+
+    done = 0
+    started = time.perf_counter()
+    try:
+        for end_id, scores in results:
+            db.save_final_scores(scores, job, end_id)
+            done += len(scores)
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed else 0
+            progress = (end_id - min_id + 1) / (max_id - min_id + 1)
+            print(f"   {job}: {progress:6.1%} | {done} players | {rate:,.0f}/s", end='\r')
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    print()
+    db.clear_recompute_checkpoint(job)
+    return done
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Recompute every player's final score")
+    parser.add_argument('--db', default=os.path.join(project_root, 'data', 'fantasy_players.db'),
+                        help='path to the SQLite database')
+    parser.add_argument('--by', choices=['rowid', 'league'], default='rowid',
+                        help='split the whole table by id, or run one job per league')
+    parser.add_argument('--league', type=int, action='append',
+                        help='only recompute this league id (repeatable; implies --by league)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='scoring processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                        help='player ids per range and per write transaction')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore saved progress and recompute from the start')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 1
+
+    db = Database(args.db)
+    if args.league or args.by == 'league':
+        league_ids = args.league or [league.id for league in db.get_all_leagues()]
+        jobs = [(f"league:{league_id}", league_id) for league_id in league_ids]
+    else:
+        jobs = [('all', None)]
+
+    print(f"🧮 Recomputing final scores with {args.workers} workers, {args.chunk_size} ids per batch...")
+    started = time.perf_counter()
+    total = 0
+    for job, league_id in jobs:
+        total += recompute(db, job, league_id, args.workers, args.chunk_size, args.restart)
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else 0
+    print(f"✅ Recomputed {total} players in {elapsed:.1f}s ({rate:,.0f} players/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
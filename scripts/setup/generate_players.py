@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic player generator for load testing
+
+Produces any number of reproducible players per league, with team and position
+drawn from the league's metadata, a season-length week count and scores built
+from a per-player talent level plus weekly form noise. The same --seed and
+--chunk-size always produce the same players, however many worker processes
+are used.
+
+Players are generated in fixed-size chunks, each with its own seeded RNG, so
+chunks can be built in parallel; the parent process writes them in order
+through Database.bulk_add_players, or to CSV/JSONL files that --import loads
+later.
+
+Usage:
+    python scripts/setup/generate_players.py --players 1000000 [--leagues epl,nfl] [--seed 42] [--workers 4]
+    python scripts/setup/generate_players.py --players 100000 --format csv --output data/fixture.csv
+    python scripts/setup/generate_players.py --import data/fixture.csv
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(PROJECT_ROOT)
+
+from src.core.database import Database
+
+# Weeks in a full season; the generated season is somewhere past its midpoint
+SEASON_WEEKS = {
+    'f1': 22,
+    'epl': 38,
+    'ucl': 13,
+    'nfl': 17
+}
+DEFAULT_SEASON_WEEKS = 17
+
+FIRST_NAMES = [
+    "Alex", "Ben", "Carlos", "Daniel", "Elijah", "Felix", "Gabriel", "Hugo", "Ivan", "James",
+    "Kai", "Luca", "Mateo", "Noah", "Oscar", "Pablo", "Quinn", "Rafael", "Samuel", "Theo",
+    "Victor", "William", "Xavier", "Yusuf", "Zach"
+]
+LAST_NAMES = [
+    "Anderson", "Bauer", "Costa", "Diallo", "Evans", "Fischer", "Garcia", "Hughes", "Ito", "Jensen",
+    "Kowalski", "Lopez", "Martin", "Nowak", "Okafor", "Pereira", "Rossi", "Silva", "Tanaka", "Usman",
+    "Vargas", "Walker", "Yilmaz", "Zhang"
+]
+
+CSV_FIELDS = ['name', 'team', 'position', 'scores', 'is_on_my_team', 'league_id']
+
+
+def season_weeks(seed, league):
+    """Pick the number of weeks played so far in a league's season"""
+    full_season = SEASON_WEEKS.get(league['name'], DEFAULT_SEASON_WEEKS)
+    rng = random.Random(f"{seed}:{league['name']}:season")
+    return rng.randint(max(1, full_season // 2), full_season)
+
+
+def generate_chunk(task):
+    """
+    Generate one chunk of players
+
+    Args:
+        task (tuple): (seed, league, chunk_index, start, count, weeks) where league is
+            a dict with 'id', 'name', 'positions' and 'teams'
+
+    Returns:
+        list: (name, team, position, scores_json, is_on_my_team, league_id) tuples
+    """
+    seed, league, chunk_index, start, count, weeks = task
+    rng = random.Random(f"{seed}:{league['name']}:{chunk_index}")
+    positions = league['positions']
+    teams = league['teams']
+    gauss = rng.gauss
+
+    rows = []
+    for index in range(start, start + count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index + 1}"
+
+        # Talent sets a player's typical score; most are average, a few are elite
+        talent = min(95.0, max(40.0, rng.gauss(72, 9)))
+        consistency = rng.uniform(4, 14)
+        # Some players joined mid-season or missed weeks
+        played = weeks if rng.random() > 0.1 else rng.randint(1, weeks)
+
+        scores = []
+        form = 0.0
+        for _ in range(played):
+            # Form carries over week to week, so good and bad runs cluster
+            form = 0.6 * form + gauss(0, consistency)
+            score = int(talent + form + 0.5)
+            scores.append(str(100 if score > 100 else 0 if score < 0 else score))
+
+        # Same text json.dumps() produces for a list of ints
+        rows.append((name, rng.choice(teams), rng.choice(positions),
+                     '[' + ', '.join(scores) + ']', False, league['id']))
+    return rows
+
+
+def build_tasks(leagues, players_per_league, seed, chunk_size):
+    tasks = []
+    for league in leagues:
+        weeks = season_weeks(seed, league)
+        for chunk_index, start in enumerate(range(0, players_per_league, chunk_size)):
+            count = min(chunk_size, players_per_league - start)
+            tasks.append((seed, league, chunk_index, start, count, weeks))
+    return tasks
+
+
+def iter_chunks(tasks, workers):
+    """Yield generated chunks in task order, building them across worker processes if requested"""
+    if workers <= 1:
+        for task in tasks:
+            yield generate_chunk(task)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(generate_chunk, tasks)
+
+
+class FileWriter:
+    """Write generated rows to a CSV or JSON Lines file"""
+
+    def __init__(self, path, file_format):
+        self.file_format = file_format
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        if file_format == 'csv':
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(CSV_FIELDS)
+
+    def write(self, rows):
+        if self.file_format == 'csv':
+            self.writer.writerows((name, team, position, scores, int(on_team), league_id)
+                                  for name, team, position, scores, on_team, league_id in rows)
+        else:
+            for row in rows:
+                record = dict(zip(CSV_FIELDS, row))
+                record['scores'] = json.loads(record['scores'])
+                self.file.write(json.dumps(record) + '\n')
+        return len(rows)
+
+    def close(self):
+        self.file.close()
+
+
+def read_player_file(path):
+    """Yield player rows from a CSV or JSON Lines file written by this script"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            for record in csv.DictReader(f):
+                yield (record['name'], record['team'], record['position'], record['scores'],
+                       record['is_on_my_team'] in ('1', 'True', 'true'), int(record['league_id']))
+        else:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield (record['name'], record['team'], record['position'], json.dumps(record['scores']),
+                           bool(record.get('is_on_my_team', False)), int(record['league_id']))
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_file(db, path, chunk_size):
+    """Bulk-load a generated CSV/JSONL file into the database"""
+    print(f"📥 Importing players from {path}...")
+    start = time.perf_counter()
+    total = 0
+    for batch in batched(read_player_file(path), chunk_size):
+        total += db.bulk_add_players(batch)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Imported {total} players in {elapsed:.1f}s")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reproducible synthetic players for load testing")
+    parser.add_argument('--db', default=os.path.join(PROJECT_ROOT, 'data', 'fantasy_players.db'),
+                        help='path to the SQLite database (league metadata is read from it)')
+    parser.add_argument('--players', type=int, default=10000, help='players to generate per league')
+    parser.add_argument('--leagues', help='comma-separated league names (default: all leagues)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed; same seed, same players')
+    parser.add_argument('--workers', type=int, default=1, help='processes used to generate chunks')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='players per chunk and per write')
+    parser.add_argument('--format', choices=['db', 'csv', 'jsonl'], default='db',
+                        help='write into the database (default) or to a file')
+    parser.add_argument('--output', help='output file for --format csv/jsonl')
+    parser.add_argument('--import', dest='import_path', help='load a CSV/JSONL file written by this script')
+    args = parser.parse_args()
+
+    db = Database(args.db)
+
+    if args.import_path:
+        import_file(db, args.import_path, args.chunk_size)
+        return 0
+
+    if args.format != 'db' and not args.output:
+        parser.error('--output is required with --format csv/jsonl')
+
+    leagues = db.get_all_leagues()
+    if args.leagues:
+        wanted = {name.strip().lower() for name in args.leagues.split(',')}
+        leagues = [league for league in leagues if league.name in wanted]
+        if not leagues:
+            print(f"❌ No leagues matching: {args.leagues}")
+            return 1
+
+    league_specs = [{
+        'id': league.id,
+        'name': league.name,
+        'positions': list(league.get_position_types()),
+        'teams': list(league.get_typical_teams())
+    } for league in leagues]
+
+    tasks = build_tasks(league_specs, args.players, args.seed, args.chunk_size)
+    target = args.output if args.format != 'db' else args.db
+    print(f"🎲 Generating {args.players} players x {len(league_specs)} leagues "
+          f"(seed {args.seed}, {args.workers} workers) -> {target}")
+
+    writer = FileWriter(args.output, args.format) if args.format != 'db' else None
+    start = time.perf_counter()
+    written = 0
+    try:
+        for rows in iter_chunks(tasks, args.workers):
+            written += writer.write(rows) if writer else db.bulk_add_players(rows)
+            print(f"   {written} players written ({time.perf_counter() - start:.1f}s)", end='\r')
+    finally:
+        if writer:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed else 0
+    print(f"\n✅ Wrote {written} players in {elapsed:.1f}s ({rate:,.0f} players/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
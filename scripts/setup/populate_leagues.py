@@ -207,27 +207,22 @@ def populate_all_leagues():
     print("=" * 50)
     
     # Check if any league already has players
-    f1_players = db.get_players_by_league(1)  # F1
-    epl_players = db.get_players_by_league(2)  # EPL  
-    ucl_players = db.get_players_by_league(3)  # UCL
-    nfl_players = db.get_players_by_league(4)  # NFL
-    
-    if len(f1_players) == 0:
+    if not db.league_has_players(1):  # F1
         create_f1_players(db)
     else:
         print("🏎️  Formula 1 players already exist, skipping...")
     
-    if len(epl_players) == 0:
+    if not db.league_has_players(2):  # EPL
         create_epl_players(db)
     else:
         print("⚽ EPL players already exist, skipping...")
     
-    if len(ucl_players) == 0:
+    if not db.league_has_players(3):  # UCL
         create_ucl_players(db)
     else:
         print("🏆 UCL players already exist, skipping...")
     
-    if len(nfl_players) == 0:
+    if not db.league_has_players(4):  # NFL
         create_nfl_players(db)
     else:
         print("🏈 NFL players already exist, skipping...")
@@ -237,10 +232,8 @@ def populate_all_leagues():
     
     # Show final statistics
     print("\n📊 Final League Statistics:")
-    leagues = db.get_all_leagues()
-    for league in leagues:
-        players = db.get_players_by_league(league.id)
-        print(f"{league.display_name:<25} | {len(players):>3} players")
+    for stats in db.get_league_stats():
+        print(f"{stats['league'].display_name:<25} | {stats['total_players']:>3} players")
 
 if __name__ == "__main__":
     try:
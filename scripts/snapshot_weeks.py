@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Weekly leaderboard snapshots for the Fantasy Sports App
+
+Records every player's rank and weighted score after each game week, which
+the rank history and movers APIs and the leaderboard's movement column read.
+Run it after loading a game week's scores (the web app also refreshes a few
+seconds after each write). The first run backfills the whole season; later
+runs rewrite weeks from the earliest one with changed scores (usually the
+still-open latest week) and add new weeks. --rebuild rewrites all weeks.
+
+Usage:
+    python scripts/snapshot_weeks.py [--league 2] [--rebuild]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database
+from src.core.snapshots import WeekSnapshotter
+
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Snapshot weekly leaderboard ranks")
+    parser.add_argument('--db', default=os.path.join(project_root, 'data', 'fantasy_players.db'),
+                        help='path to the SQLite database')
+    parser.add_argument('--league', type=int, action='append',
+                        help='only snapshot this league id (repeatable)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='rewrite every week instead of only changed and new ones')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 1
+
+    db = Database(args.db)
+    snapshotter = WeekSnapshotter(db)
+    leagues = [db.get_league_by_id(league_id) for league_id in args.league] if args.league else db.get_all_leagues()
+
+    for league in leagues:
+        if league is None:
+            print("❌ Unknown league id")
+            return 1
+        started = time.perf_counter()
+        week = snapshotter.refresh(league.id, args.rebuild)
+        print(f"📸 {league.display_name}: snapshots up to week {week} ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
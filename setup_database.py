@@ -25,15 +25,14 @@ def create_database():
     db = Database(db_path)
     
     # Test database
-    leagues = db.get_all_leagues()
-    print(f"✅ Database created successfully with {len(leagues)} leagues")
+    league_stats = db.get_league_stats()
+    print(f"✅ Database created successfully with {len(league_stats)} leagues")
     
     # Check if we need to populate
     total_players = 0
-    for league in leagues:
-        players = db.get_players_by_league(league.id)
-        total_players += len(players)
-        print(f"  {league.display_name}: {len(players)} players")
+    for stat in league_stats:
+        total_players += stat['total_players']
+        print(f"  {stat['league'].display_name}: {stat['total_players']} players")
     
     if total_players == 0:
         print("\n🔄 Database is empty. Run the populate script to add sample data:")
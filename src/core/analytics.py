@@ -0,0 +1,129 @@
+"""
+Team and position analytics for fantasy sports leagues
+
+A league is loaded into pandas once per data version: one row per player
+(team, position, games played, weighted final score) and one row per player
+and game week for the score history. Aggregates per team and per position are
+then computed with grouped, vectorized operations:
+- players: number of players in the group
+- mean, median, spread (standard deviation) and best of the final scores
+- depth: players whose final score is at least the league median
+- trend: change of the group's average game week score from the week before
+  the league's latest week to the latest week
+
+pandas is imported on first use, so the app starts without paying for it and
+runs without it (LeagueAnalytics.available() is False then).
+"""
+
+import importlib.util
+import json
+import threading
+from itertools import chain
+
+GROUPINGS = ('team', 'position')
+
+
+class LeagueAnalytics:
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): Source of player score histories
+        """
+        self.db = db
+        self._cache = {}  # league_id -> (data version, analytics)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available():
+        """Whether pandas is installed"""
+        return importlib.util.find_spec('pandas') is not None
+
+    def get_league_analytics(self, league_id):
+        """
+        Get a league's team and position aggregates, computed once per data version
+
+        Returns:
+            dict: {'league_id', 'version', 'players', 'latest_week', 'median',
+                   'teams': [...], 'positions': [...]}, groups sorted by mean final score
+        """
+        version = self.db.get_data_version()
+        with self._lock:
+            cached = self._cache.get(league_id)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        analytics = self.compute(self.db.get_league_score_rows(league_id))
+        analytics.update(league_id=league_id, version=version)
+        with self._lock:
+            self._cache[league_id] = (version, analytics)
+        return analytics
+
+    def compute(self, rows):
+        """Compute the aggregates from raw (id, team, position, scores JSON) rows"""
+        import numpy as np
+
+        players, weeks = self.load_frames(rows)
+        latest_week = int(weeks['week'].max()) if len(weeks) else 0
+        median = float(players['final_score'].median()) if len(players) else 0.0
+
+        # Average score of each group per game week, for the week-over-week trend
+        weeks = weeks.join(players[list(GROUPINGS)], on='player')
+        recent = weeks[weeks['week'] >= latest_week - 1]
+
+        analytics = {'players': len(players), 'latest_week': latest_week, 'median': median}
+        for key in GROUPINGS:
+            grouped = players.groupby(key, observed=True)
+            table = grouped['final_score'].agg(['size', 'mean', 'median', 'std', 'max'])
+            table.columns = ['players', 'mean', 'median', 'spread', 'best']
+            # A single player has no spread
+            table['spread'] = table['spread'].fillna(0.0)
+            table['depth'] = (players['final_score'] >= median).groupby(players[key], observed=True).sum()
+
+            weekly = recent.groupby([key, 'week'], observed=True)['score'].mean().unstack('week')
+            if latest_week > 1 and latest_week in weekly and latest_week - 1 in weekly:
+                table['trend'] = weekly[latest_week] - weekly[latest_week - 1]
+            else:
+                table['trend'] = np.nan
+
+            table = table.sort_values('mean', ascending=False).reset_index()
+            table[key] = table[key].astype(str)
+            # NaN (no score in one of the two weeks) becomes None/null
+            analytics[f'{key}s'] = table.astype(object).where(table.notna(), None).to_dict('records')
+        return analytics
+
+    @staticmethod
+    def load_frames(rows):
+        """
+        Build the player frame (indexed by row number) and the long per-week score frame
+
+        Returns:
+            tuple: (players with id, team, position, games, final_score;
+                    weeks with player, week, score)
+        """
+        import numpy as np
+        import pandas as pd
+
+        player_ids = [row[0] for row in rows]
+        histories = [json.loads(row[3]) if row[3] else [] for row in rows]
+        games = np.fromiter(map(len, histories), dtype=np.int64, count=len(histories))
+        total = int(games.sum())
+
+        # Flatten every history into one column; week numbers restart at 1 per player
+        player_index = np.repeat(np.arange(len(histories)), games)
+        week = np.arange(total) - np.repeat(np.cumsum(games) - games, games) + 1
+        score = np.fromiter(chain.from_iterable(histories), dtype=float, count=total)
+        weeks = pd.DataFrame({'player': player_index, 'week': week, 'score': score})
+
+        # Weighted final score (s1*1 + ... + sN*N) / (1 + ... + N), as in WeightedScoreCalculator
+        weighted_sum = np.bincount(player_index, weights=score * week, minlength=len(histories))
+        weight_sum = games * (games + 1) / 2
+        final_score = np.divide(weighted_sum, weight_sum, out=np.zeros(len(histories)), where=weight_sum > 0)
+
+        players = pd.DataFrame({
+            'id': np.array(player_ids, dtype=np.int64),
+            'team': pd.Categorical([row[1] for row in rows]),
+            'position': pd.Categorical([row[2] for row in rows]),
+            'games': games,
+            'final_score': final_score
+        })
+        return players, weeks
@@ -0,0 +1,305 @@
+"""
+Columnar league snapshots shared across worker processes
+
+Each league is exported to one file holding its players as columns, already
+in leaderboard order (final score, highest first):
+- ids, final_scores: one value per player
+- score_offsets, scores: every score history flattened into one array; the
+  scores of player i are scores[score_offsets[i]:score_offsets[i + 1]]
+- name_offsets, names: UTF-8 names packed the same way
+- team_codes, position_codes: indexes into the interned team and position
+  lists stored in the file header
+
+Scores are stored as 64-bit integers when every score in the league is an
+int, so they read back exactly as they were stored, and as doubles otherwise.
+
+Workers mmap the files read-only and view the columns as NumPy arrays (or
+memoryviews without NumPy) without copying, so every process reads the same
+pages from the OS page cache instead of holding its own copy of each league.
+NumPy is imported when the first file is mapped, not with this module. Only
+the mapping is shared: the views render Player objects, which to_players
+builds from the columns per request, so a read saves the database query and
+the score parsing and weighting, not the objects themselves.
+
+A file records the league version it was exported at (the data version of
+the league's newest change, see Database.get_league_version) and is only used
+while that is still the league's version, so writes to other leagues and
+roster toggles leave it in use. Exports write a temporary file and rename it
+over the old one, so readers see either the old or the new snapshot, never a
+partial one; a worker still reading the old file keeps its mapping until it
+maps the new one. Only one process exports at a time (see
+ColumnarSnapshots.schedule).
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+
+from .models import Player
+
+MAGIC = b'FSCOL001'
+# How long one process's claim on exporting lasts (see Database.claim_job)
+CLAIM_SECONDS = 600.0
+PREAMBLE = struct.Struct('<8sQ')  # magic, header length
+ALIGNMENT = 8
+
+# Column name -> array typecode (scores switch to 'q' for all-integer leagues)
+COLUMNS = {
+    'ids': 'q',
+    'final_scores': 'd',
+    'score_offsets': 'q',
+    'scores': 'd',
+    'name_offsets': 'q',
+    'names': 'B',
+    'team_codes': 'i',
+    'position_codes': 'i'
+}
+
+
+def data_end(header):
+    """Length a file with this header must have: the end of its last column"""
+    return max((offset + count * struct.calcsize(typecode) for typecode, offset, count in header['columns'].values()),
+               default=0)
+
+
+class LeagueSnapshot:
+    """Read-only view of one exported league file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.file_id = (stat.st_ino, stat.st_mtime_ns)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length = PREAMBLE.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"Not a columnar league snapshot: {path}")
+        header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_length])
+        if len(self._map) < data_end(header):
+            raise ValueError(f"Truncated columnar league snapshot: {path}")
+        self.league_id = header['league_id']
+        self.version = header['version']
+        self.teams = header['teams']
+        self.positions = header['positions']
+
+        try:
+            import numpy as np
+        except ImportError:  # NumPy is optional
+            np = None
+        view = memoryview(self._map)
+        for name, (typecode, offset, count) in header['columns'].items():
+            if np is not None:
+                column = np.frombuffer(self._map, dtype=np.dtype(typecode), count=count, offset=offset)
+            else:
+                column = view[offset:offset + count * struct.calcsize(typecode)].cast(typecode)
+            setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def name(self, index):
+        return bytes(self.names[self.name_offsets[index]:self.name_offsets[index + 1]]).decode('utf-8')
+
+    def player_scores(self, index):
+        return self.scores[self.score_offsets[index]:self.score_offsets[index + 1]].tolist()
+
+    def to_players(self, league=None, roster_ids=()):
+        """Build Player objects in leaderboard order, with final_score set (copies every column into them)"""
+        # Convert whole columns at once; per-element access to mapped arrays is slow
+        names = bytes(self.names)
+        name_offsets = self.name_offsets.tolist()
+        scores = self.scores.tolist()
+        score_offsets = self.score_offsets.tolist()
+        teams = [self.teams[code] for code in self.team_codes.tolist()]
+        positions = [self.positions[code] for code in self.position_codes.tolist()]
+
+        players = []
+        for index, (player_id, final_score) in enumerate(zip(self.ids.tolist(), self.final_scores.tolist())):
+            player = Player(names[name_offsets[index]:name_offsets[index + 1]].decode('utf-8'),
+                            teams[index], positions[index], scores[score_offsets[index]:score_offsets[index + 1]],
+                            player_id in roster_ids, self.league_id, player_id)
+            player.final_score = final_score
+            player.league = league
+            players.append(player)
+        return players
+
+
+def export_league(db, calculator, league_id, path):
+    """
+    Write one league's columnar snapshot to path, replacing any previous file atomically
+
+    Returns:
+        int: The league version the snapshot was exported at
+    """
+    # Read the version before the players, so a snapshot is never labelled
+    # newer than its data (at worst it is re-exported)
+    version = db.get_league_version(league_id)
+    players = db.get_players_by_league(league_id)
+    for player in players:
+        player.final_score = calculator.calculate_weighted_score(player.scores)
+    players.sort(key=lambda p: (-p.final_score, p.id))
+
+    teams = {}
+    positions = {}
+    integer_scores = all(type(score) is int for player in players for score in player.scores)
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    columns['scores'] = array('q' if integer_scores else 'd')
+    columns['score_offsets'].append(0)
+    columns['name_offsets'].append(0)
+    names = bytearray()
+    for player in players:
+        columns['ids'].append(player.id)
+        columns['final_scores'].append(player.final_score)
+        columns['scores'].extend(player.scores)
+        columns['score_offsets'].append(len(columns['scores']))
+        names += player.name.encode('utf-8')
+        columns['name_offsets'].append(len(names))
+        columns['team_codes'].append(teams.setdefault(player.team, len(teams)))
+        columns['position_codes'].append(positions.setdefault(player.position, len(positions)))
+    columns['names'] = array('B', names)
+
+    # Lay the columns out after the header, each aligned for its type
+    def layout(header_length):
+        offset = PREAMBLE.size + header_length
+        placed = {}
+        for name, column in columns.items():
+            offset += -offset % ALIGNMENT
+            placed[name] = (column.typecode, offset, len(column))
+            offset += len(column) * column.itemsize
+        return placed
+
+    header = {'league_id': league_id, 'version': version, 'teams': list(teams), 'positions': list(positions)}
+    # Column offsets depend on the header length, which depends on the offsets;
+    # padding the header to a fixed size settles it in one pass
+    draft = json.dumps(dict(header, columns=layout(0))).encode('utf-8')
+    header_length = len(draft) + 64
+    header_bytes = json.dumps(dict(header, columns=layout(header_length))).encode('utf-8').ljust(header_length)
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.league-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, header_length))
+            f.write(header_bytes)
+            for column in columns.values():
+                f.write(b'\0' * (-f.tell() % ALIGNMENT))
+                column.tofile(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return version
+
+
+class ColumnarSnapshots:
+    def __init__(self, db, calculator, directory, delay=1.0):
+        """
+        Args:
+            db (Database): Source of the exported players
+            calculator (WeightedScoreCalculator): Computes the stored final scores
+            directory (str): Where the league files live, shared by all workers
+            delay (float): Seconds after a write before watch() re-exports
+        """
+        self.db = db
+        self.calculator = calculator
+        self.directory = directory
+        self.delay = delay
+        self._snapshots = {}  # league_id -> mapped LeagueSnapshot
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def path(self, league_id):
+        return os.path.join(self.directory, f'league-{league_id}.col')
+
+    def get(self, league_id):
+        """Get a league's snapshot if it is at the league's current version, else None (and schedule an export)"""
+        version = self.db.get_league_version(league_id)
+        path = self.path(league_id)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.schedule()
+            return None
+
+        with self._lock:
+            snapshot = self._snapshots.get(league_id)
+            if snapshot is None or snapshot.file_id != (stat.st_ino, stat.st_mtime_ns):
+                try:
+                    snapshot = LeagueSnapshot(path)
+                    self._snapshots[league_id] = snapshot
+                except (OSError, ValueError, KeyError, struct.error) as e:
+                    print(f"Could not map columnar snapshot {path}: {e}")
+                    snapshot = None
+        if snapshot is None:
+            # E.g. a truncated file; get_file_version rejects it too, so it is re-exported
+            self.schedule()
+            return None
+
+        if snapshot.version != version:
+            # A newer file than our reads can see (e.g. the replica lags) needs no export
+            if snapshot.version < version:
+                self.schedule()
+            return None
+        return snapshot
+
+    def export(self, league_id):
+        """Export one league unless its file is already at the league's version; returns True if written"""
+        if self.get_file_version(league_id) == self.db.get_league_version(league_id):
+            return False
+        export_league(self.db, self.calculator, league_id, self.path(league_id))
+        return True
+
+    def export_all(self):
+        """Export every league that changed; returns the number of files written"""
+        return sum(self.export(league.id) for league in self.db.get_all_leagues())
+
+    def get_file_version(self, league_id):
+        """League version of a league's file on disk, or None if it is missing or damaged"""
+        try:
+            with open(self.path(league_id), 'rb') as f:
+                magic, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+                if magic != MAGIC:
+                    return None
+                header = json.loads(f.read(header_length))
+                if os.fstat(f.fileno()).st_size < data_end(header):
+                    return None
+                return header['version']
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+    def watch(self):
+        """Re-export changed leagues in the background, self.delay seconds after each burst of writes"""
+        self.db.add_change_listener(self.schedule)
+
+    def schedule(self):
+        """
+        Export changed leagues in a background thread after self.delay seconds, unless already pending
+
+        Every worker schedules after its own writes and on stale reads, but the
+        export runs under a claim in the database: while another process
+        exports, the others skip theirs (a read that still finds a stale file
+        schedules again).
+        """
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._run_scheduled)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _run_scheduled(self):
+        with self._lock:
+            self._timer = None
+        token = self.db.claim_job('columnar_export', CLAIM_SECONDS)
+        if token is None:
+            return
+        try:
+            self.export_all()
+        except Exception as e:
+            print(f"Columnar snapshot export failed: {e}")
+        finally:
+            self.db.release_job('columnar_export', token)
@@ -5,19 +5,218 @@ Uses SQLite for local storage of player data with multi-league support
 
 import sqlite3
 import json
-from .models import Player, League
+import math
+import threading
+import itertools
+import time
+import uuid
+from .models import Player, League, LEAGUE_REGISTRY, DEFAULT_LEAGUE_POSITIONS, DEFAULT_LEAGUE_TEAMS
+from .scoring import WeightedScoreCalculator
+
+# Computes the final_score stored with every write of a player's scores
+_calculator = WeightedScoreCalculator()
+
+
+def _final_score(scores):
+    """Weighted score to store with a player's scores; raises ValueError for NaN or infinite scores"""
+    # json.dumps writes them as NaN/Infinity, which SQLite's JSON functions reject
+    final_score = _calculator.calculate_weighted_score(scores)
+    if not math.isfinite(final_score):
+        raise ValueError('scores must be finite numbers')
+    return final_score
+
+# Weighted average (score1*1 + ... + scoreN*N) / (1 + ... + N) of a players row,
+# evaluated inside SQLite; format with the table alias of the players row
+WEIGHTED_SCORE_SQL = '''COALESCE((SELECT SUM(j.value * (j.key + 1)) * 2.0 / (COUNT(*) * (COUNT(*) + 1))
+                  FROM json_each({alias}.scores) AS j), 0.0)'''
+
+# Values accepted for PRAGMA synchronous by update_scores_batch
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# Roster owner when no user is given (console app, scripts, imports); rosters
+# from the old global is_on_my_team flag are migrated to this user
+DEFAULT_USER = 'default'
+
+# Player columns in Player.from_db order, with is_on_my_team answered from the
+# rosters table for one user; bind the user id before any other parameter
+PLAYER_COLUMNS_SQL = '''SELECT p.id, p.name, p.team, p.position, p.scores,
+       EXISTS(SELECT 1 FROM rosters r WHERE r.user_id = ? AND r.league_id = p.league_id AND r.player_id = p.id),
+       p.league_id'''
+
+# Sort keys accepted by query_players -> (SQL expression, descending by default)
+PLAYER_SORT_KEYS = {
+    'score': ('p.final_score', True),
+    'name': ('p.name', False),
+    'team': ('p.team', False),
+    'position': ('p.position', False),
+    'weeks': ('json_array_length(p.scores)', True),
+    'id': ('p.id', False)
+}
+
+
+# Shared in-memory databases for read replicas; the memdb VFS (SQLite 3.36+)
+# lets connections read concurrently, older versions fall back to shared cache
+if sqlite3.sqlite_version_info >= (3, 36, 0):
+    REPLICA_URI = 'file:/fantasy-replica-{}?vfs=memdb'
+    REPLICA_READ_ONLY = '&mode=ro'
+else:
+    REPLICA_URI = 'file:fantasy-replica-{}?mode=memory&cache=shared'
+    REPLICA_READ_ONLY = ''
+_replica_names = itertools.count(1)
 
 
 class Database:
-    def __init__(self, db_path='fantasy_players.db'):
+    def __init__(self, db_path='fantasy_players.db', lazy=False, replica=False, replica_poll=1.0, replica_delay=0.1,
+                 wal=False, busy_timeout=5.0):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file
+            lazy (bool): Defer schema setup and league loading until first use,
+                so constructing the object (e.g. at import time) touches no disk
+            replica (bool): Serve leaderboard and lookup reads from an in-memory
+                copy of the database, refreshed in the background after commits
+            replica_poll (float): Seconds between checks for commits made by
+                other processes, which the replica picks up on the next check
+            replica_delay (float): Seconds the background refresh waits after
+                a commit of this object, so a burst of writes costs one copy
+            wal (bool): Switch the file to write-ahead logging, so readers in
+                other processes never wait for a writer
+            busy_timeout (float): Seconds a connection waits for another
+                process's write lock before giving up with "database is locked"
+        """
         self.db_path = db_path
-        self.init_database()
+        self.wal = wal
+        self.busy_timeout = busy_timeout
+        self._league_cache = {}  # League objects by id, reloaded when another process adds a league
+        self._league_version = None  # Data version the league cache was loaded at
+        self._league_misses = set()  # Unknown league ids already looked up at _league_version
+        self._change_listeners = []
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._search_enabled = False  # Set once the FTS5 name index exists
+        self._replica_enabled = replica
+        self._replica_poll = replica_poll
+        self._replica_delay = replica_delay
+        self._replica_lock = threading.Lock()  # Guards swapping and connecting to the current copy
+        self._replica_copy_lock = threading.Lock()  # One copy at a time
+        self._replica_wake = threading.Event()  # Set by commits to wake the background refresh
+        self._replica_source = None  # Disk connection the replica is copied from
+        self._replica_keeper = None  # Holds the current in-memory copy open
+        self._replica_uri = None
+        self._replica_change_counter = None  # Source PRAGMA data_version at the last copy
+        self._replica_commits = 0  # Commits made through this object
+        self._replica_copied = 0  # Of those, the ones the current copy includes
+        if not lazy:
+            self.init_database()
+    
+    def _ensure_initialized(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self.init_database()
+    
+    def _connect(self):
+        """Open a connection, initializing the database on first use"""
+        self._ensure_initialized()
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+    
+    def _read(self):
+        """Open a connection for queries: to the read replica if enabled and current, otherwise to the file"""
+        if not self._replica_enabled:
+            return self._connect()
+        if self._replica_uri is None:
+            self._ensure_initialized()
+            self.refresh_replica()
+        with self._replica_lock:
+            # Connecting under the lock keeps a refresh from closing the copy
+            # in between; once connected, the copy lives until we close it
+            if self._replica_copied == self._replica_commits:
+                return sqlite3.connect(self._replica_uri + REPLICA_READ_ONLY, uri=True)
+        # Until the background refresh has copied this object's own commits,
+        # read them from the file
+        return self._connect()
+    
+    # Read Replica
+    def refresh_replica(self):
+        """
+        Copy the database file into a new in-memory replica if anything was committed since the last copy
+        
+        The copy is made with the sqlite3 backup API into a fresh in-memory
+        database, then swapped in; queries already running finish on the old
+        copy, so readers never wait for a refresh or for writers. Commits from
+        this object only mark the replica stale (see _replica_changed): the
+        copy is made by a background thread, and until then this object's
+        reads go to the file, so a write is still visible to the reads that
+        follow it.
+        
+        Returns:
+            bool: True if a new copy was made
+        """
+        if not self._replica_enabled:
+            return False
+        
+        with self._replica_copy_lock:
+            with self._replica_lock:
+                commits = self._replica_commits
+            start_poller = self._replica_source is None
+            if start_poller:
+                self._replica_source = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                                       check_same_thread=False)
+            source = self._replica_source
+            
+            # Changes whenever another connection commits to the file
+            change_counter = source.execute('PRAGMA data_version').fetchone()[0]
+            if self._replica_uri is not None and change_counter == self._replica_change_counter:
+                with self._replica_lock:
+                    self._replica_copied = commits
+                return False
+            
+            uri = REPLICA_URI.format(next(_replica_names))
+            replica = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            source.backup(replica)
+            
+            with self._replica_lock:
+                old = self._replica_keeper
+                self._replica_keeper = replica
+                self._replica_uri = uri
+                self._replica_copied = commits
+            self._replica_change_counter = change_counter
+            if old is not None:
+                # Readers still connected to the old copy keep it alive until they close
+                old.close()
+        
+        if start_poller:
+            threading.Thread(target=self._poll_replica, name='replica-poll', daemon=True).start()
+        return True
+    
+    def _replica_changed(self):
+        """Note a commit made through this object and wake the background refresh"""
+        if not self._replica_enabled:
+            return
+        with self._replica_lock:
+            self._replica_commits += 1
+        self._replica_wake.set()
+    
+    def _poll_replica(self):
+        while True:
+            if self._replica_wake.wait(self._replica_poll or None):
+                # Let a burst of commits settle into one copy
+                time.sleep(self._replica_delay)
+            self._replica_wake.clear()
+            try:
+                self.refresh_replica()
+            except sqlite3.Error as e:
+                print(f"Read replica refresh failed: {e}")
     
     def init_database(self):
         """Initialize the database with the players and leagues tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with sqlite3.connect(self.db_path, timeout=self.busy_timeout) as conn:
             cursor = conn.cursor()
             
+            # The journal mode is stored in the file, so this is a no-op once set
+            if self.wal:
+                cursor.execute('PRAGMA journal_mode = WAL')
+            
             # Create leagues table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS leagues (
@@ -40,12 +239,84 @@ class Database:
                     position TEXT NOT NULL,
                     scores TEXT NOT NULL,
                     final_score REAL DEFAULT 0.0,
-                    is_on_my_team BOOLEAN DEFAULT 0,
+                    is_on_my_team BOOLEAN DEFAULT 0,  -- Superseded by rosters; kept for old databases
                     league_id INTEGER DEFAULT 1,
                     UNIQUE(name, league_id)
                 )
             ''')
             
+            # Single-row counter bumped once per committed mutation or batch of
+            # players or leagues (roster toggles bump roster_versions instead),
+            # used by caches to detect stale data
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS data_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            cursor.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+            
+            # Append-only change journal; each entry holds the full row after the
+            # change so mirrors can sync with /api/changes?since=<version>. Roster
+            # status is per manager and versioned in roster_versions instead
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS player_changes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    version INTEGER NOT NULL,
+                    league_id INTEGER,
+                    player_id INTEGER,
+                    op TEXT NOT NULL,
+                    name TEXT,
+                    team TEXT,
+                    position TEXT,
+                    scores TEXT
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_player_changes_version ON player_changes(version)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_player_changes_player ON player_changes(player_id, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_player_changes_league ON player_changes(league_id, version)')
+            self._init_rosters(cursor)
+            self._init_query_indexes(cursor)
+            
+            # Resume points of the score recompute job (scripts/recompute_scores.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS recompute_checkpoints (
+                    job TEXT PRIMARY KEY,
+                    last_id INTEGER NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Background jobs claimed by one process at a time (see claim_job)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS job_claims (
+                    job TEXT PRIMARY KEY,
+                    token TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            
+            # Per-week leaderboard history: rank and weighted score of every player
+            # after each game week, plus how far each league has been snapshotted
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+                    league_id INTEGER NOT NULL,
+                    week INTEGER NOT NULL,
+                    player_id INTEGER NOT NULL,
+                    rank INTEGER NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (league_id, week, player_id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_player ON leaderboard_snapshots(player_id, week)')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS snapshot_state (
+                    league_id INTEGER PRIMARY KEY,
+                    week INTEGER NOT NULL,
+                    version INTEGER NOT NULL
+                )
+            ''')
+            
             # Initialize default leagues if empty
             cursor.execute('SELECT COUNT(*) FROM leagues')
             if cursor.fetchone()[0] == 0:
@@ -60,254 +331,1435 @@ class Database:
                     VALUES (?, ?, ?, ?, ?)
                 ''', leagues_data)
             
+            # Create league metadata tables (positions and teams per league)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS league_positions (
+                    league_id INTEGER NOT NULL,
+                    position TEXT NOT NULL,
+                    sort_order INTEGER NOT NULL,
+                    PRIMARY KEY (league_id, position)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS league_teams (
+                    league_id INTEGER NOT NULL,
+                    team TEXT NOT NULL,
+                    sort_order INTEGER NOT NULL,
+                    PRIMARY KEY (league_id, team)
+                )
+            ''')
+            
+            # Seed metadata for built-in leagues that have none yet
+            cursor.execute('''
+                SELECT id, name FROM leagues
+                WHERE id NOT IN (SELECT league_id FROM league_positions)
+            ''')
+            for league_id, name in cursor.fetchall():
+                self._insert_league_metadata(cursor, league_id,
+                                             DEFAULT_LEAGUE_POSITIONS.get(name, ()),
+                                             DEFAULT_LEAGUE_TEAMS.get(name, ()))
+            
+            self._search_enabled = self._init_search_index(cursor)
             conn.commit()
+            self._load_league_metadata(cursor)
+        self._initialized = True
     
     # League Operations
+    def _load_league_metadata(self, cursor):
+        """Load every league and its positions/teams into the shared registry"""
+        cursor.execute('SELECT league_id, position FROM league_positions ORDER BY league_id, sort_order')
+        positions = {}
+        for league_id, position in cursor.fetchall():
+            positions.setdefault(league_id, []).append(position)
+        
+        cursor.execute('SELECT league_id, team FROM league_teams ORDER BY league_id, sort_order')
+        teams = {}
+        for league_id, team in cursor.fetchall():
+            teams.setdefault(league_id, []).append(team)
+        
+        cursor.execute('SELECT id, name, display_name, sport_type, description, scoring_system FROM leagues ORDER BY id')
+        leagues = {}
+        for row in cursor.fetchall():
+            league = League(row[0], row[1], row[2], row[3], row[4], row[5]).freeze()
+            LEAGUE_REGISTRY.register(league.name, positions.get(league.id, ()), teams.get(league.id, ()))
+            leagues[league.id] = league
+        self._league_cache = leagues
+        self._league_version = self._read_version(cursor)
+        self._league_misses = set()
+    
+    def _sync_leagues(self):
+        """Reload the league cache if the data changed since it was loaded, e.g. a league added by another worker"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if self._read_version(cursor) != self._league_version:
+                self._load_league_metadata(cursor)
+    
+    def _insert_league_metadata(self, cursor, league_id, positions, teams):
+        cursor.executemany('INSERT OR IGNORE INTO league_positions (league_id, position, sort_order) VALUES (?, ?, ?)',
+                           [(league_id, position, i) for i, position in enumerate(positions)])
+        cursor.executemany('INSERT OR IGNORE INTO league_teams (league_id, team, sort_order) VALUES (?, ?, ?)',
+                           [(league_id, team, i) for i, team in enumerate(teams)])
+    
+    def _init_rosters(self, cursor):
+        """
+        Create the per-user rosters table, migrating the old global is_on_my_team flag
+
+        The primary key (user_id, league_id, player_id) serves both a user's
+        team in a league (a key range) and the availability anti-join (a key
+        lookup per player); idx_rosters_player lets player deletes clean up.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'rosters'")
+        exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rosters (
+                user_id TEXT NOT NULL,
+                league_id INTEGER NOT NULL,
+                player_id INTEGER NOT NULL,
+                PRIMARY KEY (user_id, league_id, player_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_rosters_player ON rosters(player_id)')
+        # Per-user counter bumped by roster toggles, which leave data_version alone
+        # so picking a player does not invalidate every league's cached data
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS roster_versions (
+                user_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS players_rosters_delete AFTER DELETE ON players BEGIN
+                DELETE FROM rosters WHERE player_id = old.id;
+            END
+        ''')
+        
+        if not exists:
+            cursor.execute('''
+                INSERT INTO rosters (user_id, league_id, player_id)
+                SELECT ?, league_id, id FROM players WHERE is_on_my_team = 1
+            ''', (DEFAULT_USER,))
+            cursor.execute('UPDATE players SET is_on_my_team = 0 WHERE is_on_my_team = 1')
+    
+    def _init_query_indexes(self, cursor):
+        """
+        Index players for query_players, backfilling final_score on databases that predate it
+
+        Every write path stores the weighted final score next to the scores (see
+        _insert_player and _update_scores), so score filters and sorts read a
+        column through (league, [team | position,] final_score) indexes instead
+        of evaluating every score history. idx_players_league_score also serves
+        plain league lookups, so the older single-column league index is dropped.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_players_league_score'")
+        if cursor.fetchone() is None:
+            # Rows written with NaN or infinite scores before they were rejected keep 0
+            cursor.execute(f"UPDATE players SET final_score = {WEIGHTED_SCORE_SQL.format(alias='players')} "
+                           "WHERE json_valid(scores)")
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_players_league_score ON players(league_id, final_score)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_players_league_team ON players(league_id, team, final_score)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_players_league_position ON players(league_id, position, final_score)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_players_league_facets ON players(league_id, team, position, final_score)')
+        cursor.execute('DROP INDEX IF EXISTS idx_players_league')
+
+    def _init_search_index(self, cursor):
+        """
+        Create the player name/team search index and the triggers that keep it in sync
+
+        Uses an FTS5 table with the trigram tokenizer over the players table, so
+        any substring of three or more characters is an indexed lookup. Returns
+        False if this SQLite build lacks FTS5; search then falls back to LIKE.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'player_search'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS player_search USING fts5(
+                    name, team, content='players', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"Player search index unavailable ({e}); using unindexed search")
+            return False
+        
+        # Per-trigram document counts, used to pick selective trigrams for fuzzy search
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS player_search_vocab USING fts5vocab(player_search, 'row')")
+        
+        # Triggers cover every write path, including bulk inserts and delete_all_players
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS players_search_insert AFTER INSERT ON players BEGIN
+                INSERT INTO player_search (rowid, name, team) VALUES (new.id, new.name, new.team);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS players_search_delete AFTER DELETE ON players BEGIN
+                INSERT INTO player_search (player_search, rowid, name, team) VALUES ('delete', old.id, old.name, old.team);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS players_search_update AFTER UPDATE OF name, team ON players BEGIN
+                INSERT INTO player_search (player_search, rowid, name, team) VALUES ('delete', old.id, old.name, old.team);
+                INSERT INTO player_search (rowid, name, team) VALUES (new.id, new.name, new.team);
+            END
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_players_name_nocase ON players(name COLLATE NOCASE)')
+        
+        # Index players that existed before the search index did
+        if not exists:
+            cursor.execute("INSERT INTO player_search (player_search) VALUES ('rebuild')")
+        return True
+    
     def get_all_leagues(self):
         """Get all available leagues"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, name, display_name, sport_type, description, scoring_system FROM leagues ORDER BY id')
-            rows = cursor.fetchall()
-            
-            leagues = []
-            for row in rows:
-                league = League(row[0], row[1], row[2], row[3], row[4], row[5])
-                leagues.append(league)
-            
-            return leagues
+        self._ensure_initialized()
+        self._sync_leagues()
+        return list(self._league_cache.values())
     
     def get_league_by_id(self, league_id):
         """Get a specific league by ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, name, display_name, sport_type, description, scoring_system FROM leagues WHERE id = ?', (league_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return League(row[0], row[1], row[2], row[3], row[4], row[5])
-            return None
+        self._ensure_initialized()
+        league = self._league_cache.get(league_id)
+        if league is None and league_id not in self._league_misses:
+            # Possibly added by another process since the cache was loaded; an id
+            # still unknown is not looked up again until the next reload
+            self._sync_leagues()
+            league = self._league_cache.get(league_id)
+            if league is None:
+                self._league_misses.add(league_id)
+        return league
     
     def get_league_by_name(self, name):
         """Get a specific league by name"""
-        with sqlite3.connect(self.db_path) as conn:
+        self._ensure_initialized()
+        for attempt in range(2):
+            for league in self._league_cache.values():
+                if league.name == name:
+                    return league
+            if attempt == 0:
+                self._sync_leagues()
+        return None
+    
+    def add_league(self, name, display_name, sport_type, positions, teams, description='', scoring_system='weighted'):
+        """Add a custom league with its positions and teams"""
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT id, name, display_name, sport_type, description, scoring_system FROM leagues WHERE name = ?', (name,))
-            row = cursor.fetchone()
             
-            if row:
-                return League(row[0], row[1], row[2], row[3], row[4], row[5])
-            return None
+            try:
+                cursor.execute('''
+                    INSERT INTO leagues (name, display_name, sport_type, description, scoring_system)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (name, display_name, sport_type, description, scoring_system))
+            except sqlite3.IntegrityError:
+                print(f"League {name} already exists!")
+                return None
+            
+            league_id = cursor.lastrowid
+            self._insert_league_metadata(cursor, league_id, positions, teams)
+            # Journaled so /api/changes consumers learn about the league
+            cursor.execute('''
+                INSERT INTO player_changes (version, league_id, op, name)
+                SELECT version + 1, ?, 'league', ? FROM data_version WHERE id = 1
+            ''', (league_id, name))
+            self._bump_version(cursor)
+            conn.commit()
+            self._load_league_metadata(cursor)
+            self._notify_change_listeners()
+            return self.get_league_by_name(name)
     
-    def add_player(self, player):
-        """Add a new player to the database"""
-        with sqlite3.connect(self.db_path) as conn:
+    def league_has_players(self, league_id):
+        """Check whether a league has any players without loading them"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT EXISTS(SELECT 1 FROM players WHERE league_id = ?)', (league_id,))
+            return bool(cursor.fetchone()[0])
+    
+    def has_empty_league(self):
+        """Check whether any league has no players, using indexed EXISTS probes"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT EXISTS(
+                    SELECT 1 FROM leagues l
+                    WHERE NOT EXISTS (SELECT 1 FROM players p WHERE p.league_id = l.id)
+                )
+            ''')
+            return bool(cursor.fetchone()[0])
+    
+    def get_league_stats(self, user_id=DEFAULT_USER):
+        """Get per-league player totals, a user's roster counts, mean weighted score and week counts in one query"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            # Scores are averaged inside SQLite from the stored final scores, so no
+            # player rows reach Python; rows with scores SQLite cannot parse
+            # (NaN from before such scores were rejected) count no weeks
+            cursor.execute('''
+                SELECT l.id, l.name, l.display_name, l.sport_type, l.description, l.scoring_system,
+                       COUNT(p.id),
+                       (SELECT COUNT(*) FROM rosters r WHERE r.user_id = ? AND r.league_id = l.id),
+                       AVG(p.final_score),
+                       COALESCE(MAX(json_array_length(CASE WHEN json_valid(p.scores) THEN p.scores END)), 0)
+                FROM leagues l
+                LEFT JOIN players p ON p.league_id = l.id
+                GROUP BY l.id
+                ORDER BY l.id
+            ''', (user_id,))
+            rows = cursor.fetchall()
+
+            stats = []
+            for row in rows:
+                stats.append({
+                    'league': League(row[0], row[1], row[2], row[3], row[4], row[5]),
+                    'total_players': row[6],
+                    'my_team_players': row[7],
+                    'average_score': row[8] or 0.0,
+                    'weeks': row[9]
+                })
+
+            return stats
+
+    def add_player(self, player, user_id=DEFAULT_USER):
+        """Add a new player to the database (and to user_id's roster if player.is_on_my_team)"""
+        with self._connect() as conn:
             cursor = conn.cursor()
-            scores_json = json.dumps(player.scores)
             
             try:
-                cursor.execute('''
-                    INSERT INTO players (name, team, position, scores, final_score, is_on_my_team, league_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (player.name, player.team, player.position, scores_json, player.final_score, player.is_on_my_team, player.league_id))
+                self._insert_player(cursor, player, user_id)
+                self._bump_version(cursor)
                 conn.commit()
+                self._notify_change_listeners()
                 return True
             except sqlite3.IntegrityError:
                 print(f"Player {player.name} already exists in this league!")
                 return False
     
-    def get_all_players(self, league_id=None):
+    def get_all_players(self, league_id=None, user_id=DEFAULT_USER):
         """Retrieve all players from the database, optionally filtered by league"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read() as conn:
             cursor = conn.cursor()
             
             if league_id:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE league_id = ?', (league_id,))
+                cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE p.league_id = ?', (user_id, league_id))
             else:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players')
+                cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p', (user_id,))
                 
             rows = cursor.fetchall()
             
             players = []
             for row in rows:
-                name, team, position, scores_json, is_on_my_team, player_league_id = row
-                scores = json.loads(scores_json)
-                player = Player(name, team, position, scores, bool(is_on_my_team), player_league_id)
-                
-                # Populate league information
-                player.league = self.get_league_by_id(player_league_id)
+                player = Player.from_db(*row, league=self.get_league_by_id(row[-1]))
                 players.append(player)
             
             return players
     
-    def get_players_by_league(self, league_id):
+    def get_players_by_league(self, league_id, user_id=DEFAULT_USER):
         """Get all players in a specific league"""
-        return self.get_all_players(league_id)
+        return self.get_all_players(league_id, user_id)
     
-    def get_player_by_name(self, name, league_id=None):
+    def get_league_score_rows(self, league_id):
+        """Get raw (id, team, position, scores JSON) rows of a league, for bulk analytics without Player objects"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, team, position, scores FROM players WHERE league_id = ?', (league_id,))
+            return cursor.fetchall()
+    
+    def get_player_by_name(self, name, league_id=None, user_id=DEFAULT_USER):
         """Get a specific player by name, optionally within a specific league"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._read() as conn:
             cursor = conn.cursor()
             
             if league_id:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE name = ? AND league_id = ?', (name, league_id))
+                cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE p.name = ? AND p.league_id = ?',
+                               (user_id, name, league_id))
             else:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE name = ?', (name,))
+                cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE p.name = ?', (user_id, name))
                 
             row = cursor.fetchone()
             
             if row:
-                name, team, position, scores_json, is_on_my_team, player_league_id = row
-                scores = json.loads(scores_json)
-                player = Player(name, team, position, scores, bool(is_on_my_team), player_league_id)
-                
-                # Populate league information
-                player.league = self.get_league_by_id(player_league_id)
+                player = Player.from_db(*row, league=self.get_league_by_id(row[-1]))
                 return player
             return None
     
-    def update_player_scores(self, name, new_scores):
-        """Update a player's scores"""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_player_by_id(self, player_id, user_id=DEFAULT_USER):
+        """Get a specific player by primary key"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE p.id = ?', (user_id, player_id))
+            row = cursor.fetchone()
+
+            if row:
+                player = Player.from_db(*row, league=self.get_league_by_id(row[-1]))
+                return player
+            return None
+
+    def get_players_by_ids(self, player_ids, user_id=DEFAULT_USER):
+        """Get several players in one query, in the order requested (unknown ids are skipped)"""
+        player_ids = list(dict.fromkeys(player_ids))
+        if not player_ids:
+            return []
+        
+        with self._read() as conn:
+            cursor = conn.cursor()
+            placeholders = ', '.join('?' for _ in player_ids)
+            cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE p.id IN ({placeholders})',
+                           [user_id] + player_ids)
+            found = {row[0]: Player.from_db(*row, league=self.get_league_by_id(row[-1]))
+                     for row in cursor.fetchall()}
+        
+        return [found[player_id] for player_id in player_ids if player_id in found]
+
+    def search_players(self, query, league_id=None, limit=20, user_id=DEFAULT_USER):
+        """
+        Search players by name or team, best matches first
+
+        Exact names rank first, then name prefixes, word prefixes, other name
+        substrings and team matches. If those leave room under the limit,
+        names sharing most of the query's trigrams follow, so small typos
+        still find the player. Every step is an index lookup with a LIMIT,
+        so the cost does not grow with the size of the league.
+
+        Args:
+            query (str): Text to look for (case-insensitive)
+            league_id (int): Only return players of this league
+            limit (int): Maximum number of players returned
+            user_id (str): Whose roster is_on_my_team refers to
+
+        Returns:
+            list: Player objects
+        """
+        query = ' '.join(query.split()).lower()
+        if not query or limit < 1:
+            return []
+
+        # Unary + keeps SQLite from driving the lookups through a league index,
+        # which would visit every player of the league instead of stopping at LIMIT
+        league_filter = ' AND +p.league_id = ?' if league_id else ''
+        league_args = (league_id,) if league_id else ()
+        # Fetch extra candidates so the re-ranking below can promote better matches
+        candidates = limit * 5
+
+        with self._read() as conn:
+            cursor = conn.cursor()
+            if not self._search_enabled:
+                pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                cursor.execute(f'''
+                    {PLAYER_COLUMNS_SQL} FROM players p
+                    WHERE (p.name LIKE ? ESCAPE '\\' OR p.team LIKE ? ESCAPE '\\'){league_filter}
+                    LIMIT ?
+                ''', (user_id, pattern, pattern, *league_args, candidates))
+                rows = cursor.fetchall()
+            else:
+                # Name prefixes (and the exact name) come straight off the NOCASE index
+                cursor.execute(f'''
+                    {PLAYER_COLUMNS_SQL} FROM players p
+                    WHERE p.name COLLATE NOCASE >= ? AND p.name COLLATE NOCASE < ?{league_filter}
+                    ORDER BY p.name COLLATE NOCASE
+                    LIMIT ?
+                ''', (user_id, query, query + '\uffff', *league_args, candidates))
+                rows = cursor.fetchall()
+
+                # Substrings of name or team need the trigram index (three or more characters)
+                if len(query) >= 3 and len(rows) < candidates:
+                    found = {row[0] for row in rows}
+                    cursor.execute(f'''
+                        {PLAYER_COLUMNS_SQL} FROM player_search s JOIN players p ON p.id = s.rowid
+                        WHERE player_search MATCH ?{league_filter}
+                        LIMIT ?
+                    ''', (user_id, self._fts_phrase(query), *league_args, candidates))
+                    rows.extend(row for row in cursor.fetchall() if row[0] not in found)
+
+                if len(query) >= 3 and len(rows) < limit:
+                    rows.extend(self._fuzzy_match_players(cursor, query, league_filter, (user_id,), league_args,
+                                                          {row[0] for row in rows}))
+
+        def match_quality(row):
+            name = row[1].lower()
+            if name == query:
+                return 0
+            if name.startswith(query):
+                return 1
+            if f' {query}' in name:
+                return 2
+            if query in name:
+                return 3
+            if query in row[2].lower():
+                return 4
+            return 5
+
+        # sorted() is stable, so fuzzy matches keep their closeness order
+        rows = sorted(rows, key=match_quality)[:limit]
+        return [Player.from_db(*row, league=self.get_league_by_id(row[-1])) for row in rows]
+
+    def _fuzzy_match_players(self, cursor, query, league_filter, user_args, league_args, exclude, scan=2000):
+        """Players whose names share at least half of the query's trigrams, closest first"""
+        trigrams = {query[i:i + 3] for i in range(len(query) - 2)}
+
+        # Candidates must contain two of the rarest trigrams that occur at all;
+        # a typo only removes the few trigrams that overlap it
+        placeholders = ', '.join('?' for _ in trigrams)
+        cursor.execute(f'SELECT term FROM player_search_vocab WHERE term IN ({placeholders}) ORDER BY doc LIMIT 5',
+                       tuple(trigrams))
+        selective = [self._fts_phrase(row[0]) for row in cursor.fetchall()]
+        if len(selective) < 2:
+            return []
+        pairs = ' OR '.join(f'({first} AND {second})' for i, first in enumerate(selective)
+                            for second in selective[i + 1:])
+
+        cursor.execute(f'''
+            {PLAYER_COLUMNS_SQL} FROM player_search s JOIN players p ON p.id = s.rowid
+            WHERE player_search MATCH ?{league_filter}
+            LIMIT ?
+        ''', (*user_args, pairs, *league_args, scan))
+
+        matches = []
+        for row in cursor.fetchall():
+            name = row[1].lower()
+            shared = sum(1 for trigram in trigrams if trigram in name)
+            if row[0] not in exclude and shared * 2 >= len(trigrams):
+                matches.append((-shared / len(trigrams), len(name), row))
+        matches.sort(key=lambda match: match[:2])
+        return [row for _, _, row in matches]
+
+    @staticmethod
+    def _fts_phrase(text):
+        """Quote text as an FTS5 phrase, which the trigram tokenizer matches as a substring"""
+        return '"' + text.replace('"', '""') + '"'
+
+    def get_player_rank(self, player_id):
+        """
+        Get a player's leaderboard position within their league, or None if the player does not exist
+
+        Counts the players ahead in leaderboard order (final score descending,
+        ties by id) through idx_players_league_score, so it matches the row
+        numbering of the leaderboard without reading any score history.
+        """
+        with self._read() as conn:
             cursor = conn.cursor()
-            scores_json = json.dumps(new_scores)
-            
             cursor.execute('''
-                UPDATE players 
-                SET scores = ? 
-                WHERE name = ?
-            ''', (scores_json, name))
-            
-            conn.commit()
-            return cursor.rowcount > 0
+                SELECT 1 + (SELECT COUNT(*) FROM players o
+                            WHERE o.league_id = p.league_id AND o.final_score > p.final_score)
+                         + (SELECT COUNT(*) FROM players o
+                            WHERE o.league_id = p.league_id AND o.final_score = p.final_score AND o.id < p.id)
+                FROM players p
+                WHERE p.id = ?
+            ''', (player_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
     
-    def update_player_info(self, original_name, new_name, new_team, new_position, new_scores):
+    def update_player_scores(self, player_id, new_scores):
+        """Update a player's scores"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            updated = self._update_scores(cursor, player_id, new_scores)
+            if updated:
+                self._bump_version(cursor)
+
+            conn.commit()
+            if updated:
+                self._notify_change_listeners()
+            return updated
+
+    def update_scores_batch(self, updates, synchronous=None):
+        """
+        Write many players' scores in one transaction, under one version bump
+
+        Args:
+            updates (iterable): (player_id, scores) pairs; unknown ids are skipped
+            synchronous (str): Optional SQLite synchronous level for this commit
+                ('OFF', 'NORMAL', 'FULL' or 'EXTRA'), trading durability for speed
+
+        Returns:
+            int: Number of players updated
+        """
+        if synchronous is not None and synchronous.upper() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unknown synchronous level: {synchronous}")
+
+        with self._connect() as conn:
+            if synchronous is not None:
+                conn.execute(f'PRAGMA synchronous = {synchronous.upper()}')
+            cursor = conn.cursor()
+            updated = 0
+            for player_id, new_scores in updates:
+                updated += self._update_scores(cursor, player_id, new_scores)
+            if updated:
+                self._bump_version(cursor)
+
+            conn.commit()
+            if updated:
+                self._notify_change_listeners()
+            return updated
+
+    def update_player_info(self, player_id, new_name, new_team, new_position, new_scores):
         """Update all player information"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             scores_json = json.dumps(new_scores)
-            
-            cursor.execute('''
-                UPDATE players 
-                SET name = ?, team = ?, position = ?, scores = ?
-                WHERE name = ?
-            ''', (new_name, new_team, new_position, scores_json, original_name))
-            
+
+            try:
+                cursor.execute('''
+                    UPDATE players
+                    SET name = ?, team = ?, position = ?, scores = ?, final_score = ?
+                    WHERE id = ?
+                ''', (new_name, new_team, new_position, scores_json,
+                      _final_score(new_scores), player_id))
+            except sqlite3.IntegrityError:
+                print(f"Player {new_name} already exists in this league!")
+                return False
+
+            updated = cursor.rowcount > 0
+            if updated:
+                self._journal_player(cursor, 'update', player_id)
+                self._bump_version(cursor)
+
             conn.commit()
-            return cursor.rowcount > 0
-    
-    def toggle_my_team_status(self, name):
-        """Toggle whether a player is on my team or not"""
-        with sqlite3.connect(self.db_path) as conn:
+            if updated:
+                self._notify_change_listeners()
+            return updated
+
+    def toggle_my_team_status(self, player_id, user_id=DEFAULT_USER):
+        """Toggle whether a player is on a user's team or not"""
+        with self._connect() as conn:
             cursor = conn.cursor()
-            
-            # Get current status
-            cursor.execute('SELECT is_on_my_team FROM players WHERE name = ?', (name,))
-            row = cursor.fetchone()
-            if not row:
-                return False
-            
-            current_status = bool(row[0])
-            new_status = not current_status
-            
-            # Update status
-            cursor.execute('''
-                UPDATE players 
-                SET is_on_my_team = ?
-                WHERE name = ?
-            ''', (new_status, name))
-            
+            toggled = self._toggle_my_team(cursor, player_id, user_id)
             conn.commit()
-            return cursor.rowcount > 0
-    
-    def get_my_team_players(self, league_id=None):
-        """Get all players currently on my team, optionally filtered by league"""
-        with sqlite3.connect(self.db_path) as conn:
+            if toggled:
+                # Only the user's roster version changed, which no listener follows
+                self._replica_changed()
+            return toggled
+
+    def get_my_team_players(self, league_id=None, user_id=DEFAULT_USER):
+        """Get all players currently on a user's team, optionally filtered by league"""
+        with self._read() as conn:
             cursor = conn.cursor()
             
-            if league_id:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE is_on_my_team = 1 AND league_id = ?', (league_id,))
-            else:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE is_on_my_team = 1')
+            # Walks the user's primary key range in rosters, then players by id
+            league_filter = ' AND r.league_id = ?' if league_id else ''
+            cursor.execute(f'''
+                SELECT p.id, p.name, p.team, p.position, p.scores, 1, p.league_id
+                FROM rosters r JOIN players p ON p.id = r.player_id
+                WHERE r.user_id = ?{league_filter}
+            ''', (user_id, league_id) if league_id else (user_id,))
             
             rows = cursor.fetchall()
             
             players = []
             for row in rows:
-                name, team, position, scores_json, is_on_my_team, player_league_id = row
-                scores = json.loads(scores_json)
-                player = Player(name, team, position, scores, bool(is_on_my_team), player_league_id)
-                player.league = self.get_league_by_id(player_league_id)
+                player = Player.from_db(*row, league=self.get_league_by_id(row[-1]))
                 players.append(player)
             
             return players
     
-    def get_available_players(self, league_id=None):
-        """Get all players not currently on my team, optionally filtered by league"""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_roster_ids(self, league_id, user_id=DEFAULT_USER):
+        """Get the ids of the players on a user's team in a league, as a set"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT player_id FROM rosters WHERE user_id = ? AND league_id = ?', (user_id, league_id))
+            return {row[0] for row in cursor.fetchall()}
+    
+    def get_available_players(self, league_id=None, user_id=DEFAULT_USER):
+        """Get all players not currently on a user's team, optionally filtered by league"""
+        with self._read() as conn:
             cursor = conn.cursor()
             
-            if league_id:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE is_on_my_team = 0 AND league_id = ?', (league_id,))
-            else:
-                cursor.execute('SELECT name, team, position, scores, is_on_my_team, league_id FROM players WHERE is_on_my_team = 0')
+            # Anti-join: one rosters primary key probe per player, however many users exist
+            league_filter = 'WHERE p.league_id = ? AND' if league_id else 'WHERE'
+            cursor.execute(f'''
+                SELECT p.id, p.name, p.team, p.position, p.scores, 0, p.league_id
+                FROM players p
+                {league_filter} NOT EXISTS (
+                    SELECT 1 FROM rosters r
+                    WHERE r.user_id = ? AND r.league_id = p.league_id AND r.player_id = p.id
+                )
+            ''', (league_id, user_id) if league_id else (user_id,))
             
             rows = cursor.fetchall()
             
             players = []
             for row in rows:
-                name, team, position, scores_json, is_on_my_team, player_league_id = row
-                scores = json.loads(scores_json)
-                player = Player(name, team, position, scores, bool(is_on_my_team), player_league_id)
-                player.league = self.get_league_by_id(player_league_id)
+                player = Player.from_db(*row, league=self.get_league_by_id(row[-1]))
                 players.append(player)
             
             return players
     
-    def delete_player(self, name):
+    def delete_player(self, player_id):
         """Delete a player from the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('DELETE FROM players WHERE name = ?', (name,))
+            deleted = self._delete_player(cursor, player_id)
+            if deleted:
+                self._bump_version(cursor)
+
             conn.commit()
-            return cursor.rowcount > 0
-    
+            if deleted:
+                self._notify_change_listeners()
+            return deleted
+
     def delete_all_players(self):
         """Delete all players from the database (use with caution!)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM players')
+            deleted_count = cursor.rowcount
+            cursor.execute('''
+                INSERT INTO player_changes (version, op)
+                SELECT version + 1, 'clear' FROM data_version WHERE id = 1
+            ''')
+            self._bump_version(cursor)
             conn.commit()
-            return cursor.rowcount
+            self._notify_change_listeners()
+            return deleted_count
+
+    def get_players_by_team(self, team, league_id=None, user_id=DEFAULT_USER):
+        """Get all players from a specific team, optionally only in one league"""
+        return self._get_players_where('p.team = ?', team, league_id, user_id)
     
-    def get_players_by_team(self, team):
-        """Get all players from a specific team"""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_players_by_position(self, position, league_id=None, user_id=DEFAULT_USER):
+        """Get all players from a specific position, optionally only in one league"""
+        return self._get_players_where('p.position = ?', position, league_id, user_id)
+
+    def _get_players_where(self, condition, value, league_id, user_id):
+        with self._read() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT name, team, position, scores FROM players WHERE team = ?', (team,))
+            if league_id:
+                cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE p.league_id = ? AND {condition}',
+                               (user_id, league_id, value))
+            else:
+                cursor.execute(f'{PLAYER_COLUMNS_SQL} FROM players p WHERE {condition}', (user_id, value))
             rows = cursor.fetchall()
             
             players = []
             for row in rows:
-                name, team, position, scores_json = row
-                scores = json.loads(scores_json)
-                player = Player(name, team, position, scores)
+                player = Player.from_db(*row, league=self.get_league_by_id(row[-1]))
                 players.append(player)
             
             return players
-    
-    def get_players_by_position(self, position):
-        """Get all players from a specific position"""
-        with sqlite3.connect(self.db_path) as conn:
+
+    def query_players(self, league_id=None, teams=(), positions=(), on_team=None, min_score=None,
+                      max_score=None, min_weeks=None, sort='score', descending=None, limit=50, offset=0,
+                      user_id=DEFAULT_USER):
+        """
+        Filter, sort and page players in SQL, with team and position facet counts
+
+        Filters combine with AND and compile to parameterized WHERE clauses.
+        Scores are the stored final_score column, so league, team, position and
+        score filters and the score sort are served by the (league, [team |
+        position,] final_score) indexes. Each facet counts players per value
+        under every filter except its own, so a client can show how many players
+        picking another team or position would give; both come from one grouped
+        count over a covering index. The page and the facets are read in one
+        transaction, so they always agree.
+
+        Args:
+            teams, positions (iterable): Keep players with any of these values
+            on_team (bool): True for user_id's roster only, False for players not on it
+            min_score, max_score (float): Inclusive final score range
+            min_weeks (int): Minimum number of game weeks played
+            sort (str): A key of PLAYER_SORT_KEYS; ties are broken by player id
+            descending (bool): Sort direction, or None for the key's default
+
+        Returns:
+            dict: {'total': players matching all filters, 'players': [Player, ...] with
+                   final_score set, 'facets': {'team': {team: count}, 'position': {position: count}}}
+        """
+        if sort not in PLAYER_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        sort_sql, default_descending = PLAYER_SORT_KEYS[sort]
+        direction = 'DESC' if (default_descending if descending is None else descending) else 'ASC'
+        teams = set(teams)
+        positions = set(positions)
+
+        # Team and position are left out here: the facets are counted across them
+        conditions = []
+        args = []
+        if league_id:
+            conditions.append('p.league_id = ?')
+            args.append(league_id)
+        if min_score is not None:
+            conditions.append('p.final_score >= ?')
+            args.append(min_score)
+        if max_score is not None:
+            conditions.append('p.final_score <= ?')
+            args.append(max_score)
+        if min_weeks:
+            conditions.append('json_array_length(p.scores) >= ?')
+            args.append(min_weeks)
+        if on_team is not None:
+            conditions.append(f"{'' if on_team else 'NOT '}EXISTS (SELECT 1 FROM rosters r "
+                              'WHERE r.user_id = ? AND r.league_id = p.league_id AND r.player_id = p.id)')
+            args.append(user_id)
+        base_where = ' AND '.join(conditions) or '1'
+
+        page_conditions = list(conditions)
+        page_args = list(args)
+        if teams:
+            page_conditions.append(f"p.team IN ({', '.join('?' * len(teams))})")
+            page_args.extend(teams)
+        if positions:
+            page_conditions.append(f"p.position IN ({', '.join('?' * len(positions))})")
+            page_args.extend(positions)
+        page_where = ' AND '.join(page_conditions) or '1'
+
+        with self._read() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT name, team, position, scores FROM players WHERE position = ?', (position,))
+            cursor.execute('BEGIN')
+            # One count per (team, position) pair, read from idx_players_league_facets
+            # alone, gives both facets and the total
+            cursor.execute(f'''
+                SELECT p.team, p.position, COUNT(*) FROM players p
+                WHERE {base_where}
+                GROUP BY p.team, p.position
+            ''', args)
+            pairs = cursor.fetchall()
+
+            # The id tie-breaker runs the same way as the sort key, so an index on
+            # (..., key) walked in either direction already yields this order
+            cursor.execute(f'''
+                {PLAYER_COLUMNS_SQL}, p.final_score
+                FROM players p
+                WHERE {page_where}
+                ORDER BY {sort_sql} {direction}, p.id {direction}
+                LIMIT ? OFFSET ?
+            ''', [user_id] + page_args + [limit, offset])
             rows = cursor.fetchall()
+            conn.commit()
+
+        total = 0
+        facets = {'team': {}, 'position': {}}
+        for team, position, count in pairs:
+            team_selected = not teams or team in teams
+            position_selected = not positions or position in positions
+            if position_selected:
+                facets['team'][team] = facets['team'].get(team, 0) + count
+            if team_selected:
+                facets['position'][position] = facets['position'].get(position, 0) + count
+            if team_selected and position_selected:
+                total += count
+
+        players = []
+        for row in rows:
+            player = Player.from_db(*row[:-1], league=self.get_league_by_id(row[-2]))
+            player.final_score = row[-1]
+            players.append(player)
+
+        facets = {name: dict(sorted(counts.items())) for name, counts in facets.items()}
+        return {'total': total, 'players': players, 'facets': facets}
+
+    # Batch Operations
+    def apply_batch(self, operations, user_id=DEFAULT_USER):
+        """
+        Apply a list of roster and score mutations in a single transaction
+
+        Roster operations ('toggle', and 'add' with is_on_my_team) apply to user_id's roster.
+        A batch of only toggles bumps user_id's roster version, not the data version.
+
+        Each operation is a dict with an 'op' key:
+            {'op': 'toggle', 'player_id': 7}
+            {'op': 'update_scores', 'player_id': 7, 'scores': [80, 85]}
+            {'op': 'add', 'name': ..., 'team': ..., 'position': ..., 'scores': [...],
+             'league_id': 2, 'is_on_my_team': False}
+            {'op': 'delete', 'player_id': 7}
+
+        Args:
+            operations (list): Operations to apply, in order
+
+        Returns:
+            dict: {'version': data version after the batch,
+                   'roster_version': user_id's roster version after the batch,
+                   'results': [{'index', 'op', 'ok', 'player_id', 'error'}, ...]}
+        """
+        results = []
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            changed = False
+            roster_changed = False
+
+            for index, operation in enumerate(operations):
+                if not isinstance(operation, dict):
+                    results.append({'index': index, 'op': None, 'ok': False, 'player_id': None,
+                                    'error': 'Invalid operation: expected a JSON object'})
+                    continue
+                op = operation.get('op')
+                result = {'index': index, 'op': op, 'ok': False,
+                          'player_id': operation.get('player_id'), 'error': None}
+                try:
+                    if op == 'toggle':
+                        result['ok'] = self._toggle_my_team(cursor, int(operation['player_id']), user_id)
+                    elif op == 'update_scores':
+                        scores = self._score_list(operation['scores'])
+                        result['ok'] = self._update_scores(cursor, int(operation['player_id']), scores)
+                    elif op == 'delete':
+                        result['ok'] = self._delete_player(cursor, int(operation['player_id']))
+                    elif op == 'add':
+                        player = Player(operation['name'], operation['team'], operation['position'],
+                                        self._score_list(operation['scores']),
+                                        bool(operation.get('is_on_my_team', False)),
+                                        int(operation.get('league_id', 1)))
+                        self._insert_player(cursor, player, user_id)
+                        result['ok'] = True
+                        result['player_id'] = player.id
+                    else:
+                        result['error'] = f"Unknown operation: {op}"
+                        results.append(result)
+                        continue
+
+                    if not result['ok']:
+                        result['error'] = 'Player not found'
+                except sqlite3.IntegrityError:
+                    result['error'] = 'Player already exists in this league'
+                except (KeyError, TypeError, ValueError) as e:
+                    result['error'] = f"Invalid operation: {e}"
+
+                if op == 'toggle':
+                    roster_changed = roster_changed or result['ok']
+                else:
+                    changed = changed or result['ok']
+                results.append(result)
+
+            # One version bump for the whole batch
+            if changed:
+                self._bump_version(cursor)
+            version = self._read_version(cursor)
+            roster_version = self._read_roster_version(cursor, user_id)
+            conn.commit()
+
+        if changed:
+            self._notify_change_listeners()
+        elif roster_changed:
+            self._replica_changed()
+
+        return {'version': version, 'roster_version': roster_version, 'results': results}
+
+    @staticmethod
+    def _score_list(scores):
+        # A string would otherwise be read one character per score, and NaN or
+        # infinity would be stored as JSON that SQLite's JSON functions reject
+        if not isinstance(scores, list):
+            raise TypeError('scores must be a list of numbers')
+        scores = [float(score) for score in scores]
+        if not all(map(math.isfinite, scores)):
+            raise ValueError('scores must be finite numbers')
+        return scores
+
+    def bulk_add_players(self, rows, user_id=DEFAULT_USER):
+        """
+        Insert many players in one transaction, skipping names already in their league
+
+        Rows are written with executemany and journaled with a single
+        INSERT ... SELECT, under one version bump. Intended for imports and
+        generated fixtures where building a Player per row would dominate.
+
+        Args:
+            rows (iterable): (name, team, position, scores_json, is_on_my_team, league_id) tuples;
+                flagged players go on user_id's roster
+
+        Returns:
+            int: Number of players inserted
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM players')
+            last_id = cursor.fetchone()[0]
+
+            roster = []
+
+            def player_rows():
+                for name, team, position, scores_json, is_on_my_team, league_id in rows:
+                    if is_on_my_team:
+                        roster.append((user_id, name, league_id, last_id))
+                    final_score = _final_score(json.loads(scores_json))
+                    yield name, team, position, scores_json, final_score, league_id
+
+            cursor.executemany('''
+                INSERT OR IGNORE INTO players (name, team, position, scores, final_score, league_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', player_rows())
+            inserted = cursor.rowcount  # Summed over all rows; ignored duplicates count 0
+            # Only players inserted here join the roster, not existing ones with the same name
+            cursor.executemany('''
+                INSERT OR IGNORE INTO rosters (user_id, league_id, player_id)
+                SELECT ?, league_id, id FROM players WHERE name = ? AND league_id = ? AND id > ?
+            ''', roster)
+
+            if inserted:
+                cursor.execute('''
+                    INSERT INTO player_changes (version, league_id, player_id, op, name, team, position, scores)
+                    SELECT v.version + 1, p.league_id, p.id, 'insert', p.name, p.team, p.position, p.scores
+                    FROM players p, data_version v
+                    WHERE p.id > ? AND v.id = 1
+                    ORDER BY p.id
+                ''', (last_id,))
+                self._bump_version(cursor)
+            conn.commit()
+
+        if inserted:
+            self._notify_change_listeners()
+        return inserted
+
+    # Score Recompute
+    def get_player_id_bounds(self, league_id=None):
+        """Get (min id, max id, count) of all players, or of one league's players"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if league_id:
+                cursor.execute('SELECT MIN(id), MAX(id), COUNT(*) FROM players WHERE league_id = ?', (league_id,))
+            else:
+                cursor.execute('SELECT MIN(id), MAX(id), COUNT(*) FROM players')
+            return cursor.fetchone()
+
+    def get_scores_in_range(self, start_id, end_id, league_id=None):
+        """Get raw (id, scores JSON) rows with start_id <= id <= end_id, optionally for one league"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if league_id:
+                cursor.execute('SELECT id, scores FROM players WHERE id BETWEEN ? AND ? AND league_id = ?',
+                               (start_id, end_id, league_id))
+            else:
+                cursor.execute('SELECT id, scores FROM players WHERE id BETWEEN ? AND ?', (start_id, end_id))
+            return cursor.fetchall()
+
+    def save_final_scores(self, scores, job=None, last_id=None):
+        """
+        Store recomputed final scores in one transaction
+
+        final_score is derived data, so this neither bumps the data version nor
+        writes the change journal. When job is given, its checkpoint advances to
+        last_id in the same transaction, so a resumed job never skips or redoes
+        a committed batch.
+
+        Args:
+            scores (list): (final_score, player_id) pairs
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('UPDATE players SET final_score = ? WHERE id = ?', scores)
+            if job is not None:
+                cursor.execute('''
+                    INSERT INTO recompute_checkpoints (job, last_id, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(job) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at
+                ''', (job, last_id))
+            conn.commit()
+
+    def get_recompute_checkpoint(self, job):
+        """Get the last player id a recompute job committed, or None"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT last_id FROM recompute_checkpoints WHERE job = ?', (job,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def clear_recompute_checkpoint(self, job):
+        """Forget a recompute job's progress once it has finished"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM recompute_checkpoints WHERE job = ?', (job,))
+            conn.commit()
+
+    def claim_job(self, job, seconds):
+        """
+        Claim a background job across processes, e.g. one gunicorn worker's refresh
+
+        Returns:
+            str: Token for release_job, or None while another process holds an
+                 unexpired claim (a claim expires after seconds, so a crashed
+                 holder does not block the job forever)
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO job_claims (job, token, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(job) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at
+                WHERE job_claims.expires_at <= ?
+            ''', (job, token, now + seconds, now))
+            claimed = cursor.rowcount > 0
+            conn.commit()
+        return token if claimed else None
+
+    def release_job(self, job, token):
+        """Release a claim taken with claim_job"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM job_claims WHERE job = ? AND token = ?', (job, token))
+            conn.commit()
+
+    # Weekly Snapshots
+    def get_snapshot_state(self, league_id):
+        """Get (latest snapshotted week, data version it was taken at) for a league, or None"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT week, version FROM snapshot_state WHERE league_id = ?', (league_id,))
+            return cursor.fetchone()
+
+    def league_changed_since(self, league_id, version):
+        """Check the change journal for writes to a league after a data version"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT EXISTS(
+                    SELECT 1 FROM player_changes
+                    WHERE version > ? AND (league_id = ? OR op = 'clear')
+                )
+            ''', (version, league_id))
+            return bool(cursor.fetchone()[0])
+
+    def get_previous_scores(self, league_id, version):
+        """
+        Get the scores a league's changed players had at a data version
+
+        Reads the journal: for every player with an entry after version, the
+        scores of their newest entry at or before it.
+
+        Returns:
+            tuple: (cleared, {player_id: scores}) where cleared is True if
+                   delete_all_players ran after version, and scores is the JSON
+                   list, '[]' for a player that did not exist yet, or None when
+                   the journal no longer holds (or never held) the older row
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM player_changes WHERE version > ? AND op = 'clear')",
+                           (version,))
+            if cursor.fetchone()[0]:
+                return True, {}
+            cursor.execute('''
+                SELECT c.player_id,
+                       (SELECT CASE WHEN o.op = 'delete' THEN '[]' ELSE o.scores END FROM player_changes o
+                        WHERE o.player_id = c.player_id AND o.version <= :version
+                        ORDER BY o.id DESC LIMIT 1),
+                       (SELECT f.op FROM player_changes f
+                        WHERE f.player_id = c.player_id AND f.version > :version
+                        ORDER BY f.id LIMIT 1)
+                FROM player_changes c
+                WHERE c.version > :version AND c.league_id = :league_id AND c.player_id IS NOT NULL
+                GROUP BY c.player_id
+            ''', {'version': version, 'league_id': league_id})
+            return False, {player_id: '[]' if scores is None and first_op == 'insert' else scores
+                           for player_id, scores, first_op in cursor.fetchall()}
+
+    def get_snapshot_scores(self, league_id, player_ids, last_week):
+        """Get {player_id: [weighted score after week 1, 2, ...]} from a league's snapshots up to last_week"""
+        player_ids = list(player_ids)
+        history = {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(player_ids), 500):
+                chunk = player_ids[start:start + 500]
+                cursor.execute(f'''
+                    SELECT player_id, score FROM leaderboard_snapshots
+                    WHERE league_id = ? AND week <= ? AND player_id IN ({','.join('?' * len(chunk))})
+                    ORDER BY player_id, week
+                ''', [league_id, last_week] + chunk)
+                for player_id, score in cursor.fetchall():
+                    history.setdefault(player_id, []).append(score)
+        return history
+
+    def get_week_snapshot(self, league_id, week):
+        """Get {player_id: (rank, score)} of one snapshotted week"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT player_id, rank, score FROM leaderboard_snapshots WHERE league_id = ? AND week = ?',
+                           (league_id, week))
+            return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+    def save_week_snapshots(self, league_id, rows, removed, latest_week, version, rebuild=False):
+        """
+        Write snapshot rows for a league in one transaction
+
+        Args:
+            league_id (int): League the snapshots belong to
+            rows (iterable): (week, player_id, rank, score) tuples, replacing existing rows
+            removed (list): (week, player_id) pairs to delete
+            latest_week (int): League's latest week; snapshots of later weeks are dropped
+            version (int): Data version the snapshots were computed from
+            rebuild (bool): Drop all of the league's snapshots first
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM leaderboard_snapshots WHERE league_id = ? AND week > ?',
+                           (league_id, 0 if rebuild else latest_week))
+            cursor.executemany('DELETE FROM leaderboard_snapshots WHERE league_id = ? AND week = ? AND player_id = ?',
+                               [(league_id, week, player_id) for week, player_id in removed])
+            cursor.executemany('''
+                INSERT OR REPLACE INTO leaderboard_snapshots (league_id, week, player_id, rank, score)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ((league_id, week, player_id, rank, score) for week, player_id, rank, score in rows))
+            cursor.execute('INSERT OR REPLACE INTO snapshot_state (league_id, week, version) VALUES (?, ?, ?)',
+                           (league_id, latest_week, version))
+            conn.commit()
+        # Snapshots are written without a version bump, so no listener runs
+        self._replica_changed()
+
+    def get_rank_history(self, player_id):
+        """Get a player's snapshotted rank and weighted score after each week, oldest first"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT week, rank, score FROM leaderboard_snapshots
+                WHERE player_id = ?
+                ORDER BY week
+            ''', (player_id,))
+            return [{'week': row[0], 'rank': row[1], 'score': row[2]} for row in cursor.fetchall()]
+
+    def get_rank_movements(self, league_id, week):
+        """Get {player_id: (rank, previous week's rank or None)} for one snapshotted week"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.player_id, s.rank, prev.rank
+                FROM leaderboard_snapshots s
+                LEFT JOIN leaderboard_snapshots prev
+                    ON prev.league_id = s.league_id AND prev.week = s.week - 1 AND prev.player_id = s.player_id
+                WHERE s.league_id = ? AND s.week = ?
+            ''', (league_id, week))
+            return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+    def get_rank_movers(self, league_id, week, limit=10):
+        """
+        Get the players whose rank changed most from the previous week
+
+        Returns:
+            dict: {'risers': [...], 'fallers': [...]}, biggest movement first; each
+                  entry holds the player's id, name, team, position, rank,
+                  previous_rank, movement (places gained), score and previous_score
+        """
+        columns = ('id', 'name', 'team', 'position', 'rank', 'previous_rank', 'movement',
+                   'score', 'previous_score')
+        movers = {}
+        with self._read() as conn:
+            cursor = conn.cursor()
+            for key, condition, order in (('risers', '> 0', 'DESC'), ('fallers', '< 0', 'ASC')):
+                cursor.execute(f'''
+                    SELECT p.id, p.name, p.team, p.position, s.rank, prev.rank, prev.rank - s.rank,
+                           s.score, prev.score
+                    FROM leaderboard_snapshots s
+                    JOIN leaderboard_snapshots prev
+                        ON prev.league_id = s.league_id AND prev.week = s.week - 1 AND prev.player_id = s.player_id
+                    JOIN players p ON p.id = s.player_id
+                    WHERE s.league_id = ? AND s.week = ? AND prev.rank - s.rank {condition}
+                    ORDER BY prev.rank - s.rank {order}, s.rank
+                    LIMIT ?
+                ''', (league_id, week, limit))
+                movers[key] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return movers
+
+    # Change Journal
+    def get_changes(self, since=0, league_id=None, limit=1000):
+        """
+        Get journal entries newer than a data version
+
+        Entries carry the full player row after the change ('insert', 'update'),
+        a tombstone ('delete'), 'clear' for delete_all_players, or 'league' with
+        the league (positions and teams included) for add_league. Results end
+        on a version boundary, so a page never splits one version's entries.
+
+        Returns:
+            dict: {'version': newest version returned (or since), 'current_version',
+                   'has_more': bool, 'changes': [...]}
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            current_version = self._read_version(cursor)
             
-            players = []
-            for row in rows:
-                name, team, position, scores_json = row
-                scores = json.loads(scores_json)
-                player = Player(name, team, position, scores)
-                players.append(player)
+            league_filter = ''
+            params = [since]
+            if league_id:
+                league_filter = "AND (league_id = ? OR op = 'clear')"
+                params.append(league_id)
             
-            return players
+            # Newest version reachable within the limit, so whole versions are returned
+            cursor.execute(f'''
+                SELECT MAX(version) FROM (
+                    SELECT version FROM player_changes
+                    WHERE version > ? {league_filter}
+                    ORDER BY version LIMIT ?
+                )
+            ''', params + [limit])
+            upper = cursor.fetchone()[0]
+            if upper is None:
+                return {'version': max(since, current_version), 'current_version': current_version,
+                        'has_more': False, 'changes': []}
+            
+            cursor.execute(f'''
+                SELECT version, league_id, player_id, op, name, team, position, scores
+                FROM player_changes
+                WHERE version > ? AND version <= ? {league_filter}
+                ORDER BY id
+            ''', [since, upper] + params[1:])
+            
+            changes = []
+            for version, change_league_id, player_id, op, name, team, position, scores_json in cursor.fetchall():
+                change = {'version': version, 'op': op, 'league_id': change_league_id, 'player_id': player_id}
+                if op in ('insert', 'update'):
+                    change.update({
+                        'name': name,
+                        'team': team,
+                        'position': position,
+                        'scores': json.loads(scores_json)
+                    })
+                elif op == 'league':
+                    league = self.get_league_by_id(change_league_id)
+                    change['league'] = league.to_dict() if league else {'name': name}
+                changes.append(change)
+            
+            cursor.execute(f'SELECT EXISTS(SELECT 1 FROM player_changes WHERE version > ? {league_filter})',
+                           [upper] + params[1:])
+            has_more = bool(cursor.fetchone()[0])
+            
+            return {'version': upper if has_more else max(upper, current_version),
+                    'current_version': current_version, 'has_more': has_more, 'changes': changes}
+    
+    def compact_changes(self, keep_versions=1000):
+        """
+        Compact journal entries older than the newest keep_versions versions
+
+        Within the compacted range only the newest entry per player survives
+        (and no player entry before the newest 'clear', which leaves leagues in
+        place), so replaying from any version
+        still reproduces the current data.
+
+        Returns:
+            int: Number of journal entries removed
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cutoff = self._read_version(cursor) - keep_versions
+            if cutoff <= 0:
+                return 0
+            
+            cursor.execute('''
+                DELETE FROM player_changes
+                WHERE version <= :cutoff AND (
+                    (op != 'league' AND id < (SELECT MAX(id) FROM player_changes WHERE op = 'clear' AND version <= :cutoff))
+                    OR (player_id IS NOT NULL AND id < (
+                        SELECT MAX(c.id) FROM player_changes c
+                        WHERE c.player_id = player_changes.player_id AND c.version <= :cutoff
+                    ))
+                )
+            ''', {'cutoff': cutoff})
+            removed = cursor.rowcount
+            conn.commit()
+            return removed
+    
+    # Data Version
+    def get_league_version(self, league_id):
+        """
+        Get the data version of a league's newest change, 0 if it has none
+
+        Read from the journal: player writes in the league, its creation and
+        delete_all_players count; writes to other leagues and roster toggles
+        do not. Compaction keeps each player's newest entry, so it never
+        lowers the result.
+        """
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT MAX(
+                    COALESCE((SELECT MAX(version) FROM player_changes WHERE league_id = ?), 0),
+                    COALESCE((SELECT MAX(version) FROM player_changes WHERE league_id IS NULL AND op = 'clear'), 0)
+                )
+            ''', (league_id,))
+            return cursor.fetchone()[0]
+
+    def get_data_version(self):
+        """Get the data version, bumped once per committed mutation or batch (except roster toggles)"""
+        with self._read() as conn:
+            return self._read_version(conn.cursor())
+
+    def get_page_version(self, league_id, user_id=None):
+        """
+        Get what a cached page of a league depends on, in one read
+
+        Returns:
+            tuple: (data version, data version the league's weekly snapshots were
+                   taken at or None, user_id's roster version or None); neither
+                   snapshot refreshes nor roster toggles bump the data version
+        """
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT v.version,
+                       (SELECT s.version FROM snapshot_state s WHERE s.league_id = ?),
+                       (SELECT COALESCE(MAX(r.version), 0) FROM roster_versions r WHERE r.user_id = ?)
+                FROM data_version v WHERE v.id = 1
+            ''', (league_id, user_id))
+            row = cursor.fetchone()
+            return (row[0], row[1], row[2] if user_id is not None else None) if row else (0, None, None)
+
+    def add_change_listener(self, callback):
+        """Register a callback invoked with no arguments after every committed change"""
+        self._change_listeners.append(callback)
+
+    def _notify_change_listeners(self):
+        self._replica_changed()
+        for callback in self._change_listeners:
+            callback()
+
+    def _read_version(self, cursor):
+        cursor.execute('SELECT version FROM data_version WHERE id = 1')
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def _read_roster_version(self, cursor, user_id):
+        cursor.execute('SELECT version FROM roster_versions WHERE user_id = ?', (user_id,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def _bump_version(self, cursor):
+        cursor.execute('UPDATE data_version SET version = version + 1 WHERE id = 1')
+        return self._read_version(cursor)
+
+    # Mutation helpers shared by the single-row methods and apply_batch;
+    # they run on the caller's cursor and leave committing to the caller
+    def _insert_player(self, cursor, player, user_id):
+        cursor.execute('''
+            INSERT INTO players (name, team, position, scores, final_score, league_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (player.name, player.team, player.position, player.scores_json,
+              _final_score(player.scores), player.league_id))
+        player.id = cursor.lastrowid
+        if player.is_on_my_team:
+            cursor.execute('INSERT INTO rosters (user_id, league_id, player_id) VALUES (?, ?, ?)',
+                           (user_id, player.league_id, player.id))
+        self._journal_player(cursor, 'insert', player.id)
+
+    def _update_scores(self, cursor, player_id, new_scores):
+        cursor.execute('UPDATE players SET scores = ?, final_score = ? WHERE id = ?',
+                       (json.dumps(new_scores), _final_score(new_scores), player_id))
+        if cursor.rowcount == 0:
+            return False
+        self._journal_player(cursor, 'update', player_id)
+        return True
+
+    def _toggle_my_team(self, cursor, player_id, user_id):
+        # Roster membership is per user and not part of the player row, so it is
+        # not journaled and bumps the user's roster version instead of data_version
+        cursor.execute('''
+            DELETE FROM rosters
+            WHERE user_id = ? AND league_id = (SELECT league_id FROM players WHERE id = ?) AND player_id = ?
+        ''', (user_id, player_id, player_id))
+        if not cursor.rowcount:
+            cursor.execute('INSERT INTO rosters (user_id, league_id, player_id) SELECT ?, league_id, id FROM players WHERE id = ?',
+                           (user_id, player_id))
+            if not cursor.rowcount:
+                return False
+        cursor.execute('''
+            INSERT INTO roster_versions (user_id, version) VALUES (?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1
+        ''', (user_id,))
+        return True
+
+    def _delete_player(self, cursor, player_id):
+        # Journal first, while the row still exists
+        self._journal_player(cursor, 'delete', player_id)
+        cursor.execute('DELETE FROM players WHERE id = ?', (player_id,))
+        return cursor.rowcount > 0
+
+    def _journal_player(self, cursor, op, player_id):
+        # The entry gets the version the enclosing transaction is about to bump
+        # to; the transaction already holds SQLite's write lock, so no other
+        # writer can claim that version first
+        cursor.execute('''
+            INSERT INTO player_changes (version, league_id, player_id, op, name, team, position, scores)
+            SELECT v.version + 1, p.league_id, p.id, ?, p.name, p.team, p.position, p.scores
+            FROM players p, data_version v
+            WHERE p.id = ? AND v.id = 1
+        ''', (op, player_id))
@@ -0,0 +1,357 @@
+"""
+Lineup optimizer for fantasy sports leagues
+
+Picks the highest-scoring set of players that fills a league's position slots,
+optionally within a budget and with at most N players from any one real team.
+
+Players have no salary column, so budgets apply to a price derived from a
+player's plain season average (one tenth of it, to one decimal place), while
+the lineup is scored by the recency-weighted score. In-form players are
+therefore cheap relative to their value, as in salary-cap fantasy games.
+
+The search is a branch and bound over position slots:
+1. Candidates that can always be swapped for a player who is at least as good
+   and no more expensive are dropped up front, which leaves a few dozen per
+   position even for thousands of players.
+2. Remaining positions are bounded by a cost/score Pareto frontier (the best
+   score reachable for every budget, ignoring team caps), so most branches are
+   cut without being expanded.
+3. The search starts from a lineup found greedily (score minus a range of
+   price penalties, then improving swaps), which is usually already optimal,
+   so the bounds cut hard from the first node. Ties near the cap-free bound
+   can still leave many branches, so the search stops after max_nodes nodes
+   or time_limit seconds and returns the best lineup so far, marked as not
+   proven optimal.
+"""
+
+import time
+from bisect import bisect_right
+
+from .scoring import WeightedScoreCalculator
+
+# Search limits: past either one, optimize() returns the best lineup found so far
+DEFAULT_MAX_NODES = 200000
+DEFAULT_TIME_LIMIT = 1.0
+
+# Price penalties tried when seeding the search with a greedy lineup
+SEED_STEPS = 40
+
+# Prices are stored in tenths so the budget arithmetic stays in integers
+PRICE_SCALE = 10
+
+
+def player_price(scores):
+    """Get a player's price: a tenth of their plain average score, to one decimal"""
+    if not scores:
+        return 0.0
+    return round(sum(scores) / len(scores)) / PRICE_SCALE
+
+
+def _pareto(points, max_cost=None):
+    """Reduce (cost, score) points to a frontier sorted by cost with strictly rising scores"""
+    best = {}
+    for cost, score in points:
+        if max_cost is not None and cost > max_cost:
+            continue
+        if score > best.get(cost, float('-inf')):
+            best[cost] = score
+
+    frontier = []
+    for cost in sorted(best):
+        if not frontier or best[cost] > frontier[-1][1]:
+            frontier.append((cost, best[cost]))
+    return frontier
+
+
+def _combine(first, second, max_cost=None):
+    """Pareto frontier of every pairing of two frontiers"""
+    return _pareto(((c1 + c2, s1 + s2) for c1, s1 in first for c2, s2 in second), max_cost)
+
+
+def _best_within(frontier, budget):
+    """Best score on a frontier costing at most budget"""
+    if budget is None:
+        return frontier[-1][1] if frontier else float('-inf')
+    index = bisect_right(frontier, (budget, float('inf')))
+    return frontier[index - 1][1] if index else float('-inf')
+
+
+class _Candidate:
+    __slots__ = ('player', 'score', 'cost', 'team')
+
+    def __init__(self, player, score, cost):
+        self.player = player
+        self.score = score
+        self.cost = cost
+        self.team = player.team
+
+
+class LineupOptimizer:
+    def __init__(self, calculator=None):
+        self.calculator = calculator or WeightedScoreCalculator()
+
+    def optimize(self, players, slots, budget=None, max_per_team=None,
+                 max_nodes=DEFAULT_MAX_NODES, time_limit=DEFAULT_TIME_LIMIT):
+        """
+        Pick the best lineup
+
+        Args:
+            players (list): Candidate Player objects
+            slots (dict): Number of lineup slots per position, e.g. from League.get_lineup_slots()
+            budget (float): Maximum total price, or None for no budget
+            max_per_team (int): Maximum players from one real team, or None for no cap
+            max_nodes (int): Search nodes after which the best lineup so far is returned, or None
+            time_limit (float): Seconds after which the same happens, or None; the
+                search stops then, the setup before it always completes
+
+        Returns:
+            dict: {'feasible', 'optimal' (False if a limit stopped the search first),
+                   'players' (chosen Players with final_score set),
+                   'total_score', 'total_price', 'slots', 'budget', 'max_per_team'}
+        """
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        slots = {position: count for position, count in slots.items() if count > 0}
+        total_slots = sum(slots.values())
+        max_cost = None if budget is None else int(round(budget * PRICE_SCALE))
+        result = {'feasible': False, 'optimal': True, 'players': [], 'total_score': 0.0, 'total_price': 0.0,
+                  'slots': slots, 'budget': budget, 'max_per_team': max_per_team}
+
+        by_position = {position: [] for position in slots}
+        for player in players:
+            if player.position in by_position:
+                score = self.calculator.calculate_weighted_score(player.scores)
+                cost = int(round(player_price(player.scores) * PRICE_SCALE)) if max_cost is not None else 0
+                by_position[player.position].append(_Candidate(player, score, cost))
+
+        # Too few teams to fill the lineup under the cap
+        teams = {candidate.team for group in by_position.values() for candidate in group}
+        if max_per_team is not None and len(teams) * max_per_team < total_slots:
+            return result
+
+        positions = list(slots)
+        candidates = []
+        for position in positions:
+            kept = self._prune(by_position[position], slots[position], total_slots, max_per_team)
+            if len(kept) < slots[position]:
+                return result
+            # Highest scores first, so the first complete lineup found is close to the greedy one
+            kept.sort(key=lambda c: (-c.score, c.player.id or 0))
+            candidates.append(kept)
+
+        # frontiers[j][r]: best (cost, score) trade-offs for r players of position j
+        frontiers = []
+        for j, position in enumerate(positions):
+            count = slots[position]
+            by_count = [[(0, 0.0)]] + [[] for _ in range(count)]
+            for candidate in candidates[j]:
+                for r in range(count, 0, -1):
+                    if by_count[r - 1]:
+                        shifted = [(c + candidate.cost, s + candidate.score) for c, s in by_count[r - 1]]
+                        by_count[r] = _pareto(by_count[r] + shifted, max_cost)
+            frontiers.append(by_count)
+
+        # bounds[j][r]: frontier for r more players of position j plus all later positions
+        suffix = [(0, 0.0)]
+        bounds = [None] * len(positions)
+        for j in range(len(positions) - 1, -1, -1):
+            bounds[j] = [_combine(frontiers[j][r], suffix, max_cost) for r in range(slots[positions[j]] + 1)]
+            suffix = bounds[j][slots[positions[j]]]
+        if not suffix:
+            return result
+
+        score_prefix = []
+        for kept in candidates:
+            prefix = [0.0]
+            for candidate in kept:
+                prefix.append(prefix[-1] + candidate.score)
+            score_prefix.append(prefix)
+
+        # Start from a good feasible lineup, so the bounds cut from the first node
+        best = {'score': float('-inf'), 'lineup': None}
+        seed = self._seed_lineup(candidates, positions, slots, max_cost, max_per_team)
+        if seed is not None:
+            best = {'score': sum(c.score for c in seed), 'lineup': seed}
+        chosen = []
+        team_counts = {}
+        state = {'nodes': 0, 'stopped': False}
+
+        def search(j, remaining, start, cost, score):
+            state['nodes'] += 1
+            if max_nodes is not None and state['nodes'] > max_nodes:
+                state['stopped'] = True
+            elif deadline is not None and state['nodes'] % 1024 == 0 and time.monotonic() > deadline:
+                state['stopped'] = True
+            if state['stopped']:
+                return
+
+            if remaining == 0:
+                if j + 1 == len(positions):
+                    if score > best['score']:
+                        best['score'] = score
+                        best['lineup'] = list(chosen)
+                    return
+                j += 1
+                remaining = slots[positions[j]]
+                start = 0
+
+            budget_left = None if max_cost is None else max_cost - cost
+            rest = _best_within(bounds[j + 1][slots[positions[j + 1]]], budget_left) if j + 1 < len(positions) else 0.0
+            kept = candidates[j]
+            prefix = score_prefix[j]
+            for index in range(start, len(kept) - remaining + 1):
+                # Neither the best remaining scores here nor the best affordable mix can beat the incumbent
+                upper = score + min(prefix[index + remaining] - prefix[index] + rest,
+                                    _best_within(bounds[j][remaining], budget_left))
+                if upper <= best['score']:
+                    return
+
+                candidate = kept[index]
+                if budget_left is not None and candidate.cost > budget_left:
+                    continue
+                if max_per_team is not None and team_counts.get(candidate.team, 0) >= max_per_team:
+                    continue
+
+                chosen.append(candidate)
+                team_counts[candidate.team] = team_counts.get(candidate.team, 0) + 1
+                search(j, remaining - 1, index + 1, cost + candidate.cost, score + candidate.score)
+                team_counts[candidate.team] -= 1
+                chosen.pop()
+                if state['stopped']:
+                    return
+
+        if positions:
+            search(0, slots[positions[0]], 0, 0, 0.0)
+        if best['lineup'] is None:
+            # Without a lineup, a stopped search has not shown there is none
+            result['optimal'] = not state['stopped']
+            return result
+
+        lineup = []
+        for candidate in best['lineup']:
+            candidate.player.final_score = candidate.score
+            lineup.append(candidate.player)
+        result.update({
+            'feasible': True,
+            'optimal': not state['stopped'],
+            'players': lineup,
+            'total_score': sum(c.score for c in best['lineup']),
+            'total_price': sum(player_price(c.player.scores) for c in best['lineup'])
+        })
+        return result
+
+    def _seed_lineup(self, candidates, positions, slots, max_cost, max_per_team):
+        """
+        Find a good feasible lineup quickly, to start the search from
+
+        Fills the slots greedily by score minus a price penalty, for a range of
+        penalties (only zero without a budget), improves each lineup that fits
+        by swaps and keeps the best. Returns the candidates, or None.
+        """
+        penalties = [0.0]
+        if max_cost is not None:
+            # Up to the best score per unit of price, past which only price matters
+            top = max((c.score / c.cost for kept in candidates for c in kept if c.cost > 0), default=0.0)
+            penalties = [top * step / SEED_STEPS for step in range(SEED_STEPS + 1)]
+
+        best = None
+        best_score = float('-inf')
+        for penalty in penalties:
+            lineup = self._greedy_lineup(candidates, positions, slots, max_cost, max_per_team, penalty)
+            if lineup is None:
+                continue
+            lineup = self._improve_lineup(lineup, candidates, max_cost, max_per_team)
+            score = sum(candidate.score for _, candidate in lineup)
+            if score > best_score:
+                best = [candidate for _, candidate in lineup]
+                best_score = score
+        return best
+
+    @staticmethod
+    def _greedy_lineup(candidates, positions, slots, max_cost, max_per_team, penalty):
+        """Fill slots by score - penalty * cost within the team cap; None if that misses the budget"""
+        ranked = sorted(((c.score - penalty * c.cost, j, c) for j, kept in enumerate(candidates) for c in kept),
+                        key=lambda entry: -entry[0])
+        needed = [slots[position] for position in positions]
+        team_counts = {}
+        lineup = []
+        cost = 0
+        for _, j, candidate in ranked:
+            if needed[j] == 0:
+                continue
+            if max_per_team is not None and team_counts.get(candidate.team, 0) >= max_per_team:
+                continue
+            lineup.append((j, candidate))
+            team_counts[candidate.team] = team_counts.get(candidate.team, 0) + 1
+            needed[j] -= 1
+            cost += candidate.cost
+        if any(needed) or (max_cost is not None and cost > max_cost):
+            return None
+        return lineup
+
+    @staticmethod
+    def _improve_lineup(lineup, candidates, max_cost, max_per_team):
+        """Make the best-scoring swap within a position while one fits budget and caps"""
+        team_counts = {}
+        for _, candidate in lineup:
+            team_counts[candidate.team] = team_counts.get(candidate.team, 0) + 1
+        cost = sum(candidate.cost for _, candidate in lineup)
+        chosen = {id(candidate) for _, candidate in lineup}
+
+        while True:
+            best_gain = 0.0
+            best_swap = None
+            for slot, (j, current) in enumerate(lineup):
+                room = None if max_cost is None else max_cost - cost + current.cost
+                for candidate in candidates[j]:
+                    gain = candidate.score - current.score
+                    if gain <= best_gain or id(candidate) in chosen:
+                        continue
+                    if room is not None and candidate.cost > room:
+                        continue
+                    if (max_per_team is not None and candidate.team != current.team
+                            and team_counts.get(candidate.team, 0) >= max_per_team):
+                        continue
+                    best_gain = gain
+                    best_swap = (slot, candidate)
+            if best_swap is None:
+                return lineup
+
+            slot, candidate = best_swap
+            j, current = lineup[slot]
+            lineup[slot] = (j, candidate)
+            chosen.discard(id(current))
+            chosen.add(id(candidate))
+            team_counts[current.team] -= 1
+            team_counts[candidate.team] = team_counts.get(candidate.team, 0) + 1
+            cost += candidate.cost - current.cost
+
+    def _prune(self, candidates, count, total_slots, max_per_team):
+        """
+        Drop candidates that some optimal lineup never needs
+
+        A candidate is dominated by every player that is at least as good and no
+        more expensive. Once count dominators exist (or, with a team cap,
+        dominators from count + total_slots // max_per_team distinct teams, so
+        one of them always has room), any lineup using the candidate can swap
+        in a dominator instead.
+        """
+        needed = count if max_per_team is None else count + total_slots // max_per_team
+        ordered = sorted(candidates, key=lambda c: (c.cost, -c.score, c.player.id or 0))
+
+        kept = []
+        best_pruned = float('-inf')
+        for candidate in ordered:
+            # Whatever dominated a pruned player dominates this one too
+            if best_pruned >= candidate.score:
+                continue
+
+            if max_per_team is None:
+                dominators = sum(1 for other in kept if other.score >= candidate.score)
+            else:
+                dominators = len({other.team for other in kept if other.score >= candidate.score})
+
+            if dominators >= needed:
+                best_pruned = max(best_pruned, candidate.score)
+            else:
+                kept.append(candidate)
+        return kept
@@ -1,9 +1,83 @@
 """
 Models for the fantasy sports app with multi-league support
+
+Player and League use __slots__ to keep large in-memory leagues compact, and
+can be frozen (made read-only) when shared through caches.
 """
 
+import json
+
+
+# Built-in positions and teams per league. These seed the league_positions and
+# league_teams tables; runtime lookups go through LEAGUE_REGISTRY, which the
+# database loads from those tables once so custom leagues need no code edits.
+DEFAULT_LEAGUE_POSITIONS = {
+    'f1': ('Driver', 'Constructor'),
+    'epl': ('Forward', 'Midfielder', 'Defender', 'Goalkeeper'),
+    'ucl': ('Forward', 'Midfielder', 'Defender', 'Goalkeeper'),
+    'nfl': ('Quarterback', 'Running Back', 'Wide Receiver', 'Tight End', 'Defense', 'Kicker')
+}
+
+DEFAULT_LEAGUE_TEAMS = {
+    'f1': ('Red Bull Racing', 'Mercedes', 'Ferrari', 'McLaren', 'Alpine', 'Aston Martin', 
+           'Williams', 'AlphaTauri', 'Alfa Romeo', 'Haas'),
+    'epl': ('Manchester City', 'Arsenal', 'Liverpool', 'Chelsea', 'Newcastle United', 
+            'Manchester United', 'Tottenham', 'Brighton', 'Aston Villa', 'West Ham'),
+    'ucl': ('Real Madrid', 'Manchester City', 'Bayern Munich', 'PSG', 'Liverpool', 
+            'Barcelona', 'Chelsea', 'Inter Milan', 'AC Milan', 'Atletico Madrid'),
+    'nfl': ('Arizona Cardinals', 'Atlanta Falcons', 'Baltimore Ravens', 'Buffalo Bills',
+            'Carolina Panthers', 'Chicago Bears', 'Cincinnati Bengals', 'Cleveland Browns',
+            'Dallas Cowboys', 'Denver Broncos', 'Detroit Lions', 'Green Bay Packers',
+            'Houston Texans', 'Indianapolis Colts', 'Jacksonville Jaguars', 'Kansas City Chiefs',
+            'Las Vegas Raiders', 'Los Angeles Chargers', 'Los Angeles Rams', 'Miami Dolphins',
+            'Minnesota Vikings', 'New England Patriots', 'New Orleans Saints', 'New York Giants',
+            'New York Jets', 'Philadelphia Eagles', 'Pittsburgh Steelers', 'San Francisco 49ers',
+            'Seattle Seahawks', 'Tampa Bay Buccaneers', 'Tennessee Titans', 'Washington Commanders')
+}
+
+# Starting lineup slots per position used by the lineup optimizer; positions
+# without an entry (including every position of custom leagues) get one slot
+DEFAULT_LINEUP_SLOTS = {
+    'f1': {'Driver': 2, 'Constructor': 1},
+    'epl': {'Goalkeeper': 1, 'Defender': 4, 'Midfielder': 4, 'Forward': 2},
+    'ucl': {'Goalkeeper': 1, 'Defender': 4, 'Midfielder': 4, 'Forward': 2},
+    'nfl': {'Quarterback': 1, 'Running Back': 2, 'Wide Receiver': 3, 'Tight End': 1,
+            'Defense': 1, 'Kicker': 1}
+}
+
+FALLBACK_POSITIONS = ('Player',)
+FALLBACK_TEAMS = ('Team A', 'Team B', 'Team C')
+
+
+class LeagueRegistry:
+    """Shared lookup of positions and teams per league name, stored as tuples"""
+    
+    def __init__(self):
+        self._positions = dict(DEFAULT_LEAGUE_POSITIONS)
+        self._teams = dict(DEFAULT_LEAGUE_TEAMS)
+    
+    def register(self, name, positions, teams):
+        """Register (or replace) the positions and teams of a league"""
+        self._positions[name] = tuple(positions) or FALLBACK_POSITIONS
+        self._teams[name] = tuple(teams) or FALLBACK_TEAMS
+    
+    def get_positions(self, name):
+        return self._positions.get(name, FALLBACK_POSITIONS)
+    
+    def get_teams(self, name):
+        return self._teams.get(name, FALLBACK_TEAMS)
+
+
+LEAGUE_REGISTRY = LeagueRegistry()
+
+
+def _frozen_setattr(self, name, value):
+    raise AttributeError(f"{type(self).__name__} is frozen; cannot set '{name}'")
+
 
 class League:
+    __slots__ = ('id', 'name', 'display_name', 'sport_type', 'description', 'scoring_system', '_dict')
+    
     def __init__(self, id, name, display_name, sport_type, description='', scoring_system='weighted'):
         self.id = id
         self.name = name  # Short name like 'f1', 'epl', 'ucl', 'nfl'
@@ -11,56 +85,57 @@ class League:
         self.sport_type = sport_type
         self.description = description
         self.scoring_system = scoring_system
+        self._dict = None  # Cached to_dict() result
     
     def get_position_types(self):
         """Return appropriate positions for this league"""
-        position_map = {
-            'f1': ['Driver', 'Constructor'],
-            'epl': ['Forward', 'Midfielder', 'Defender', 'Goalkeeper'],
-            'ucl': ['Forward', 'Midfielder', 'Defender', 'Goalkeeper'],
-            'nfl': ['Quarterback', 'Running Back', 'Wide Receiver', 'Tight End', 'Defense', 'Kicker']
-        }
-        return position_map.get(self.name, ['Player'])
+        return LEAGUE_REGISTRY.get_positions(self.name)
     
     def get_typical_teams(self):
         """Return example teams for this league"""
-        teams_map = {
-            'f1': ['Red Bull Racing', 'Mercedes', 'Ferrari', 'McLaren', 'Alpine', 'Aston Martin', 
-                   'Williams', 'AlphaTauri', 'Alfa Romeo', 'Haas'],
-            'epl': ['Manchester City', 'Arsenal', 'Liverpool', 'Chelsea', 'Newcastle United', 
-                    'Manchester United', 'Tottenham', 'Brighton', 'Aston Villa', 'West Ham'],
-            'ucl': ['Real Madrid', 'Manchester City', 'Bayern Munich', 'PSG', 'Liverpool', 
-                    'Barcelona', 'Chelsea', 'Inter Milan', 'AC Milan', 'Atletico Madrid'],
-            'nfl': ['Arizona Cardinals', 'Atlanta Falcons', 'Baltimore Ravens', 'Buffalo Bills',
-                    'Carolina Panthers', 'Chicago Bears', 'Cincinnati Bengals', 'Cleveland Browns',
-                    'Dallas Cowboys', 'Denver Broncos', 'Detroit Lions', 'Green Bay Packers',
-                    'Houston Texans', 'Indianapolis Colts', 'Jacksonville Jaguars', 'Kansas City Chiefs',
-                    'Las Vegas Raiders', 'Los Angeles Chargers', 'Los Angeles Rams', 'Miami Dolphins',
-                    'Minnesota Vikings', 'New England Patriots', 'New Orleans Saints', 'New York Giants',
-                    'New York Jets', 'Philadelphia Eagles', 'Pittsburgh Steelers', 'San Francisco 49ers',
-                    'Seattle Seahawks', 'Tampa Bay Buccaneers', 'Tennessee Titans', 'Washington Commanders']
-        }
-        return teams_map.get(self.name, ['Team A', 'Team B', 'Team C'])
+        return LEAGUE_REGISTRY.get_teams(self.name)
+    
+    def get_lineup_slots(self):
+        """Return the number of starting lineup slots for each position of this league"""
+        defaults = DEFAULT_LINEUP_SLOTS.get(self.name, {})
+        return {position: defaults.get(position, 1) for position in self.get_position_types()}
     
     def __repr__(self):
         return f"League(name='{self.name}', display='{self.display_name}', sport='{self.sport_type}')"
     
     def to_dict(self):
-        """Convert league to dictionary for easy serialization"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'display_name': self.display_name,
-            'sport_type': self.sport_type,
-            'description': self.description,
-            'scoring_system': self.scoring_system,
-            'positions': self.get_position_types(),
-            'typical_teams': self.get_typical_teams()
-        }
+        """Convert league to dictionary for easy serialization (computed once, do not mutate)"""
+        if self._dict is None:
+            object.__setattr__(self, '_dict', {
+                'id': self.id,
+                'name': self.name,
+                'display_name': self.display_name,
+                'sport_type': self.sport_type,
+                'description': self.description,
+                'scoring_system': self.scoring_system,
+                'positions': list(self.get_position_types()),
+                'typical_teams': list(self.get_typical_teams())
+            })
+        return self._dict
+    
+    def freeze(self):
+        """Make this league read-only, e.g. before sharing it between players"""
+        self.__class__ = FrozenLeague
+        return self
+
+
+class FrozenLeague(League):
+    """Read-only League; created with League.freeze()"""
+    __slots__ = ()
+    __setattr__ = _frozen_setattr
 
 
 class Player:
-    def __init__(self, name, team, position, scores, is_on_my_team=False, league_id=1):
+    __slots__ = ('id', 'name', 'team', 'position', '_scores', '_scores_json',
+                 'final_score', 'is_on_my_team', 'league_id', 'league')
+    
+    def __init__(self, name, team, position, scores, is_on_my_team=False, league_id=1, player_id=None):
+        self.id = player_id  # Primary key, assigned by the database
         self.name = name
         self.team = team
         self.position = position
@@ -70,6 +145,42 @@ class Player:
         self.league_id = league_id
         self.league = None  # Will be populated by database operations
     
+    @classmethod
+    def from_db(cls, player_id, name, team, position, scores_json, is_on_my_team, league_id, league=None):
+        """Build a player from a database row, keeping scores as raw JSON until first access"""
+        player = cls.__new__(cls)
+        player.id = player_id
+        player.name = name
+        player.team = team
+        player.position = position
+        player._scores = None
+        player._scores_json = scores_json
+        player.final_score = 0.0
+        player.is_on_my_team = bool(is_on_my_team)
+        player.league_id = league_id
+        player.league = league
+        return player
+    
+    @property
+    def scores(self):
+        """List of scores for each game week, decoded from JSON on first access"""
+        if self._scores is None:
+            object.__setattr__(self, '_scores', json.loads(self._scores_json) if self._scores_json else [])
+            object.__setattr__(self, '_scores_json', None)
+        return self._scores
+    
+    @scores.setter
+    def scores(self, value):
+        self._scores = value
+        self._scores_json = None
+    
+    @property
+    def scores_json(self):
+        """Scores encoded as the JSON stored in the database"""
+        if self._scores_json is not None:
+            return self._scores_json
+        return json.dumps(self._scores)
+    
     def __repr__(self):
         team_status = "⭐ MY TEAM" if self.is_on_my_team else "Available"
         league_name = self.league.name.upper() if self.league else f"League{self.league_id}"
@@ -78,6 +189,7 @@ class Player:
     def to_dict(self):
         """Convert player to dictionary for easy serialization"""
         return {
+            'id': self.id,
             'name': self.name,
             'team': self.team,
             'position': self.position,
@@ -87,3 +199,14 @@ class Player:
             'league_id': self.league_id,
             'league': self.league.to_dict() if self.league else None
         }
+    
+    def freeze(self):
+        """Make this player read-only, e.g. before storing it in a shared cache"""
+        self.__class__ = FrozenPlayer
+        return self
+
+
+class FrozenPlayer(Player):
+    """Read-only Player; created with Player.freeze()"""
+    __slots__ = ()
+    __setattr__ = _frozen_setattr
@@ -79,3 +79,34 @@ class WeightedScoreCalculator:
             'weighted_sum': weighted_sum,
             'weight_sum': weight_sum
         }
+    
+    def calculate_comparison(self, score_lists):
+        """
+        Calculate detailed breakdowns for several players and compare them week by week
+        
+        Args:
+            score_lists (list): One list of game week scores per player
+            
+        Returns:
+            dict: 'details' (a calculate_weighted_score_detailed result per player) and
+                  'weeks' (per game week: each player's score or None if not played,
+                  the difference to the first player's score, and the best score)
+        """
+        details = [self.calculate_weighted_score_detailed(scores) for scores in score_lists]
+        
+        weeks = []
+        for i in range(max((len(scores) for scores in score_lists), default=0)):
+            week_scores = [scores[i] if i < len(scores) else None for scores in score_lists]
+            baseline = week_scores[0]
+            weeks.append({
+                'week': i + 1,
+                'scores': week_scores,
+                'diffs': [None if score is None or baseline is None else score - baseline
+                          for score in week_scores],
+                'best': max(score for score in week_scores if score is not None)
+            })
+        
+        return {
+            'details': details,
+            'weeks': weeks
+        }
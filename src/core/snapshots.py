@@ -0,0 +1,187 @@
+"""
+Weekly leaderboard snapshots for fantasy sports leagues
+
+After game week N every player of a league is ranked by the weighted score of
+their first N scores (players with fewer scores are ranked on all they have).
+The rank and score per player and week are stored in leaderboard_snapshots, so
+rank history and week-over-week movers are plain indexed reads instead of
+leaderboards rebuilt from score prefixes.
+
+Snapshots are written incrementally: a refresh recomputes from the earliest
+week whose scores changed since the last one (found by comparing the change
+journal's rows before and after), so the still-open latest week and corrected
+older weeks are rewritten where ranks or scores moved, and new weeks are
+appended. Leagues without journal entries since their last snapshot are
+skipped entirely. The web app refreshes in the background shortly after
+writes, in one worker at a time; scripts/snapshot_weeks.py does the same from
+the command line (and backfills or rebuilds history).
+"""
+
+import json
+import threading
+from itertools import chain, islice
+from operator import itemgetter, mul
+
+# How long one worker's claim on the background refresh lasts (see Database.claim_job)
+CLAIM_SECONDS = 600.0
+
+
+class WeekSnapshotter:
+    def __init__(self, db, delay=5.0):
+        """
+        Args:
+            db (Database): Source of player scores and store for the snapshots
+            delay (float): Seconds watch() waits after a write before refreshing,
+                so a burst of writes costs one refresh
+        """
+        self.db = db
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def refresh(self, league_id, rebuild=False):
+        """
+        Bring one league's snapshots up to date
+
+        Returns:
+            int: The league's latest snapshotted week (0 if it has no scores yet)
+        """
+        state = self.db.get_snapshot_state(league_id)
+        version = self.db.get_data_version()
+        if state and not rebuild and not self.db.league_changed_since(league_id, state[1]):
+            return state[0]
+
+        min_id, max_id, total = self.db.get_player_id_bounds(league_id)
+        histories = []
+        if total:
+            histories = [(player_id, json.loads(scores))
+                         for player_id, scores in self.db.get_scores_in_range(min_id, max_id, league_id)]
+        latest = max((len(scores) for _, scores in histories), default=0)
+
+        # Weeks up to the previously latest one are recomputed from the earliest
+        # changed week, rewriting only rows whose rank or score moved; later
+        # weeks are new
+        recorded_weeks = 0
+        first_week = 1
+        if state and not rebuild:
+            recorded_weeks = min(state[0], latest)
+            first_week = self._first_changed_week(league_id, state, histories, max(recorded_weeks, 1))
+        weeks = self._rank_weeks(histories, first_week, latest)
+        rows = []
+        removed = []
+        for week, ranked in islice(weeks, max(recorded_weeks - first_week + 1, 0)):
+            recorded = self.db.get_week_snapshot(league_id, week)
+            rows.extend(row for row in ranked if recorded.pop(row[1], None) != row[2:])
+            removed.extend((week, player_id) for player_id in recorded)
+
+        new_rows = (row for _, ranked in weeks for row in ranked)
+        self.db.save_week_snapshots(league_id, chain(rows, new_rows), removed, latest, version, rebuild)
+        return latest
+
+    def _first_changed_week(self, league_id, state, histories, open_week):
+        """Earliest week, at most open_week, whose ranking the writes since the last refresh can have moved"""
+        cleared, previous = self.db.get_previous_scores(league_id, state[1])
+        if cleared:
+            return 1
+        current = dict(histories)
+        changed = []
+        unknown = []
+        for player_id, scores in previous.items():
+            if scores is None:
+                unknown.append(player_id)
+            else:
+                changed.append(self._first_difference(json.loads(scores), current.get(player_id, [])))
+        if unknown:
+            # No older journal row (compacted, or loaded before the journal):
+            # compare the snapshotted weighted scores instead
+            recorded = self.db.get_snapshot_scores(league_id, unknown, open_week)
+            changed.extend(self._first_difference(recorded.get(player_id, []),
+                                                  self._weighted_scores(current.get(player_id, []), open_week))
+                           for player_id in unknown)
+        return min([open_week] + [week for week in changed if week is not None])
+
+    def refresh_all(self, rebuild=False):
+        """Refresh every league; returns {league_id: latest week}"""
+        return {league.id: self.refresh(league.id, rebuild) for league in self.db.get_all_leagues()}
+
+    def watch(self):
+        """Refresh all leagues in the background, self.delay seconds after each burst of writes"""
+        self.db.add_change_listener(self.schedule)
+
+    def schedule(self):
+        """Refresh all leagues in a background thread after self.delay seconds, unless already pending"""
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._run_scheduled)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _run_scheduled(self):
+        with self._lock:
+            self._timer = None
+        token = self.db.claim_job('week_snapshots', CLAIM_SECONDS)
+        if token is None:
+            # Another worker is refreshing, maybe from before this process's
+            # writes; try again later rather than refreshing alongside it
+            self.schedule()
+            return
+        try:
+            self.refresh_all()
+        except Exception as e:
+            print(f"Weekly snapshot refresh failed: {e}")
+        finally:
+            self.db.release_job('week_snapshots', token)
+
+    @staticmethod
+    def _first_difference(old, new):
+        """1-based position of the first entry that differs between two lists, or None if they are equal"""
+        for week, (a, b) in enumerate(zip(old, new), 1):
+            if a != b:
+                return week
+        return min(len(old), len(new)) + 1 if len(old) != len(new) else None
+
+    @staticmethod
+    def _weighted_scores(scores, last_week):
+        """Weighted score after each week up to last_week, computed exactly as _rank_weeks does"""
+        weighted_sum = 0
+        weighted = []
+        for week in range(1, last_week + 1):
+            if week <= len(scores):
+                weighted_sum += scores[week - 1] * week
+                weighted.append(weighted_sum / (week * (week + 1) // 2))
+            elif weighted:
+                weighted.append(weighted[-1])
+        return weighted
+
+    @staticmethod
+    def _rank_weeks(histories, first_week, last_week):
+        """Yield (week, [(week, player_id, rank, score), ...]) for each week, ranked like the leaderboard"""
+        # Weighted sums up to the week before first_week, then one running step
+        # per week: (s1*1 + ... + sN*N) / (1 + ... + N), as in WeightedScoreCalculator
+        weighted_sums = []
+        week_scores = []
+        for _, scores in histories:
+            played = min(len(scores), first_week - 1)
+            weighted_sums.append(sum(map(mul, scores[:played], range(1, played + 1))))
+            week_scores.append(weighted_sums[-1] / (played * (played + 1) // 2) if played else None)
+
+        for week in range(first_week, last_week + 1):
+            for i, (_, scores) in enumerate(histories):
+                if week <= len(scores):
+                    weighted_sums[i] += scores[week - 1] * week
+                    week_scores[i] = weighted_sums[i] / (week * (week + 1) // 2)
+
+            entries = sorted(((score, histories[i][0]) for i, score in enumerate(week_scores) if score is not None),
+                             key=lambda entry: entry[0], reverse=True)
+            ranked = []
+            rank = 0
+            previous = None
+            for position, (score, player_id) in enumerate(entries, 1):
+                # Tied scores share a rank, as in Database.get_player_rank
+                if score != previous:
+                    rank = position
+                    previous = score
+                ranked.append((week, player_id, rank, score))
+            # Primary key order makes the inserts appends
+            ranked.sort(key=itemgetter(1))
+            yield week, ranked
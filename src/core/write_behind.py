@@ -0,0 +1,193 @@
+"""
+Write-behind queue for player score updates
+
+During live match windows score corrections arrive far faster than one
+connection and commit each can keep up with. Score updates submitted here are
+held in memory and written by a background thread in one transaction (and one
+data version bump) per flush. A flush happens every `interval` seconds, or as
+soon as `batch_size` players are pending. Every update replaces a player's
+whole score list, so repeated updates to the same player coalesce: only the
+latest one is written.
+
+Durability controls:
+- durability='buffered' (default): submit() returns once the update is
+  queued; a crash loses at most the updates of the last interval
+- durability='commit': submit() blocks until the update is committed; updates
+  from concurrent callers still share one transaction (group commit)
+- synchronous: SQLite synchronous level used for the flush transactions
+- max_pending: submit() waits for a flush while this many players are pending
+
+close() flushes whatever is still pending and stops the thread; it is
+registered with atexit when the queue starts. Until a flush, reads return the
+previous scores; call flush() first when a caller needs to read its own writes.
+"""
+
+import atexit
+import math
+import threading
+import time
+
+from .database import SYNCHRONOUS_LEVELS
+
+DURABILITY_MODES = ('buffered', 'commit')
+
+
+class WriteBehindQueue:
+    def __init__(self, db, interval=0.5, batch_size=500, durability='buffered',
+                 synchronous=None, max_pending=10000):
+        """
+        Args:
+            db (Database): Database the updates are written to
+            interval (float): Seconds between flushes while updates are pending
+            batch_size (int): Pending players that trigger an early flush
+            durability (str): 'buffered' or 'commit', see the module docstring
+            synchronous (str): SQLite synchronous level for flushes, or None for the default
+            max_pending (int): Pending players at which submit() waits for a flush
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        if synchronous is not None and synchronous.upper() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unknown synchronous level: {synchronous}")
+
+        self.db = db
+        self.interval = interval
+        self.batch_size = batch_size
+        self.durability = durability
+        self.synchronous = synchronous
+        self.max_pending = max(max_pending, batch_size)
+
+        self.submitted = 0
+        self.coalesced = 0  # Updates replaced by a newer one before being written
+        self.written = 0
+        self.batches = 0
+
+        self._pending = {}  # player_id -> latest scores
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()  # Keeps batches committing in the order taken
+        self._flush_requested = False
+        self._next_batch = 0  # Sequence number of the batch pending updates will go out in
+        self._committed = 0  # Batches with a lower sequence number are committed
+        self._thread = None
+        self._closed = False
+
+    def start(self):
+        """Start the background writer (also done by the first submit); returns the queue"""
+        with self._condition:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        return self
+
+    def submit(self, player_id, scores):
+        """
+        Queue a player's new scores; raises ValueError for NaN or infinite
+        scores and RuntimeError once the queue is closed
+
+        Returns:
+            bool: True once queued ('buffered') or committed ('commit'); False if
+                the queue closed before a 'commit' update could be written
+        """
+        scores = [float(score) for score in scores]
+        # Rejected here, since a flush would fail on them and retry forever
+        if not all(map(math.isfinite, scores)):
+            raise ValueError('scores must be finite numbers')
+        self.start()
+        with self._condition:
+            while len(self._pending) >= self.max_pending and player_id not in self._pending and not self._closed:
+                self._flush_requested = True
+                self._condition.notify_all()
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError('Write-behind queue is closed')
+
+            if player_id in self._pending:
+                self.coalesced += 1
+            self._pending[player_id] = scores
+            self.submitted += 1
+            batch = self._next_batch
+
+            if self.durability == 'commit' or len(self._pending) >= self.batch_size:
+                self._flush_requested = True
+                self._condition.notify_all()
+            if self.durability == 'commit':
+                while self._committed <= batch and not (self._closed and self._thread is None):
+                    self._condition.wait()
+                return self._committed > batch
+        return True
+
+    def pending(self):
+        """Number of players with updates not yet written"""
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self):
+        """Write all pending updates now, in the calling thread; returns the number of players written"""
+        return self._flush_pending()
+
+    def close(self):
+        """Flush pending updates and stop the writer; returns the number of players left unwritten"""
+        with self._condition:
+            if self._closed:
+                return len(self._pending)
+            self._closed = True
+            thread = self._thread
+            self._condition.notify_all()
+
+        if thread is not None:
+            thread.join()
+        else:
+            self._flush_pending()
+
+        with self._condition:
+            self._thread = None
+            self._condition.notify_all()
+            left = len(self._pending)
+        if left:
+            print(f"Write-behind queue closed with {left} unwritten score updates")
+        return left
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.interval
+                while not (self._closed or self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                closing = self._closed
+            self._flush_pending()
+            if closing:
+                return
+
+    def _flush_pending(self):
+        with self._flush_lock:
+            with self._condition:
+                self._flush_requested = False
+                batch = self._pending
+                if not batch:
+                    return 0
+                self._pending = {}
+                sequence = self._next_batch
+                self._next_batch += 1
+                # Producers waiting on max_pending can continue into the next batch
+                self._condition.notify_all()
+
+            try:
+                # Unknown player ids are skipped, so count what was actually written
+                written = self.db.update_scores_batch(batch.items(), self.synchronous)
+            except Exception as e:
+                print(f"Write-behind flush of {len(batch)} score updates failed: {e}")
+                with self._condition:
+                    # Retry with the next flush, unless a newer update arrived meanwhile
+                    for player_id, scores in batch.items():
+                        self._pending.setdefault(player_id, scores)
+                return 0
+
+            with self._condition:
+                self._committed = sequence + 1
+                self.written += written
+                self.batches += 1
+                self._condition.notify_all()
+            return written
@@ -3,22 +3,102 @@ Flask web application for the Fantasy Sports Player Scoring App
 Multi-League Support for F1, EPL, UCL, NFL
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, flash, jsonify, session
 import sys
 import os
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.core.database import Database
+from src.core.database import Database, DEFAULT_USER, PLAYER_SORT_KEYS
 from src.core.scoring import WeightedScoreCalculator
 from src.core.models import Player
-import json
-
+from src.core.lineup import LineupOptimizer, player_price
+from src.core.projections import ProjectionEngine
+from src.core.snapshots import WeekSnapshotter
+from src.core.write_behind import WriteBehindQueue
+from src.core.columnar import ColumnarSnapshots
+from src.core.analytics import LeagueAnalytics
+from src.web.page_cache import PageCache
+from src.web.live_updates import LeaderboardStream, stream_leaderboard
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here-multi-league'  # Change this in production
 
-# Initialize database and calculator
-db = Database('data/fantasy_players.db')
+# Rendered page cache for the leaderboard, teams and positions views
+app.config['PAGE_CACHE_ENABLED'] = os.environ.get('FANTASY_PAGE_CACHE', '1') != '0'
+app.config['PAGE_CACHE_MAX_BYTES'] = int(os.environ.get('FANTASY_PAGE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+# Optional write-behind queue for score updates posted to /api/player/<id>/scores
+app.config['WRITE_BEHIND_ENABLED'] = os.environ.get('FANTASY_WRITE_BEHIND', '0') == '1'
+app.config['WRITE_BEHIND_INTERVAL'] = float(os.environ.get('FANTASY_WRITE_BEHIND_INTERVAL', 0.5))
+app.config['WRITE_BEHIND_DURABILITY'] = os.environ.get('FANTASY_WRITE_BEHIND_DURABILITY', 'buffered')
+
+# Optional in-memory copy of the database serving leaderboard and lookup reads
+app.config['READ_REPLICA_ENABLED'] = os.environ.get('FANTASY_READ_REPLICA', '0') == '1'
+
+# Optional columnar league files, memory-mapped and shared by all worker processes
+app.config['COLUMNAR_ENABLED'] = os.environ.get('FANTASY_COLUMNAR', '0') == '1'
+app.config['COLUMNAR_DIR'] = os.environ.get('FANTASY_COLUMNAR_DIR', os.path.join('data', 'columnar'))
+
+# Live leaderboard streams allowed at once in this process; each holds a thread while open
+app.config['MAX_STREAMS'] = int(os.environ.get('FANTASY_MAX_STREAMS', 8))
+
+# SQLite settings for several processes sharing the database file
+app.config['SQLITE_WAL'] = os.environ.get('FANTASY_SQLITE_WAL', '0') == '1'
+app.config['SQLITE_BUSY_TIMEOUT'] = float(os.environ.get('FANTASY_SQLITE_BUSY_TIMEOUT', 5.0))
+
+# Initialize database and calculator; the schema and league metadata are set
+# up on the first request rather than at import time
+db = Database('data/fantasy_players.db', lazy=True, replica=app.config['READ_REPLICA_ENABLED'],
+              wal=app.config['SQLITE_WAL'], busy_timeout=app.config['SQLITE_BUSY_TIMEOUT'])
 calculator = WeightedScoreCalculator()
+optimizer = LineupOptimizer(calculator)
+projection_engine = ProjectionEngine(db)
+league_analytics = LeagueAnalytics(db)
+page_cache = PageCache(app.config['PAGE_CACHE_MAX_BYTES'])
+leaderboard_stream = LeaderboardStream(db, calculator, projection_engine)
+stream_slots = threading.BoundedSemaphore(app.config['MAX_STREAMS'])
+
+# Weekly rank snapshots are refreshed in the background a few seconds after writes
+week_snapshots = WeekSnapshotter(db)
+week_snapshots.watch()
+
+# Coalesces score updates into batched transactions; flushed on shutdown
+score_writer = None
+if app.config['WRITE_BEHIND_ENABLED']:
+    score_writer = WriteBehindQueue(db, app.config['WRITE_BEHIND_INTERVAL'],
+                                    durability=app.config['WRITE_BEHIND_DURABILITY']).start()
+
+# Re-exported shortly after writes; until then views read the database
+columnar_snapshots = None
+if app.config['COLUMNAR_ENABLED']:
+    columnar_snapshots = ColumnarSnapshots(db, calculator, app.config['COLUMNAR_DIR'])
+    columnar_snapshots.watch()
+
+def league_projected_scores(league_id, players):
+    """Map each player's id to their projected next game week score"""
+    projections = projection_engine.get_league_projections(league_id)
+    # A player written after the projections were fitted projects to 0 until the next refit
+    return {player.id: projections.get(player.id, {}).get('projected', 0.0) for player in players}
+
+def league_leaderboard(league_id, user_id=None):
+    """
+    Players of a league with final scores, best first
+    
+    Served from the league's columnar snapshot when it is at the league's
+    current version, otherwise read from the database. Roster status is only
+    filled in when a user is given.
+    """
+    snapshot = columnar_snapshots.get(league_id) if columnar_snapshots else None
+    if snapshot is not None:
+        roster_ids = db.get_roster_ids(league_id, user_id) if user_id else ()
+        return snapshot.to_players(db.get_league_by_id(league_id), roster_ids)
+    
+    players = db.get_players_by_league(league_id, user_id or DEFAULT_USER)
+    for player in players:
+        player.final_score = calculator.calculate_weighted_score(player.scores)
+    # Ties in id order, as Database.get_player_rank counts them
+    players.sort(key=lambda p: (-p.final_score, p.id))
+    return players
 
 def get_current_league():
     """Get the currently selected league from session, default to EPL"""
@@ -28,6 +108,30 @@ def set_current_league(league_id):
     """Set the currently selected league in session"""
     session['current_league'] = league_id
 
+def get_current_user():
+    """Get the manager whose roster is shown from session, default to the shared default roster"""
+    return session.get('user_id', DEFAULT_USER)
+
+def render_cached_page(view, league_id, render_page, user_id=None):
+    """
+    Serve a league view from the page cache, rendering it on a miss
+    
+    Pages are keyed by (league, view, user, data version, the league's snapshot
+    version, the user's roster version), so any committed write or weekly
+    snapshot refresh makes older entries unreachable; views that show roster
+    status pass the user, whose roster toggles only invalidate their own
+    pages, and the others share one entry. Requests with pending flash
+    messages are always rendered fresh, since the messages are part of the page.
+    """
+    if not app.config['PAGE_CACHE_ENABLED'] or '_flashes' in session:
+        return render_page()
+    
+    key = (league_id, view, user_id) + db.get_page_version(league_id, user_id)
+    body = page_cache.get(key)
+    if body is None:
+        body = page_cache.set(key, render_page())
+    return body
+
 @app.route('/')
 @app.route('/league/<int:league_id>')
 def index(league_id=None):
@@ -36,6 +140,7 @@ def index(league_id=None):
         set_current_league(league_id)
     
     current_league = get_current_league()
+    current_user = get_current_user()
     league = db.get_league_by_id(current_league)
     
     if not league:
@@ -43,21 +148,44 @@ def index(league_id=None):
         set_current_league(2)
         return redirect(url_for('index'))
     
-    # Get players for this league and calculate scores
-    players = db.get_players_by_league(current_league)
-    for player in players:
-        player.final_score = calculator.calculate_weighted_score(player.scores)
-    
-    # Sort by final score in descending order
-    players.sort(key=lambda p: p.final_score, reverse=True)
-    
-    # Get all leagues for navigation
-    all_leagues = db.get_all_leagues()
+    # ?sort=projected orders by next game week projection instead of final score
+    sort = 'projected' if request.args.get('sort') == 'projected' else 'score'
     
-    return render_template('index.html', 
-                         players=players, 
-                         current_league=league,
-                         all_leagues=all_leagues)
+    def render_page():
+        # Read the version first so live updates resume from no later than this page
+        data_version = db.get_data_version()
+        
+        # Rank movement comes from the weekly snapshots, whose version is part
+        # of the page cache key
+        snapshot = db.get_snapshot_state(current_league)
+        if snapshot is None:
+            week_snapshots.schedule()
+        
+        # Get players for this league with their scores
+        players = league_leaderboard(current_league, current_user)
+        projected = league_projected_scores(current_league, players)
+        movements = db.get_rank_movements(current_league, snapshot[0]) if snapshot else {}
+        
+        # Already sorted by final score; re-sort by projection if asked
+        if sort == 'projected':
+            players.sort(key=lambda p: projected[p.id], reverse=True)
+        
+        # Get all leagues for navigation
+        all_leagues = db.get_all_leagues()
+        
+        return render_template('index.html', 
+                             players=players, 
+                             projected=projected,
+                             movements=movements,
+                             snapshot_week=snapshot[0] if snapshot else None,
+                             sort=sort,
+                             current_league=league,
+                             all_leagues=all_leagues,
+                             current_user=current_user,
+                             data_version=data_version)
+    
+    view = 'index' if sort == 'score' else f'index:{sort}'
+    return render_cached_page(view, current_league, render_page, current_user)
 
 @app.route('/add_player', methods=['GET', 'POST'])
 def add_player():
@@ -79,7 +207,7 @@ def add_player():
             scores = [float(score.strip()) for score in scores_str.split(',')]
             player = Player(name, team, position, scores, is_on_my_team, league_id)
             
-            if db.add_player(player):
+            if db.add_player(player, get_current_user()):
                 league_name = db.get_league_by_id(league_id).display_name
                 team_status = " and added to your team" if is_on_my_team else ""
                 flash(f'Player {name} added to {league_name} successfully!{team_status}', 'success')
@@ -96,11 +224,10 @@ def add_player():
                          current_league=league,
                          all_leagues=all_leagues)
 
-@app.route('/player/<player_name>')
-def player_detail(player_name):
+@app.route('/player/<int:player_id>')
+def player_detail(player_id):
     """Show detailed information for a specific player"""
-    current_league = get_current_league()
-    player = db.get_player_by_name(player_name, current_league)
+    player = db.get_player_by_id(player_id, get_current_user())
     
     if player:
         # Calculate detailed breakdown
@@ -108,30 +235,78 @@ def player_detail(player_name):
         player.final_score = detailed_calc['final_score']
         
         all_leagues = db.get_all_leagues()
-        current_league_obj = db.get_league_by_id(current_league)
         
         return render_template('player_detail.html', 
                              player=player, 
                              calculation=detailed_calc,
-                             current_league=current_league_obj,
+                             projection=projection_engine.get_projection(player),
+                             current_league=player.league,
                              all_leagues=all_leagues)
     else:
-        flash(f'Player {player_name} not found in current league.', 'error')
+        flash('Player not found.', 'error')
         return redirect(url_for('index'))
 
-@app.route('/toggle_team/<player_name>')
-def toggle_team_status(player_name):
+# Upper bound on players per comparison, to keep pages readable and queries small
+MAX_COMPARE_PLAYERS = 20
+
+def compare_players(player_ids):
+    """Load players in one query and compare them; returns (players, comparison, missing ids)"""
+    player_ids = list(dict.fromkeys(player_ids))[:MAX_COMPARE_PLAYERS]
+    players = db.get_players_by_ids(player_ids, get_current_user())
+    comparison = calculator.calculate_comparison([player.scores for player in players])
+    for player, detail in zip(players, comparison['details']):
+        player.final_score = detail['final_score']
+    
+    found = {player.id for player in players}
+    return players, comparison, [player_id for player_id in player_ids if player_id not in found]
+
+def requested_player_ids():
+    """Player ids from ?ids=1,2,3 (also accepted as repeated ids= parameters)"""
+    player_ids = []
+    for value in request.args.getlist('ids'):
+        player_ids.extend(int(part) for part in value.split(',') if part.strip().isdigit())
+    return player_ids
+
+@app.route('/compare')
+def compare():
+    """Show several players' breakdowns side by side, e.g. /compare?ids=1,2,3"""
+    players, comparison, missing = compare_players(requested_player_ids())
+    if missing:
+        flash(f"Players not found: {', '.join(str(player_id) for player_id in missing)}", 'error')
+    
+    return render_template('compare.html',
+                         players=players,
+                         comparison=comparison,
+                         max_players=MAX_COMPARE_PLAYERS)
+
+@app.route('/api/compare')
+def api_compare():
+    """API endpoint comparing several players, e.g. /api/compare?ids=1,2,3"""
+    player_ids = requested_player_ids()
+    if not player_ids:
+        return jsonify({'error': 'Pass player ids as ?ids=1,2,3'}), 400
+    
+    players, comparison, missing = compare_players(player_ids)
+    return jsonify({
+        'players': [dict(player.to_dict(), calculation=detail)
+                    for player, detail in zip(players, comparison['details'])],
+        'weeks': comparison['weeks'],
+        'missing': missing
+    })
+
+@app.route('/toggle_team/<int:player_id>')
+def toggle_team_status(player_id):
     """Toggle whether a player is on my team or not"""
-    success = db.toggle_my_team_status(player_name)
+    current_user = get_current_user()
+    success = db.toggle_my_team_status(player_id, current_user)
     if success:
-        current_league = get_current_league()
-        player = db.get_player_by_name(player_name, current_league)
+        player = db.get_player_by_id(player_id, current_user)
         if player and player.is_on_my_team:
-            flash(f'{player_name} added to your team!', 'success')
+            flash(f'{player.name} added to your team!', 'success')
         elif player:
-            flash(f'{player_name} removed from your team!', 'success')
+            flash(f'{player.name} removed from your team!', 'success')
     else:
-        flash(f'Player {player_name} not found.', 'error')
+        flash('Player not found.', 'error')
     
     return redirect(url_for('index'))
 
@@ -139,8 +314,9 @@ def toggle_team_status(player_name):
 def my_team():
     """Show only players on my team in current league"""
     current_league = get_current_league()
+    current_user = get_current_user()
     league = db.get_league_by_id(current_league)
-    my_team_players = db.get_my_team_players(current_league)
+    my_team_players = db.get_my_team_players(current_league, current_user)
     
     # Sort by final score
     for player in my_team_players:
@@ -152,14 +328,16 @@ def my_team():
     return render_template('my_team.html', 
                          players=my_team_players,
                          current_league=league,
-                         all_leagues=all_leagues)
+                         all_leagues=all_leagues,
+                         current_user=current_user)
 
 @app.route('/available_players')
 def available_players():
     """Show only available players (not on my team) in current league"""
     current_league = get_current_league()
+    current_user = get_current_user()
     league = db.get_league_by_id(current_league)
-    available = db.get_available_players(current_league)
+    available = db.get_available_players(current_league, current_user)
     
     # Sort by final score
     for player in available:
@@ -171,16 +349,16 @@ def available_players():
     return render_template('available_players.html', 
                          players=available,
                          current_league=league,
-                         all_leagues=all_leagues)
+                         all_leagues=all_leagues,
+                         current_user=current_user)
 
-@app.route('/edit_player/<player_name>', methods=['GET', 'POST'])
-def edit_player(player_name):
-    """Edit an existing player in current league"""
-    current_league = get_current_league()
-    player = db.get_player_by_name(player_name, current_league)
+@app.route('/edit_player/<int:player_id>', methods=['GET', 'POST'])
+def edit_player(player_id):
+    """Edit an existing player"""
+    player = db.get_player_by_id(player_id)
     
     if not player:
-        flash(f'Player {player_name} not found in current league.', 'error')
+        flash('Player not found.', 'error')
         return redirect(url_for('index'))
     
     if request.method == 'POST':
@@ -193,29 +371,29 @@ def edit_player(player_name):
         try:
             new_scores = [float(score.strip()) for score in scores_str.split(',')]
             
-            if db.update_player_info(player_name, new_name, new_team, new_position, new_scores):
+            if db.update_player_info(player_id, new_name, new_team, new_position, new_scores):
                 flash(f'Player {new_name} updated successfully!', 'success')
-                return redirect(url_for('player_detail', player_name=new_name))
+                return redirect(url_for('player_detail', player_id=player_id))
             else:
                 flash('Failed to update player. Name might already exist.', 'error')
         except ValueError:
             flash('Invalid scores format. Please enter comma-separated numbers.', 'error')
     
     all_leagues = db.get_all_leagues()
-    current_league_obj = db.get_league_by_id(current_league)
     
     return render_template('edit_player.html', 
                          player=player,
-                         current_league=current_league_obj,
+                         current_league=player.league,
                          all_leagues=all_leagues)
 
-@app.route('/delete_player/<player_name>', methods=['POST'])
-def delete_player(player_name):
-    """Delete a player from current league"""
-    if db.delete_player(player_name):
-        flash(f'Player {player_name} deleted successfully!', 'success')
+@app.route('/delete_player/<int:player_id>', methods=['POST'])
+def delete_player(player_id):
+    """Delete a player"""
+    player = db.get_player_by_id(player_id)
+    if player and db.delete_player(player_id):
+        flash(f'Player {player.name} deleted successfully!', 'success')
     else:
-        flash(f'Failed to delete player {player_name}.', 'error')
+        flash('Failed to delete player.', 'error')
     return redirect(url_for('index'))
 
 @app.route('/manage_data')
@@ -249,62 +427,354 @@ def api_leaderboard(league_id=None):
     if not league_id:
         league_id = get_current_league()
     
-    players = db.get_players_by_league(league_id)
+    players = db.get_players_by_league(league_id, get_current_user())
+    for player in players:
+        player.final_score = calculator.calculate_weighted_score(player.scores)
+    projected = league_projected_scores(league_id, players)
+    
+    if request.args.get('sort') == 'projected':
+        players.sort(key=lambda p: projected[p.id], reverse=True)
+    else:
+        players.sort(key=lambda p: (-p.final_score, p.id))
+    
+    return jsonify([dict(player.to_dict(), projected=projected[player.id]) for player in players])
+
+@app.route('/api/projections/<int:league_id>')
+def api_projections(league_id):
+    """API endpoint returning every player's next game week projection and its model components"""
+    if not db.get_league_by_id(league_id):
+        return jsonify({'error': 'League not found'}), 404
+    
+    projections = projection_engine.get_league_projections(league_id)
+    return jsonify({
+        'league_id': league_id,
+        'version': db.get_data_version(),
+        'projections': [dict(projection, player_id=player_id) for player_id, projection in projections.items()]
+    })
+
+@app.route('/api/player/<int:player_id>/rank_history')
+def api_rank_history(player_id):
+    """API endpoint returning a player's rank and weighted score after each game week"""
+    player = db.get_player_by_id(player_id)
+    if not player:
+        return jsonify({'error': 'Player not found'}), 404
+    
+    return jsonify({
+        'player_id': player.id,
+        'league_id': player.league_id,
+        'history': db.get_rank_history(player.id)
+    })
+
+@app.route('/api/leaderboard/<int:league_id>/movers')
+def api_rank_movers(league_id):
+    """API endpoint returning the biggest week-over-week rank risers and fallers, e.g. ?week=5&limit=10"""
+    if not db.get_league_by_id(league_id):
+        return jsonify({'error': 'League not found'}), 404
+    
+    snapshot = db.get_snapshot_state(league_id)
+    latest_week = snapshot[0] if snapshot else 0
+    week = min(request.args.get('week', latest_week, type=int), latest_week)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    
+    movers = db.get_rank_movers(league_id, week, limit) if week > 1 else {'risers': [], 'fallers': []}
+    return jsonify(dict(movers, league_id=league_id, week=week, previous_week=max(week - 1, 0)))
+
+def player_row_delta(player):
+    """Build the compact row payload returned by the AJAX mutation endpoints"""
+    return {
+        'id': player.id,
+        'name': player.name,
+        'team': player.team,
+        'position': player.position,
+        'scores': player.scores,
+        'final_score': calculator.calculate_weighted_score(player.scores),
+        'is_on_my_team': player.is_on_my_team,
+        'league_id': player.league_id
+    }
+
+@app.route('/api/leaderboard/<int:league_id>/stream')
+def api_leaderboard_stream(league_id):
+    """Server-Sent Events stream of leaderboard row changes and rank movements"""
+    if not db.get_league_by_id(league_id):
+        return jsonify({'error': 'League not found'}), 404
+    
+    # Browsers resend the last event id on reconnect; ?since= works for other clients
+    since = request.args.get('since', type=int)
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    
+    # An open stream keeps its thread until the client goes away, so past the
+    # cap new streams are refused rather than starving page requests
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({'error': 'Too many live streams open, try again later'}), 503, {'Retry-After': '30'}
+    
+    response = Response(stream_leaderboard(leaderboard_stream, league_id, since),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(stream_slots.release)
+    return response
+
+@app.route('/api/player/<int:player_id>/toggle_team', methods=['POST'])
+def api_toggle_team_status(player_id):
+    """API endpoint toggling my-team status, returning only the changed row and its rank"""
+    current_user = get_current_user()
+    if not db.toggle_my_team_status(player_id, current_user):
+        return jsonify({'error': 'Player not found'}), 404
+    
+    player = db.get_player_by_id(player_id, current_user)
+    return jsonify({
+        'player': player_row_delta(player),
+        'rank': db.get_player_rank(player_id),
+        'version': db.get_data_version()
+    })
+
+@app.route('/api/player/<int:player_id>/scores', methods=['POST'])
+def api_update_scores(player_id):
+    """API endpoint replacing a player's scores, e.g. {"scores": [80, 91]}; queued when write-behind is on"""
+    payload = request.get_json(silent=True) or {}
+    try:
+        scores = Database._score_list(payload['scores'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': "Request body must be a JSON object with a 'scores' list of finite numbers"}), 400
+    
+    if score_writer is not None:
+        # A closed queue (worker shutting down) raises; a 'commit' update it
+        # could not write returns False
+        try:
+            written = score_writer.submit(player_id, scores)
+        except RuntimeError:
+            written = False
+        if not written:
+            return jsonify({'error': 'Score update was not written, try again'}), 503
+        # Buffered updates are written within the flush interval; unknown ids are dropped then
+        if score_writer.durability == 'buffered':
+            return jsonify({'player_id': player_id, 'queued': True}), 202
+    elif not db.update_player_scores(player_id, scores):
+        return jsonify({'error': 'Player not found'}), 404
+    
+    # Committed, synchronously or in a write-behind batch
+    player = db.get_player_by_id(player_id, get_current_user())
+    if player is None:
+        return jsonify({'error': 'Player not found'}), 404
+    
+    return jsonify({
+        'player': player_row_delta(player),
+        'version': db.get_data_version()
+    })
+
+@app.route('/api/player/<int:player_id>/delete', methods=['POST'])
+def api_delete_player(player_id):
+    """API endpoint deleting a player, returning the removed id"""
+    if not db.delete_player(player_id):
+        return jsonify({'error': 'Player not found'}), 404
+    
+    return jsonify({
+        'deleted': player_id,
+        'version': db.get_data_version()
+    })
+
+@app.route('/api/changes')
+def api_changes():
+    """API endpoint returning change journal entries newer than ?since=<version>"""
+    since = request.args.get('since', 0, type=int)
+    league_id = request.args.get('league_id', type=int)
+    limit = min(max(request.args.get('limit', 1000, type=int), 1), 10000)
+    
+    return jsonify(db.get_changes(since, league_id, limit))
+
+@app.route('/api/search')
+def api_search():
+    """API endpoint searching player and team names, e.g. ?q=verst&league_id=1"""
+    query = request.args.get('q', '').strip()
+    league_id = request.args.get('league_id', type=int)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    
+    players = db.search_players(query, league_id, limit, get_current_user()) if query else []
     for player in players:
         player.final_score = calculator.calculate_weighted_score(player.scores)
-    players.sort(key=lambda p: p.final_score, reverse=True)
     
-    return jsonify([player.to_dict() for player in players])
+    return jsonify({'query': query, 'results': [player.to_dict() for player in players]})
+
+def requested_values(name):
+    """Values from ?name=a,b (also accepted as repeated name= parameters)"""
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(part.strip() for part in value.split(',') if part.strip())
+    return values
+
+@app.route('/api/players')
+def api_players():
+    """API endpoint filtering, sorting and paging players, e.g. ?team=Ferrari&min_score=80&sort=score"""
+    league_id = request.args.get('league_id', type=int) or get_current_league()
+    roster = request.args.get('roster')
+    order = request.args.get('order')
+    if roster not in (None, 'mine', 'available'):
+        return jsonify({'error': "roster must be 'mine' or 'available'"}), 400
+    if order not in (None, 'asc', 'desc'):
+        return jsonify({'error': "order must be 'asc' or 'desc'"}), 400
+    sort = request.args.get('sort', 'score')
+    if sort not in PLAYER_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of: {', '.join(PLAYER_SORT_KEYS)}"}), 400
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    result = db.query_players(
+        league_id,
+        teams=requested_values('team'),
+        positions=requested_values('position'),
+        on_team=None if roster is None else roster == 'mine',
+        min_score=request.args.get('min_score', type=float),
+        max_score=request.args.get('max_score', type=float),
+        min_weeks=request.args.get('min_weeks', type=int),
+        sort=sort,
+        descending=None if order is None else order == 'desc',
+        limit=limit,
+        offset=offset,
+        user_id=get_current_user()
+    )
+
+    return jsonify(dict(result, league_id=league_id, limit=limit, offset=offset,
+                        players=[player.to_dict() for player in result['players']]))
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """API endpoint applying a list of roster, score, insert and delete operations in one transaction"""
+    payload = request.get_json(silent=True)
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list):
+        return jsonify({'error': "Request body must be a JSON object with an 'operations' list"}), 400
+    
+    return jsonify(db.apply_batch(operations, get_current_user()))
 
 @app.route('/teams')
 def teams():
     """Show players grouped by teams in current league"""
     current_league = get_current_league()
     league = db.get_league_by_id(current_league)
-    all_players = db.get_players_by_league(current_league)
-    teams_dict = {}
     
-    for player in all_players:
-        player.final_score = calculator.calculate_weighted_score(player.scores)
-        if player.team not in teams_dict:
-            teams_dict[player.team] = []
-        teams_dict[player.team].append(player)
-    
-    # Sort players within each team by final score
-    for team in teams_dict:
-        teams_dict[team].sort(key=lambda p: p.final_score, reverse=True)
-    
-    all_leagues = db.get_all_leagues()
+    def render_page():
+        all_players = league_leaderboard(current_league)
+        teams_dict = {}
+        
+        for player in all_players:
+            if player.team not in teams_dict:
+                teams_dict[player.team] = []
+            teams_dict[player.team].append(player)
+        # Players arrive best first, so each team lists its players by final score
+        
+        all_leagues = db.get_all_leagues()
+        
+        return render_template('teams.html', 
+                             teams=teams_dict,
+                             current_league=league,
+                             all_leagues=all_leagues)
     
-    return render_template('teams.html', 
-                         teams=teams_dict,
-                         current_league=league,
-                         all_leagues=all_leagues)
+    return render_cached_page('teams', current_league, render_page)
 
 @app.route('/positions')
 def positions():
     """Show players grouped by positions in current league"""
     current_league = get_current_league()
     league = db.get_league_by_id(current_league)
-    all_players = db.get_players_by_league(current_league)
-    positions_dict = {}
     
-    for player in all_players:
-        player.final_score = calculator.calculate_weighted_score(player.scores)
-        if player.position not in positions_dict:
-            positions_dict[player.position] = []
-        positions_dict[player.position].append(player)
+    def render_page():
+        all_players = league_leaderboard(current_league)
+        positions_dict = {}
+        
+        for player in all_players:
+            if player.position not in positions_dict:
+                positions_dict[player.position] = []
+            positions_dict[player.position].append(player)
+        # Players arrive best first, so each position lists its players by final score
+        
+        all_leagues = db.get_all_leagues()
+        
+        return render_template('positions.html', 
+                             positions=positions_dict,
+                             current_league=league,
+                             all_leagues=all_leagues)
     
-    # Sort players within each position by final score
-    for position in positions_dict:
-        positions_dict[position].sort(key=lambda p: p.final_score, reverse=True)
+    return render_cached_page('positions', current_league, render_page)
+
+@app.route('/analytics')
+def analytics_page():
+    """Show team and position aggregates for the current league"""
+    current_league = get_current_league()
+    league = db.get_league_by_id(current_league)
     
-    all_leagues = db.get_all_leagues()
+    def render_page():
+        analytics = league_analytics.get_league_analytics(current_league) if league_analytics.available() else None
+        return render_template('analytics.html',
+                             analytics=analytics,
+                             current_league=league)
+    
+    return render_cached_page('analytics', current_league, render_page)
+
+@app.route('/api/analytics/<int:league_id>')
+def api_analytics(league_id):
+    """API endpoint returning per-team and per-position aggregates for a league"""
+    if not db.get_league_by_id(league_id):
+        return jsonify({'error': 'League not found'}), 404
+    if not league_analytics.available():
+        return jsonify({'error': 'Analytics need pandas, which is not installed'}), 503
+    
+    return jsonify(league_analytics.get_league_analytics(league_id))
+
+# Lineup Optimizer Routes
+def optimize_league_lineup(league_id):
+    """Run the lineup optimizer for a league with ?budget= and ?max_per_team= limits"""
+    league = db.get_league_by_id(league_id)
+    budget = request.args.get('budget', type=float)
+    max_per_team = request.args.get('max_per_team', type=int)
+    if max_per_team is not None and max_per_team < 1:
+        max_per_team = None
     
-    return render_template('positions.html', 
-                         positions=positions_dict,
+    players = db.get_players_by_league(league_id, get_current_user())
+    return league, optimizer.optimize(players, league.get_lineup_slots(), budget, max_per_team)
+
+@app.route('/optimize')
+def optimize_lineup():
+    """Show the highest-scoring lineup for the current league"""
+    current_league = get_current_league()
+    league, lineup = optimize_league_lineup(current_league)
+    
+    return render_template('optimize.html',
+                         lineup=lineup,
+                         player_price=player_price,
                          current_league=league,
-                         all_leagues=all_leagues)
+                         all_leagues=db.get_all_leagues())
+
+@app.route('/optimize/apply', methods=['POST'])
+def apply_lineup():
+    """Make my team in the current league exactly the submitted lineup"""
+    current_league = get_current_league()
+    current_user = get_current_user()
+    try:
+        selected = {int(player_id) for player_id in request.form.getlist('player_id')}
+    except ValueError:
+        abort(400, description='Lineup player ids must be whole numbers')
+    
+    # Ids outside the current league are ignored
+    players = db.get_players_by_league(current_league, current_user)
+    toggles = [{'op': 'toggle', 'player_id': player.id}
+               for player in players
+               if player.is_on_my_team != (player.id in selected)]
+    db.apply_batch(toggles, current_user)
+    
+    lineup_size = sum(player.id in selected for player in players)
+    flash(f'Your team now matches the optimized lineup ({lineup_size} players)!', 'success')
+    return redirect(url_for('my_team'))
+
+@app.route('/api/optimize/<int:league_id>')
+def api_optimize_lineup(league_id):
+    """API endpoint returning the highest-scoring lineup for a league"""
+    if not db.get_league_by_id(league_id):
+        return jsonify({'error': 'League not found'}), 404
+    
+    league, lineup = optimize_league_lineup(league_id)
+    return jsonify(dict(lineup, players=[dict(player.to_dict(), price=player_price(player.scores))
+                                         for player in lineup['players']]))
 
 # League Management Routes
 @app.route('/switch_league/<int:league_id>')
@@ -318,31 +788,51 @@ def switch_league(league_id):
         flash('League not found!', 'error')
     return redirect(url_for('index'))
 
+@app.route('/switch_user', methods=['POST'])
+def switch_user():
+    """Switch to another manager's roster (created on their first pick)"""
+    user_id = request.form.get('user_id', '').strip()[:50]
+    if user_id:
+        session['user_id'] = user_id
+        flash(f'Now managing the roster of {user_id}', 'success')
+    else:
+        flash('Manager name cannot be empty!', 'error')
+    return redirect(url_for('index'))
+
 @app.route('/leagues')
 def leagues_overview():
     """Show overview of all leagues"""
-    leagues = db.get_all_leagues()
-    league_stats = []
-    
-    for league in leagues:
-        players = db.get_players_by_league(league.id)
-        my_team_count = len([p for p in players if p.is_on_my_team])
-        league_stats.append({
-            'league': league,
-            'total_players': len(players),
-            'my_team_players': my_team_count
-        })
+    league_stats = db.get_league_stats(get_current_user())
     
     return render_template('leagues.html', league_stats=league_stats)
 
+def warm_caches():
+    """
+    Render every league's cached views once so the first real requests are hits
+    
+    Used by the production server in each worker before it accepts traffic.
+    Returns the number of pages rendered.
+    """
+    if not app.config['PAGE_CACHE_ENABLED']:
+        return 0
+    
+    pages = 0
+    with app.test_client() as client:
+        for league in db.get_all_leagues():
+            # The league URL also selects the league for the following views
+            for path in (f'/league/{league.id}', '/teams', '/positions'):
+                if client.get(path).status_code == 200:
+                    pages += 1
+    return pages
+
 if __name__ == '__main__':
     # Initialize sample data if needed
-    all_leagues = db.get_all_leagues()
-    for league in all_leagues:
-        if len(db.get_players_by_league(league.id)) == 0:
-            # If any league is empty, run the populate script
-            from scripts.setup import populate_leagues
-            populate_leagues.populate_all_leagues()
-            break
-    
-    app.run(debug=True, port=5000)
+    if db.has_empty_league():
+        # If any league is empty, run the populate script
+        from scripts.setup import populate_leagues
+        populate_leagues.populate_all_leagues()
+    
+    # Debug mode (reloader, interactive tracebacks) is opt-in; use
+    # scripts/launchers/serve.py for a multi-process production server
+    debug = '--debug' in sys.argv or os.environ.get('FLASK_DEBUG') == '1'
+    app.run(debug=debug, port=5000, threaded=True)
@@ -0,0 +1,215 @@
+"""
+Live leaderboard updates for Server-Sent Events subscribers
+
+LeaderboardStream keeps the last published leaderboard of each watched league.
+When a write lands, the first subscriber to wake recomputes that league once
+and records a delta event (changed rows with their rank movement, plus removed
+player ids); every other subscriber is served the same event. A short history
+of events lets clients reconnect from the last version they saw.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+
+class LeaderboardStream:
+    def __init__(self, db, calculator, projections=None, history_size=100):
+        self.db = db
+        self.calculator = calculator
+        self.projections = projections  # Optional ProjectionEngine
+        self.history_size = history_size
+        self._condition = threading.Condition()
+        self._leagues = {}  # league_id -> {'version', 'start_version', 'rows', 'events'}
+        self._league_locks = {}  # league_id -> lock held while recomputing that league
+        self._generation = 0  # Incremented on every notification
+        db.add_change_listener(self.notify)
+
+    def notify(self):
+        """Wake every subscriber; called by the database after each committed change"""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def _compute_rows(self, league_id):
+        """Return {player_id: (rank, row)} for the current leaderboard of a league"""
+        players = self.db.get_players_by_league(league_id)
+        for player in players:
+            player.final_score = self.calculator.calculate_weighted_score(player.scores)
+        players.sort(key=lambda p: (-p.final_score, p.id))
+
+        rows = {}
+        for rank, player in enumerate(players, 1):
+            rows[player.id] = (rank, {
+                'id': player.id,
+                'name': player.name,
+                'team': player.team,
+                'position': player.position,
+                'scores': player.scores,
+                'final_score': player.final_score
+            })
+        return rows
+
+    def _refresh(self, league_id):
+        """
+        Bring a league up to the current data version, recording a delta event
+
+        The leaderboard is recomputed outside self._condition, which notify()
+        needs on the writer's thread; a per-league lock keeps one recompute per
+        league at a time, and only the swap of the new state happens under
+        self._condition.
+        """
+        version = self.db.get_data_version()
+        with self._condition:
+            state = self._leagues.get(league_id)
+            if state is not None and state['version'] >= version:
+                return state
+            league_lock = self._league_locks.setdefault(league_id, threading.Lock())
+
+        with league_lock:
+            # Another subscriber may have caught up while we waited
+            with self._condition:
+                state = self._leagues.get(league_id)
+            if state is not None and state['version'] >= version:
+                return state
+
+            rows = self._compute_rows(league_id)
+            if state is None:
+                with self._condition:
+                    state = {'version': version, 'start_version': version, 'rows': rows,
+                             'events': deque(maxlen=self.history_size)}
+                    self._leagues[league_id] = state
+                return state
+
+            # state['rows'] only changes under league_lock, so it is safe to read here
+            old_rows = state['rows']
+            changes = []
+            for player_id, (rank, row) in rows.items():
+                previous = old_rows.get(player_id)
+                if previous is None or previous[0] != rank or previous[1] != row:
+                    changes.append({
+                        'player': row,
+                        'rank': rank,
+                        'previous_rank': previous[0] if previous else None
+                    })
+            removed = [player_id for player_id in old_rows if player_id not in rows]
+
+            # Projections of a changed row travel with it; rows are not compared on
+            # them, since one new score shifts its whole position's average a little
+            if changes and self.projections is not None:
+                projections = self.projections.get_league_projections(league_id)
+                for change in changes:
+                    projection = projections.get(change['player']['id'], {})
+                    change['player'] = dict(change['player'], projected=projection.get('projected', 0.0))
+
+            with self._condition:
+                if changes or removed:
+                    state['events'].append({
+                        'base_version': state['version'],
+                        'version': version,
+                        'league_id': league_id,
+                        'changes': changes,
+                        'removed': removed
+                    })
+                state['version'] = version
+                state['rows'] = rows
+            return state
+
+    def snapshot(self, league_id):
+        """Return the full current leaderboard of a league as a snapshot event"""
+        state = self._refresh(league_id)
+        with self._condition:
+            return {
+                'version': state['version'],
+                'league_id': league_id,
+                'rows': [dict(row, rank=rank) for rank, row in sorted(state['rows'].values(), key=lambda r: r[0])]
+            }
+
+    def events_since(self, league_id, version):
+        """
+        Return delta events newer than version
+
+        Returns None if version is older than the retained history, in which
+        case the client needs a fresh snapshot.
+        """
+        state = self._refresh(league_id)
+        with self._condition:
+            if version >= state['version']:
+                return []
+            events = state['events']
+            # Once the history is full, the oldest deltas have been dropped
+            if len(events) == events.maxlen:
+                start_version = events[0]['base_version']
+            else:
+                start_version = state['start_version']
+            if version < start_version:
+                return None
+            return [event for event in events if event['version'] > version]
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def wait(self, generation, timeout):
+        """
+        Block until a write newer than generation is committed or timeout seconds pass
+
+        Returns the current generation; it equals the one passed in on timeout.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._generation != generation, timeout)
+            return self._generation
+
+
+def format_sse(data, event=None, event_id=None):
+    """Encode one Server-Sent Events message"""
+    message = ''
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    if event:
+        message += f"event: {event}\n"
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+def stream_leaderboard(stream, league_id, since=None, heartbeat=15.0, poll=2.0):
+    """
+    Generate SSE messages for a league: a snapshot or replay first, then deltas and heartbeats
+
+    Writes made by this process wake the stream at once. Writes made by other
+    worker processes do not notify it, so the data version is also checked
+    every poll seconds; their deltas arrive up to that late.
+    """
+    yield "retry: 3000\n\n"
+
+    generation = stream.generation
+
+    events = stream.events_since(league_id, since) if since is not None else None
+    if events is None:
+        snapshot = stream.snapshot(league_id)
+        last_version = snapshot['version']
+        yield format_sse(snapshot, event='snapshot', event_id=last_version)
+    else:
+        last_version = since
+        for event in events:
+            last_version = event['version']
+            yield format_sse(event, event='delta', event_id=last_version)
+
+    last_message = time.monotonic()
+    while True:
+        generation = stream.wait(generation, poll)
+        events = stream.events_since(league_id, last_version)
+        if events is None:
+            snapshot = stream.snapshot(league_id)
+            last_version = snapshot['version']
+            yield format_sse(snapshot, event='snapshot', event_id=last_version)
+            last_message = time.monotonic()
+        elif events:
+            for event in events:
+                last_version = event['version']
+                yield format_sse(event, event='delta', event_id=last_version)
+            last_message = time.monotonic()
+        elif time.monotonic() - last_message >= heartbeat:
+            # Comment line keeps proxies and the browser connection alive
+            yield ": heartbeat\n\n"
+            last_message = time.monotonic()
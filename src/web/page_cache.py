@@ -0,0 +1,66 @@
+"""
+In-memory cache of rendered pages for the Flask web app
+
+Rendered HTML is stored per key, e.g. (league, view, data version), and the
+least recently used pages are evicted once the total size exceeds a byte budget.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class PageCache:
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached page body (bytes) for key, or None"""
+        with self._lock:
+            body = self._pages.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key, html):
+        """Store a rendered page, evicting least recently used pages to stay within budget"""
+        body = html.encode('utf-8') if isinstance(html, str) else html
+        if len(body) > self.max_bytes:
+            return body
+
+        with self._lock:
+            old = self._pages.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+
+            self._pages[key] = body
+            self.current_bytes += len(body)
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self.current_bytes -= len(evicted)
+        return body
+
+    def clear(self):
+        """Drop every cached page"""
+        with self._lock:
+            self._pages.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                'pages': len(self._pages),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
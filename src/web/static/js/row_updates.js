@@ -0,0 +1,131 @@
+// In-place row updates for player tables
+//
+// Roster toggles and deletes call the JSON mutation endpoints and patch only
+// the affected row, instead of following the redirect back to the fully
+// re-rendered leaderboard. The plain links and forms remain as a fallback
+// when JavaScript is unavailable or a request fails.
+(function () {
+    const tbody = document.querySelector('tbody[data-view]');
+    if (!tbody) {
+        return;
+    }
+    const view = tbody.dataset.view;
+
+    function renumberRanks() {
+        if (tbody.dataset.ranked === undefined) {
+            return;
+        }
+        Array.from(tbody.rows).forEach((row, index) => {
+            row.cells[0].textContent = index + 1;
+        });
+    }
+
+    function applyToggle(row, data) {
+        const player = data.player;
+
+        // Filtered views only list one roster status, so the row leaves the view
+        if (view === 'my_team' || view === 'available') {
+            row.remove();
+            renumberRanks();
+            return;
+        }
+
+        row.className = player.is_on_my_team ? 'my-team-player' : 'available-player';
+        if (view === 'leaderboard') {
+            row.cells[0].textContent = data.rank;
+        }
+
+        const star = row.querySelector('.team-star');
+        if (star) {
+            star.hidden = !player.is_on_my_team;
+        }
+
+        const link = row.querySelector('.toggle-link');
+        link.textContent = player.is_on_my_team ? '➖' : '➕';
+        link.style.color = player.is_on_my_team ? '#dc3545' : '#28a745';
+        link.title = player.is_on_my_team ? 'Remove from My Team' : 'Add to My Team';
+    }
+
+    // The mutation is already committed; if patching the row fails, show the
+    // server's state instead of repeating the request
+    function applyUpdate(update) {
+        try {
+            update();
+        } catch (error) {
+            window.location.reload();
+        }
+    }
+
+    function postJson(url) {
+        return fetch(url, {method: 'POST', headers: {'Accept': 'application/json'}})
+            .then(response => response.ok ? response.json() : Promise.reject(response));
+    }
+
+    tbody.addEventListener('click', event => {
+        const link = event.target.closest('.toggle-link');
+        if (!link) {
+            return;
+        }
+        event.preventDefault();
+
+        // Only a failed request falls back to the link; once the POST succeeded,
+        // following it would toggle the player a second time
+        postJson(link.dataset.api)
+            .then(data => applyUpdate(() => applyToggle(link.closest('tr'), data)),
+                  () => { window.location = link.href; });
+    });
+
+    // Live leaderboard: apply pushed score changes and rank movements in place.
+    // Every row whose rank moved is part of the delta, so the others keep theirs.
+    function applyDelta(delta) {
+        for (const change of delta.changes) {
+            const row = tbody.querySelector(`tr[data-player-id="${change.player.id}"]`);
+            if (!row) {
+                // A new player needs the full server-rendered row
+                window.location.reload();
+                return;
+            }
+            row.querySelector('.final-score').textContent = change.player.final_score.toFixed(2);
+            row.querySelector('.game-scores').textContent = change.player.scores.join(', ');
+            if (change.player.projected !== undefined) {
+                row.querySelector('.projected').textContent = change.player.projected.toFixed(2);
+            }
+            // Streamed rows carry no roster status (it is per manager); the
+            // toggle responses keep the star and link current
+            row.cells[0].textContent = change.rank;
+        }
+        for (const playerId of delta.removed) {
+            const row = tbody.querySelector(`tr[data-player-id="${playerId}"]`);
+            if (row) {
+                row.remove();
+            }
+        }
+
+        Array.from(tbody.rows)
+            .sort((a, b) => Number(a.cells[0].textContent) - Number(b.cells[0].textContent))
+            .forEach(row => tbody.appendChild(row));
+    }
+
+    if (tbody.dataset.stream && window.EventSource) {
+        const source = new EventSource(tbody.dataset.stream);
+        source.addEventListener('delta', event => applyDelta(JSON.parse(event.data)));
+        // A snapshot means our history was too old to replay; re-render from the server
+        source.addEventListener('snapshot', () => window.location.reload());
+    }
+
+    tbody.addEventListener('submit', event => {
+        const form = event.target.closest('.delete-form');
+        // The inline confirm() handler has already run and may have cancelled
+        if (!form || event.defaultPrevented) {
+            return;
+        }
+        event.preventDefault();
+
+        postJson(form.dataset.api)
+            .then(() => applyUpdate(() => {
+                      form.closest('tr').remove();
+                      renumberRanks();
+                  }),
+                  () => form.submit());
+    });
+})();
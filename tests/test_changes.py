@@ -0,0 +1,141 @@
+"""
+Tests for the change journal: replay from a data version and compaction
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database
+from src.core.models import Player
+
+
+def replay(db, since, mirror, limit=1000):
+    """Apply journal entries after since to a {player_id: row} mirror, page by page"""
+    while True:
+        page = db.get_changes(since, limit=limit)
+        for change in page['changes']:
+            if change['op'] == 'clear':
+                mirror.clear()
+            elif change['op'] == 'delete':
+                mirror.pop(change['player_id'], None)
+            elif change['op'] in ('insert', 'update'):
+                mirror[change['player_id']] = (change['name'], change['team'], change['position'],
+                                               change['scores'], change['league_id'])
+        since = page['version']
+        if not page['has_more']:
+            return since
+
+
+class ChangeJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, 'players.db'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def current_rows(self):
+        return {player.id: (player.name, player.team, player.position, player.scores, player.league_id)
+                for player in self.db.get_all_players()}
+
+    def make_history(self):
+        """
+        Add, update and delete players over a run of versions
+
+        Returns:
+            list: (data version, rows at that version) checkpoints a mirror could have synced to
+        """
+        checkpoints = [(0, {})]
+        players = []
+        for i in range(6):
+            player = Player(f'Player {i}', 'Arsenal', 'Midfielder', [50 + i], league_id=2)
+            self.db.add_player(player)
+            players.append(player)
+        checkpoints.append((self.db.get_data_version(), self.current_rows()))
+        for week in range(1, 5):
+            for player in players[:4]:
+                self.db.update_player_scores(player.id, [50, 60 + week])
+        checkpoints.append((self.db.get_data_version(), self.current_rows()))
+        self.db.delete_player(players[1].id)
+        self.db.update_player_info(players[2].id, 'Renamed', 'Chelsea', 'Forward', [99])
+        return checkpoints
+
+    def test_replay_from_any_version_reproduces_current_rows(self):
+        checkpoints = self.make_history()
+        current = self.current_rows()
+
+        for since, rows in checkpoints:
+            mirror = dict(rows)
+            self.assertEqual(replay(self.db, since, mirror), self.db.get_data_version())
+            self.assertEqual(mirror, current)
+
+        # A mirror that is already current receives nothing
+        page = self.db.get_changes(self.db.get_data_version())
+        self.assertEqual((page['changes'], page['has_more']), ([], False))
+
+    def test_pages_end_on_version_boundaries(self):
+        rows = [(f'Bulk {i}', 'Arsenal', 'Midfielder', '[70]', False, 2) for i in range(5)]
+        self.db.bulk_add_players(rows)
+        bulk_version = self.db.get_data_version()
+        self.make_history()
+
+        # One version holds five entries; a limit of two must not split it
+        page = self.db.get_changes(0, limit=2)
+        versions = [change['version'] for change in page['changes']]
+        self.assertTrue(page['has_more'])
+        self.assertTrue(all(version <= page['version'] for version in versions))
+        later = self.db.get_changes(page['version'], limit=10 ** 6)['changes']
+        self.assertTrue(all(change['version'] > page['version'] for change in later))
+        self.assertEqual(sum(change['version'] == bulk_version for change in page['changes'] + later), 5)
+
+        mirror = {}
+        replay(self.db, 0, mirror, limit=2)
+        self.assertEqual(mirror, self.current_rows())
+
+    def test_compaction_keeps_newest_entry_per_player(self):
+        self.make_history()
+        league_version = self.db.get_league_version(2)
+        before = len(self.db.get_changes(0, limit=10 ** 6)['changes'])
+
+        removed = self.db.compact_changes(keep_versions=2)
+        changes = self.db.get_changes(0, limit=10 ** 6)['changes']
+        self.assertGreater(removed, 0)
+        self.assertEqual(len(changes), before - removed)
+
+        cutoff = self.db.get_data_version() - 2
+        compacted = [change['player_id'] for change in changes
+                     if change['version'] <= cutoff and change['player_id'] is not None]
+        self.assertEqual(len(compacted), len(set(compacted)))
+
+        # Mirrors syncing from scratch still end up with the current rows
+        mirror = {}
+        replay(self.db, 0, mirror)
+        self.assertEqual(mirror, self.current_rows())
+        self.assertEqual(self.db.get_league_version(2), league_version)
+        self.assertEqual(self.db.compact_changes(keep_versions=2), 0)
+
+    def test_compaction_drops_player_entries_before_a_clear(self):
+        self.make_history()
+        self.db.delete_all_players()
+        survivor = Player('After Clear', 'Arsenal', 'Midfielder', [80], league_id=2)
+        self.db.add_player(survivor)
+
+        self.db.compact_changes(keep_versions=1)
+        ops = [change['op'] for change in self.db.get_changes(0, limit=10 ** 6)['changes']
+               if change['op'] != 'league']
+        self.assertEqual(ops, ['clear', 'insert'])
+
+        mirror = {1: ('Stale', 'Arsenal', 'Midfielder', [1], 2)}
+        replay(self.db, 0, mirror)
+        self.assertEqual(mirror, self.current_rows())
+        self.assertEqual(list(mirror), [survivor.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
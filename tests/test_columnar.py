@@ -0,0 +1,107 @@
+"""
+Tests for columnar league snapshots
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.columnar import ColumnarSnapshots
+from src.core.database import Database
+from src.core.models import Player
+from src.core.scoring import WeightedScoreCalculator
+
+
+class ColumnarSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, 'players.db'))
+        self.calculator = WeightedScoreCalculator()
+        # A long delay keeps scheduled exports from running during a test
+        self.snapshots = ColumnarSnapshots(self.db, self.calculator, os.path.join(self.tmp.name, 'columnar'),
+                                           delay=60)
+        os.makedirs(self.snapshots.directory)
+        for name, team, position, scores in [('Saka', 'Arsenal', 'Midfielder', [80, 90]),
+                                             ('Ødegaard', 'Arsenal', 'Midfielder', [85, 85]),
+                                             ('Haaland', 'Man City', 'Forward', [60]),
+                                             ('Rice', 'Arsenal', 'Midfielder', [85, 85]),
+                                             ('Raya', 'Arsenal', 'Goalkeeper', [])]:
+            self.db.add_player(Player(name, team, position, scores, league_id=2))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected_rows(self, league_id=2):
+        players = []
+        for player in self.db.get_players_by_league(league_id):
+            players.append((player.id, player.name, player.team, player.position, player.scores,
+                            self.calculator.calculate_weighted_score(player.scores)))
+        # Leaderboard order: final score, highest first, then id
+        return sorted(players, key=lambda row: (-row[5], row[0]))
+
+    def snapshot_rows(self, snapshot):
+        return [(player.id, player.name, player.team, player.position, player.scores, player.final_score)
+                for player in snapshot.to_players()]
+
+    def test_round_trip_in_leaderboard_order(self):
+        self.assertIsNone(self.snapshots.get(2))
+        self.assertTrue(self.snapshots.export(2))
+        self.assertFalse(self.snapshots.export(2))
+
+        snapshot = self.snapshots.get(2)
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(len(snapshot), 5)
+        self.assertEqual(snapshot.version, self.db.get_league_version(2))
+        rows = self.snapshot_rows(snapshot)
+        for row, expected in zip(rows, self.expected_rows()):
+            self.assertEqual(row[:5], expected[:5])
+            self.assertAlmostEqual(row[5], expected[5])
+        # Integer scores read back as ints, not floats
+        self.assertTrue(all(isinstance(score, int) for row in rows for score in row[4]))
+        self.assertEqual(snapshot.name(0), rows[0][1])
+        self.assertEqual(snapshot.player_scores(0), rows[0][4])
+
+    def test_fractional_scores_round_trip(self):
+        saka = self.db.get_player_by_name('Saka', 2)
+        self.db.update_player_scores(saka.id, [80.5, 90.25])
+        self.snapshots.export(2)
+        rows = {row[0]: row for row in self.snapshot_rows(self.snapshots.get(2))}
+        self.assertEqual(rows[saka.id][4], [80.5, 90.25])
+
+    def test_writes_to_the_league_make_the_file_stale(self):
+        self.snapshots.export(2)
+        other_league = Player('Hamilton', 'Ferrari', 'Driver', [25], league_id=1)
+        self.db.add_player(other_league)
+        self.assertIsNotNone(self.snapshots.get(2))
+
+        saka = self.db.get_player_by_name('Saka', 2)
+        self.db.update_player_scores(saka.id, [10])
+        self.assertIsNone(self.snapshots.get(2))
+        self.assertTrue(self.snapshots.export(2))
+        rows = self.snapshot_rows(self.snapshots.get(2))
+        self.assertEqual(rows[-2][0], saka.id)
+        self.assertEqual(rows[-2][4], [10])
+
+    def test_truncated_file_is_ignored_and_re_exported(self):
+        self.snapshots.export(2)
+        path = self.snapshots.path(2)
+        size = os.path.getsize(path)
+
+        for length in (4, 100, size - 8, 0):
+            with open(path, 'r+b') as f:
+                f.truncate(length)
+            self.assertIsNone(self.snapshots.get(2), length)
+            self.assertIsNone(self.snapshots.get_file_version(2), length)
+
+            self.assertTrue(self.snapshots.export(2))
+            self.assertEqual(os.path.getsize(path), size)
+            self.assertEqual(len(self.snapshot_rows(self.snapshots.get(2))), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
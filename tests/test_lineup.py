@@ -0,0 +1,91 @@
+"""
+Tests for the lineup optimizer
+
+Run with: python -m pytest tests
+"""
+
+import itertools
+import os
+import random
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.lineup import LineupOptimizer, player_price
+from src.core.models import Player
+from src.core.scoring import WeightedScoreCalculator
+
+
+def make_players(rng, count, positions, teams, weeks=4):
+    return [Player(f"Player {i}", rng.choice(teams), rng.choice(positions),
+                   [rng.randint(30, 100) for _ in range(rng.randint(1, weeks))], False, 2, i + 1)
+            for i in range(count)]
+
+
+def brute_force(players, slots, budget=None, max_per_team=None):
+    """Best total score over every lineup, or None if no lineup fits"""
+    calculator = WeightedScoreCalculator()
+    groups = []
+    for position, count in slots.items():
+        group = [p for p in players if p.position == position]
+        groups.append(list(itertools.combinations(group, count)))
+
+    best = None
+    for picks in itertools.product(*groups):
+        lineup = [player for pick in picks for player in pick]
+        if budget is not None and sum(round(player_price(p.scores) * 10) for p in lineup) > round(budget * 10):
+            continue
+        if max_per_team is not None:
+            teams = [p.team for p in lineup]
+            if any(teams.count(team) > max_per_team for team in teams):
+                continue
+        score = sum(calculator.calculate_weighted_score(p.scores) for p in lineup)
+        if best is None or score > best:
+            best = score
+    return best
+
+
+class LineupOptimizerTest(unittest.TestCase):
+    def test_matches_brute_force_on_small_leagues(self):
+        rng = random.Random(7)
+        slots = {'Goalkeeper': 1, 'Defender': 2, 'Forward': 2}
+        optimizer = LineupOptimizer()
+        for _ in range(40):
+            players = make_players(rng, rng.randint(6, 16), list(slots), ['A', 'B', 'C', 'D'])
+            budget = rng.choice([None, 25.0, 30.0, 35.0, 40.0])
+            max_per_team = rng.choice([None, 1, 2])
+
+            expected = brute_force(players, slots, budget, max_per_team)
+            result = optimizer.optimize(players, slots, budget, max_per_team)
+
+            self.assertTrue(result['optimal'])
+            if expected is None:
+                self.assertFalse(result['feasible'])
+                continue
+            self.assertTrue(result['feasible'])
+            self.assertAlmostEqual(result['total_score'], expected, places=6)
+            if budget is not None:
+                self.assertLessEqual(result['total_price'], budget + 1e-9)
+            if max_per_team is not None:
+                teams = [p.team for p in result['players']]
+                self.assertTrue(all(teams.count(team) <= max_per_team for team in teams))
+
+    def test_constrained_search_stays_within_time_limit(self):
+        rng = random.Random(11)
+        slots = {'Goalkeeper': 1, 'Defender': 4, 'Midfielder': 4, 'Forward': 2}
+        teams = [f"Team {i}" for i in range(10)]
+        players = make_players(rng, 10000, list(slots), teams, weeks=5)
+
+        start = time.monotonic()
+        result = LineupOptimizer().optimize(players, slots, budget=68, max_per_team=2, time_limit=1.0)
+        elapsed = time.monotonic() - start
+
+        self.assertTrue(result['feasible'])
+        # Setup (scoring, pruning, frontiers) runs before the limit applies
+        self.assertLess(elapsed, 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
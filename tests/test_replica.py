@@ -0,0 +1,79 @@
+"""
+Tests for the in-memory read replica
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database
+from src.core.models import Player
+
+
+class ReadReplicaTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'players.db')
+        # Stands in for another worker process writing the same file
+        self.other = Database(self.path)
+        self.other.add_player(Player('Saka', 'Arsenal', 'Midfielder', [80], league_id=2))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def names(self, db):
+        return sorted(player.name for player in db.get_players_by_league(2))
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def test_own_writes_are_visible_before_the_copy_catches_up(self):
+        # A long delay keeps the background refresh from copying during the test
+        db = Database(self.path, replica=True, replica_poll=0, replica_delay=60)
+        self.assertEqual(self.names(db), ['Saka'])
+
+        rice = Player('Rice', 'Arsenal', 'Midfielder', [70], league_id=2)
+        db.add_player(rice)
+        self.assertEqual(self.names(db), ['Rice', 'Saka'])
+        db.update_player_scores(rice.id, [95])
+        self.assertEqual(db.get_player_by_id(rice.id).scores, [95])
+        self.assertEqual(db.get_player_rank(rice.id), 1)
+
+    def test_other_writers_show_up_once_the_copy_is_refreshed(self):
+        # Without polling the copy only changes when refreshed explicitly
+        db = Database(self.path, replica=True, replica_poll=0)
+        self.assertEqual(self.names(db), ['Saka'])
+
+        self.other.add_player(Player('Rice', 'Arsenal', 'Midfielder', [70], league_id=2))
+        self.assertEqual(self.names(db), ['Saka'])
+        self.assertTrue(db.refresh_replica())
+        self.assertEqual(self.names(db), ['Rice', 'Saka'])
+        self.assertFalse(db.refresh_replica())
+
+    def test_background_refresh_picks_up_writes(self):
+        db = Database(self.path, replica=True, replica_poll=0.05, replica_delay=0.01)
+        self.assertEqual(self.names(db), ['Saka'])
+
+        self.other.add_player(Player('Rice', 'Arsenal', 'Midfielder', [70], league_id=2))
+        self.assertTrue(self.wait_for(lambda: self.names(db) == ['Rice', 'Saka']))
+
+        # Own writes are copied too, after which reads leave the file again
+        db.delete_player(self.other.get_player_by_name('Saka', 2).id)
+        self.assertEqual(self.names(db), ['Rice'])
+        self.assertTrue(self.wait_for(lambda: db._replica_copied == db._replica_commits))
+        self.assertEqual(self.names(db), ['Rice'])
+
+
+if __name__ == '__main__':
+    unittest.main()
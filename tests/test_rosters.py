@@ -0,0 +1,136 @@
+"""
+Tests for per-manager rosters
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database, DEFAULT_USER
+from src.core.models import Player
+
+
+class RosterMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'players.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_flagged_players_move_to_default_roster(self):
+        # A database from before rosters: the flag on the player row was the only roster
+        with sqlite3.connect(self.path) as conn:
+            conn.execute('''
+                CREATE TABLE players (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    team TEXT NOT NULL,
+                    position TEXT NOT NULL,
+                    scores TEXT NOT NULL,
+                    final_score REAL DEFAULT 0.0,
+                    is_on_my_team BOOLEAN DEFAULT 0,
+                    league_id INTEGER DEFAULT 1,
+                    UNIQUE(name, league_id)
+                )
+            ''')
+            conn.executemany('INSERT INTO players (name, team, position, scores, is_on_my_team, league_id) '
+                             'VALUES (?, ?, ?, ?, ?, ?)',
+                             [('Saka', 'Arsenal', 'Midfielder', '[80, 90]', 1, 2),
+                              ('Rice', 'Arsenal', 'Midfielder', '[70]', 0, 2),
+                              ('Hamilton', 'Ferrari', 'Driver', '[25]', 1, 1)])
+            conn.commit()
+
+        db = Database(self.path)
+        mine = {player.name: player for player in db.get_my_team_players(user_id=DEFAULT_USER)}
+        self.assertEqual(set(mine), {'Saka', 'Hamilton'})
+        self.assertTrue(all(player.is_on_my_team for player in mine.values()))
+        self.assertEqual({player.name for player in db.get_available_players(2)}, {'Rice'})
+        self.assertEqual(db.get_my_team_players(user_id='alice'), [])
+
+        # The flags are cleared, so opening the database again migrates nothing twice
+        with sqlite3.connect(self.path) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM players WHERE is_on_my_team = 1').fetchone()[0], 0)
+        db = Database(self.path)
+        self.assertEqual(len(db.get_my_team_players(user_id=DEFAULT_USER)), 2)
+
+
+class RosterIsolationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, 'players.db'))
+        self.players = []
+        for name in ('Saka', 'Rice', 'Odegaard'):
+            player = Player(name, 'Arsenal', 'Midfielder', [70, 80], league_id=2)
+            self.db.add_player(player)
+            self.players.append(player)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def roster_names(self, user_id):
+        return {player.name for player in self.db.get_my_team_players(2, user_id)}
+
+    def test_toggles_only_change_own_roster(self):
+        saka, rice, _ = self.players
+        self.assertTrue(self.db.toggle_my_team_status(saka.id, 'alice'))
+        self.assertTrue(self.db.toggle_my_team_status(rice.id, 'bob'))
+
+        self.assertEqual(self.roster_names('alice'), {'Saka'})
+        self.assertEqual(self.roster_names('bob'), {'Rice'})
+        self.assertEqual(self.roster_names(DEFAULT_USER), set())
+        self.assertEqual({player.name for player in self.db.get_available_players(2, 'alice')}, {'Rice', 'Odegaard'})
+        self.assertTrue(self.db.get_player_by_id(saka.id, 'alice').is_on_my_team)
+        self.assertFalse(self.db.get_player_by_id(saka.id, 'bob').is_on_my_team)
+
+        self.assertTrue(self.db.toggle_my_team_status(saka.id, 'alice'))
+        self.assertEqual(self.roster_names('alice'), set())
+        self.assertEqual(self.roster_names('bob'), {'Rice'})
+
+    def test_toggles_bump_only_the_users_roster_version(self):
+        saka, rice, odegaard = self.players
+        data_version = self.db.get_data_version()
+        alice = self.db.get_page_version(2, 'alice')
+        bob = self.db.get_page_version(2, 'bob')
+
+        self.db.toggle_my_team_status(saka.id, 'alice')
+        self.assertEqual(self.db.get_data_version(), data_version)
+        self.assertNotEqual(self.db.get_page_version(2, 'alice'), alice)
+        self.assertEqual(self.db.get_page_version(2, 'bob'), bob)
+        self.assertEqual(self.db.get_page_version(2)[:2], alice[:2])
+
+        result = self.db.apply_batch([{'op': 'toggle', 'player_id': rice.id},
+                                      {'op': 'toggle', 'player_id': odegaard.id}], 'bob')
+        self.assertEqual(result['version'], data_version)
+        self.assertEqual(self.db.get_data_version(), data_version)
+        self.assertNotEqual(self.db.get_page_version(2, 'bob'), bob)
+        self.assertEqual(self.roster_names('bob'), {'Rice', 'Odegaard'})
+
+        # Unknown players leave every version alone
+        roster_version = result['roster_version']
+        self.assertFalse(self.db.toggle_my_team_status(999, 'bob'))
+        self.assertEqual(self.db.apply_batch([{'op': 'toggle', 'player_id': 999}], 'bob')['roster_version'],
+                         roster_version)
+
+        # Score changes still bump the data version
+        result = self.db.apply_batch([{'op': 'toggle', 'player_id': saka.id},
+                                      {'op': 'update_scores', 'player_id': saka.id, 'scores': [90]}], 'bob')
+        self.assertEqual(result['version'], data_version + 1)
+
+    def test_deleted_player_leaves_every_roster(self):
+        saka = self.players[0]
+        self.db.toggle_my_team_status(saka.id, 'alice')
+        self.db.toggle_my_team_status(saka.id, 'bob')
+        self.assertTrue(self.db.delete_player(saka.id))
+        self.assertEqual(self.roster_names('alice'), set())
+        self.assertEqual(self.roster_names('bob'), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
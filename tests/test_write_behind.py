@@ -0,0 +1,147 @@
+"""
+Tests for the write-behind score queue
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import Database
+from src.core.models import Player
+from src.core.write_behind import WriteBehindQueue
+
+
+class PausingDatabase(Database):
+    """Database whose next batch write, after pause(), waits for resume and can be made to fail"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writing = threading.Event()
+        self.resume = threading.Event()
+        self.paused = False
+        self.fail_next = False
+
+    def pause(self):
+        self.writing.clear()
+        self.resume.clear()
+        self.paused = True
+
+    def update_scores_batch(self, updates, synchronous=None):
+        if self.paused:
+            self.paused = False
+            self.writing.set()
+            self.resume.wait(10)
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError('disk full')
+        return super().update_scores_batch(updates, synchronous)
+
+
+class WriteBehindQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = PausingDatabase(os.path.join(self.tmp.name, 'players.db'))
+        self.players = []
+        for name in ('Saka', 'Rice'):
+            player = Player(name, 'Arsenal', 'Midfielder', [50], league_id=2)
+            self.db.add_player(player)
+            self.players.append(player)
+        # Flushes only happen when a test asks for them
+        self.queue = WriteBehindQueue(self.db, interval=60, batch_size=1000)
+
+    def tearDown(self):
+        self.db.resume.set()
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def scores(self, player):
+        return self.db.get_player_by_id(player.id).scores
+
+    def flush_in_background(self):
+        thread = threading.Thread(target=self.queue.flush)
+        thread.start()
+        return thread
+
+    def test_updates_to_one_player_coalesce_into_one_write(self):
+        saka, rice = self.players
+        version = self.db.get_data_version()
+        for week in range(1, 4):
+            self.queue.submit(saka.id, [50, 60 + week])
+        self.queue.submit(rice.id, [70])
+
+        self.assertEqual(self.scores(saka), [50])
+        self.assertEqual(self.queue.pending(), 2)
+        self.assertEqual(self.queue.flush(), 2)
+        self.assertEqual(self.scores(saka), [50, 63])
+        self.assertEqual(self.scores(rice), [70])
+        self.assertEqual(self.db.get_data_version(), version + 1)
+        self.assertEqual((self.queue.submitted, self.queue.coalesced, self.queue.written, self.queue.batches),
+                         (4, 2, 2, 1))
+
+    def test_update_made_during_a_flush_is_written_after_it(self):
+        saka = self.players[0]
+        self.queue.submit(saka.id, [61])
+        self.db.pause()
+        first = self.flush_in_background()
+        self.assertTrue(self.db.writing.wait(10))
+
+        # The newer update goes into the next batch, which must not commit first
+        self.queue.submit(saka.id, [62])
+        second = self.flush_in_background()
+        second.join(0.2)
+        self.db.resume.set()
+        first.join(10)
+        second.join(10)
+
+        self.assertEqual(self.scores(saka), [62])
+        self.assertEqual(self.queue.batches, 2)
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_failed_flush_is_retried_without_overwriting_newer_updates(self):
+        saka, rice = self.players
+        self.queue.submit(saka.id, [61])
+        self.queue.submit(rice.id, [71])
+        self.db.fail_next = True
+        self.db.pause()
+        failing = self.flush_in_background()
+        self.assertTrue(self.db.writing.wait(10))
+        self.queue.submit(saka.id, [62])
+        self.db.resume.set()
+        failing.join(10)
+
+        self.assertEqual(self.queue.pending(), 2)
+        self.assertEqual(self.queue.flush(), 2)
+        self.assertEqual(self.scores(saka), [62])
+        self.assertEqual(self.scores(rice), [71])
+
+    def test_close_flushes_pending_updates_and_rejects_new_ones(self):
+        saka = self.players[0]
+        self.queue.submit(saka.id, [65])
+        self.assertEqual(self.queue.close(), 0)
+        self.assertEqual(self.scores(saka), [65])
+        with self.assertRaises(RuntimeError):
+            self.queue.submit(saka.id, [66])
+
+    def test_commit_durability_returns_once_written(self):
+        queue = WriteBehindQueue(self.db, interval=60, durability='commit')
+        try:
+            saka = self.players[0]
+            self.assertTrue(queue.submit(saka.id, [80]))
+            self.assertEqual(self.scores(saka), [80])
+        finally:
+            queue.close()
+
+    def test_non_finite_scores_are_rejected_before_queueing(self):
+        with self.assertRaises(ValueError):
+            self.queue.submit(self.players[0].id, [float('nan')])
+        self.assertEqual(self.queue.pending(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()